@@ -1,6 +1,6 @@
 from fastapi import Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordBearer, APIKeyHeader
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.config import settings
 from app.models.user import User
 from app.core.database import get_db
@@ -25,7 +25,7 @@ async def verify_api_key(
 def get_current_user_with_permissions(required_permissions: Optional[List[str]] = None):
     async def current_user_with_permissions(
         request: Request,
-        db: Session = Depends(get_db),
+        db: AsyncSession = Depends(get_db),
         current_user: User = Depends(get_current_user)
     ) -> User:
         # Rate limiting per user
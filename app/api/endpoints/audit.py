@@ -8,7 +8,7 @@ from app.services.audit_service import AuditService
 from app.core.activity_monitor import ActivityMonitor
 from app.tasks import unified_analysis_task, generate_ai_suggestions
 from app.core.database import get_db
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.permissions import require_role, require_subscription
 from app.models.user import UserRole, SubscriptionTier
 
@@ -18,7 +18,7 @@ activity_monitor = ActivityMonitor()
 @router.get("/list")
 async def list_audits(
     current_user: User = Depends(get_current_user_with_permissions(["read_audit"])),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Endpoint listowania audytów"""
     audit_service = AuditService(db)
@@ -28,7 +28,7 @@ async def list_audits(
 @require_role(UserRole.USER)
 async def create_audit(
     data: AuditCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Podstawowa funkcjonalność audytu dostępna dla wszystkich użytkowników"""
@@ -39,7 +39,7 @@ async def create_audit(
 async def get_audit(
     request: Request,
     audit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_with_permissions(required_permissions=["read_audit"]))
 ):
     """Zabezpieczony endpoint pobierania audytu"""
@@ -60,7 +60,7 @@ async def analyze_audit(
     request: Request,
     audit_id: int,
     analysis_type: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_with_permissions(required_permissions=["analyze_audit"]))
 ):
     """Endpoint chroniony autoryzacją i rate limitingiem"""
@@ -87,7 +87,7 @@ async def generate_suggestions(
     request: Request,
     audit_id: int,
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user_with_permissions(required_permissions=["analyze_audit"])),
     elements: List[str] = Query(None)
 ):
@@ -108,7 +108,7 @@ async def generate_suggestions(
 @require_subscription(SubscriptionTier.PREMIUM)
 async def analyze_with_ai(
     audit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """Funkcjonalność premium - analiza AI"""
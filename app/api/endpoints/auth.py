@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Request
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.services.auth_service import AuthService
 from app.services.user_service import UserService
@@ -13,7 +13,7 @@ security_service = SecurityService()
 @router.post("/register")
 async def register(
     user_data: UserCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     user_service = UserService(db)
     await user_service.create_user(user_data)
@@ -23,7 +23,7 @@ async def register(
 async def login(
     request: Request,
     form_data: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Endpoint logowania"""
     try:
@@ -46,7 +46,7 @@ async def login(
 @router.post("/logout")
 async def logout(
     refresh_token: str,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     auth_service = AuthService(db)
     await auth_service.logout(refresh_token)
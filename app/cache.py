@@ -1,10 +1,10 @@
 from functools import lru_cache
 from typing import Optional
 from .models import Audit
-from .database_utils import get_db
+from .core.database import db_session
 
 @lru_cache(maxsize=100)
 async def get_cached_audit(audit_id: int) -> Optional[Audit]:
     """Cache dla często odczytywanych audytów"""
-    with get_db() as db:
-        return db.query(Audit).filter(Audit.id == audit_id).first() 
\ No newline at end of file
+    async with db_session() as db:
+        return await db.get(Audit, audit_id) 
\ No newline at end of file
@@ -1,8 +1,18 @@
 from pydantic import BaseSettings, BaseModel
-from typing import Dict, List, Optional, ClassVar
+from typing import Dict, List, NamedTuple, Optional, ClassVar
 import os
 from dataclasses import dataclass
 
+class TimeoutConfig(NamedTuple):
+    connect: int
+    read: int
+    total: int
+
+class RetryConfig(NamedTuple):
+    max_attempts: int
+    min_wait: int
+    max_wait: int
+
 class Settings(BaseSettings):
     CELERY_TIMEOUTS: ClassVar[Dict[str, int]] = {'crawl': 3600, 'default': 1800}
     
@@ -52,6 +62,78 @@ class Settings(BaseSettings):
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
     CELERY_RESULT_BACKEND: str = "redis://localhost:6379/0"
     
+    # Ustawienia crawlera
+    CRAWL_ENGINE: str = "scrapy"  # scrapy | asyncio
+    CRAWL_USE_SITEMAPS: bool = True
+    CRAWL_RENDER_MODE: str = "none"  # none | hybrid
+    CRAWL_RENDER_QUEUE_SIZE: int = 10
+    
+    # Pula przeglądarek Selenium (na proces workera)
+    SELENIUM_POOL_SIZE: int = 2
+    SELENIUM_MAX_PAGES_PER_BROWSER: int = 50
+    SELENIUM_MAX_MEMORY_MB: int = 1024
+    
+    # Renderowanie stron wymagających JS
+    CRAWL_RENDERER: str = "selenium"  # selenium | cdp
+    CHROME_PATH: Optional[str] = None
+    CDP_MAX_TABS: int = 4
+    CDP_BLOCKED_RESOURCE_TYPES: List[str] = ["Image", "Media", "Font"]
+    CDP_BLOCKED_DOMAINS: List[str] = [
+        "google-analytics.com",
+        "googletagmanager.com",
+        "doubleclick.net",
+        "facebook.net",
+        "hotjar.com",
+        "clarity.ms"
+    ]
+    
+    # Klient HTTP (app.core.http_client) - timeouty per operacja i retry
+    TIMEOUTS: ClassVar[Dict[str, TimeoutConfig]] = {
+        "crawl": TimeoutConfig(3, 10, 15),
+        "links": TimeoutConfig(2, 5, 8),
+        "images": TimeoutConfig(2, 5, 8),
+        "meta": TimeoutConfig(2, 3, 6),
+        "default": TimeoutConfig(2, 5, 8)
+    }
+    RETRY_CONFIG: ClassVar[RetryConfig] = RetryConfig(3, 1, 10)
+    HTTP_USER_AGENT: str = "SEO-MVP-Crawler/1.0"
+    HTTP_POOL_SIZE: int = 100
+    HTTP_POOL_SIZE_PER_HOST: int = 8
+    HTTP_DNS_CACHE_TTL: int = 300
+    HTTP_KEEPALIVE_TIMEOUT: int = 30
+    HTTP_MAX_BODY_BYTES: int = 10 * 1024 * 1024
+    
+    # Sprawdzanie linków (app.services.link_checker)
+    LINK_CHECK_CONCURRENCY: int = 100
+    LINK_CHECK_PER_HOST: int = 4
+    LINK_CHECK_MAX_REDIRECTS: int = 5
+    LINK_CHECK_FLUSH_EVERY: int = 1000
+    LINK_STATUS_CACHE_ENABLED: bool = True
+    LINK_STATUS_TTL_OK: int = 7 * 24 * 3600
+    LINK_STATUS_TTL_BROKEN: int = 6 * 3600
+    LINK_CHECK_OBEY_ROBOTS: bool = True
+    
+    # Cache robots.txt (app.services.robots_service)
+    ROBOTS_TTL: int = 24 * 3600
+    ROBOTS_ERROR_TTL: int = 600
+    # Timeout Redis (s) dla cache robots.txt - synchroniczny klient działa w wątku reaktora Scrapy
+    ROBOTS_REDIS_TIMEOUT: float = 0.5
+    
+    # Kolumnowy zapis stron z crawla (app.data_analysis.page_store)
+    PAGE_STORE_DIR: str = "/app/data/pages"
+    PAGE_STORE_BATCH_SIZE: int = 1000
+    
+    # Zbiorczy zapis AuditPage (app.services.page_writer)
+    PAGE_WRITER_BATCH_SIZE: int = 1000
+    PAGE_WRITER_FLUSH_INTERVAL: float = 5.0
+    PAGE_WRITER_USE_COPY: bool = True
+    
+    def get_timeout(self, operation: str) -> TimeoutConfig:
+        return self.TIMEOUTS.get(operation, self.TIMEOUTS["default"])
+    
+    def get_celery_timeout(self, operation: str) -> int:
+        return self.CELERY_TIMEOUTS.get(operation, self.CELERY_TIMEOUTS["default"])
+    
     @property
     def REDIS_URL(self) -> str:
         return f"redis://{self.REDIS_HOST}:{self.REDIS_PORT}/0"
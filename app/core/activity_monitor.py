@@ -1,6 +1,6 @@
 from typing import Dict, Any
 from datetime import datetime
-import json
+from app.core import json_codec
 from app.core.redis_client import redis_client, get_redis_client
 from app.models.user import User
 
@@ -25,7 +25,7 @@ class ActivityMonitor:
         }
         
         key = f"user_activity:{user_id}"
-        self.redis_client.lpush(key, json.dumps(activity))
+        self.redis_client.lpush(key, json_codec.dumpb(activity))
         self.redis_client.ltrim(key, 0, 999)  # Zachowaj ostatnie 1000 aktywności
         
         await self.check_suspicious_activity(user_id, action, details)
@@ -42,7 +42,7 @@ class ActivityMonitor:
         if not recent_activities:
             return False
             
-        activities = [json.loads(activity) for activity in recent_activities]
+        activities = [json_codec.loads(activity) for activity in recent_activities]
         
         # Sprawdź wzorce podejrzanych zachowań
         if action == 'login_failed':
@@ -71,7 +71,7 @@ class ActivityMonitor:
         }
         
         # Zapisz alert w Redis
-        self.redis_client.lpush('security_alerts', json.dumps(alert))
+        self.redis_client.lpush('security_alerts', json_codec.dumpb(alert))
         
         # Możesz dodać dodatkowe działania, np. blokowanie użytkownika, wysyłanie powiadomień, itp.
         if action == 'login_failed':
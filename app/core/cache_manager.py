@@ -1,8 +1,8 @@
 from typing import Any, Optional
-import json
 from datetime import datetime, timedelta
 from redis import Redis
 from ..config.settings import settings
+from . import json_codec
 
 class CacheManager:
     def __init__(self):
@@ -13,7 +13,7 @@ class CacheManager:
         """Pobiera dane z cache"""
         data = self.redis.get(key)
         if data:
-            return json.loads(data)
+            return json_codec.loads(data)
         return None
         
     async def set_cached(self, key: str, value: Any, expire: int = 3600) -> None:
@@ -21,7 +21,7 @@ class CacheManager:
         self.redis.setex(
             key,
             expire,
-            json.dumps(value, ensure_ascii=False)
+            json_codec.dumpb(value)
         )
         
     async def invalidate(self, pattern: str) -> None:
@@ -1,22 +1,82 @@
+import os
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import AsyncIterator
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import NullPool
 from app.core.settings import settings
 
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./sql_app.db")
+
+# Sterowniki asynchroniczne dla poszczególnych baz
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg"
+}
+
+def async_database_url(url: str) -> str:
+    """Ten sam adres bazy z asynchronicznym sterownikiem (aiosqlite / asyncpg)"""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}")
+    return parsed.set(drivername=ASYNC_DRIVERS[backend]).render_as_string(hide_password=False)
 
-engine = create_engine(
-    SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
-)
+_connect_args = {"check_same_thread": False} if SQLALCHEMY_DATABASE_URL.startswith("sqlite") else {}
+
+# Silnik synchroniczny - dla synchronicznych zadań Celery, wątków crawlera i migracji
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args=_connect_args)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Silniki asynchroniczne tworzone przy pierwszym użyciu - baza bez
+# sterownika async nie blokuje importu aplikacji ani zadań synchronicznych
+AsyncSessionLocal = async_sessionmaker(expire_on_commit=False, autoflush=False)
+TaskSessionLocal = async_sessionmaker(expire_on_commit=False, autoflush=False)
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+@lru_cache(maxsize=None)
+def get_async_engine(pooled: bool = True) -> AsyncEngine:
+    """Silnik async: z pulą dla FastAPI (jedna pętla procesu), bez puli dla zadań.
+
+    Zadania Celery uruchamiają każde swoją pętlę zdarzeń, a połączenia
+    asyncpg należą do pętli, w której powstały - połączenie z puli
+    użyte w pętli kolejnego zadania przestałoby działać.
+    """
+    url = async_database_url(SQLALCHEMY_DATABASE_URL)
+    if pooled:
+        return create_async_engine(url, pool_pre_ping=True)
+    return create_async_engine(url, poolclass=NullPool)
+
+async def get_db() -> AsyncIterator[AsyncSession]:
+    """Sesja bazy dla routerów (Depends).
+
+    Niezatwierdzone zmiany są wycofywane, gdy obsługa zakończy się wyjątkiem.
+    """
+    async with AsyncSessionLocal(bind=get_async_engine()) as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
+
+@asynccontextmanager
+async def db_session() -> AsyncIterator[AsyncSession]:
+    """`async with db_session() as db:` - sesja poza FastAPI (zadania, serwisy).
+
+    Połączenie jest otwierane dla sesji i zamykane razem z nią, więc
+    sesja działa w dowolnej pętli zdarzeń.
+    """
+    async with TaskSessionLocal(bind=get_async_engine(pooled=False)) as db:
+        try:
+            yield db
+        except Exception:
+            await db.rollback()
+            raise
 
 def init_db():
     """Inicjalizuje bazę danych"""
@@ -0,0 +1,283 @@
+import asyncio
+import logging
+import re
+import threading
+from typing import Any, Awaitable, Callable, Dict, Mapping, NamedTuple, Optional, Tuple, TypeVar
+
+import aiohttp
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config.settings import settings
+
+try:
+    import brotli  # noqa: F401 - aiohttp dekoduje br tylko z tym pakietem
+    ACCEPT_ENCODING = 'gzip, deflate, br'
+except ImportError:
+    ACCEPT_ENCODING = 'gzip, deflate'
+
+logger = logging.getLogger(__name__)
+
+RETRY_HTTP_CODES = frozenset({408, 429, 500, 502, 503, 504})
+HTML_CONTENT_TYPES = ('text/html', 'application/xhtml+xml')
+CHUNK_SIZE = 64 * 1024
+# Deklaracja kodowania w <meta> musi się zmieścić w pierwszych 1024 bajtach
+META_CHARSET = re.compile(rb'<meta[^>]+charset=["\']?([\w.:-]+)', re.I)
+
+T = TypeVar('T')
+
+DEFAULT_HEADERS = {
+    'User-Agent': settings.HTTP_USER_AGENT,
+    'Accept-Encoding': ACCEPT_ENCODING
+}
+
+class HTTPResponse(NamedTuple):
+    url: str
+    status: int
+    headers: Dict[str, str]
+    body: bytes
+    # Adresy kolejnych przekierowań przed `url`
+    history: Tuple[str, ...] = ()
+    charset: Optional[str] = None
+
+    @property
+    def text(self) -> str:
+        return self.body.decode(self.charset or 'utf-8', 'replace')
+
+class ResponseRejected(ValueError):
+    """Odpowiedź odrzucona po nagłówkach albo w trakcie pobierania treści"""
+
+class HTMLPage(NamedTuple):
+    url: str
+    status: int
+    headers: Dict[str, str]
+    text: str
+    encoding: str
+
+def check_html_headers(status: int, headers: Mapping[str, str], max_bytes: Optional[int] = None) -> None:
+    """Odrzuca odpowiedź przed pobraniem treści: status, Content-Type, Content-Length"""
+    if not 200 <= status < 300:
+        raise ResponseRejected(f"HTTP {status}")
+    # Brak nagłówka - traktujemy jak HTML (jak dotąd crawler)
+    content_type = headers.get('Content-Type', '').split(';')[0].strip().lower()
+    if content_type and content_type not in HTML_CONTENT_TYPES:
+        raise ResponseRejected(f"Not HTML: {content_type}")
+    length = headers.get('Content-Length', '')
+    if max_bytes and length.isdigit() and int(length) > max_bytes:
+        raise ResponseRejected(f"Body too large: {length} bytes")
+
+def decode_html(body: bytes, charset: Optional[str] = None) -> Tuple[str, str]:
+    """Dekoduje treść raz: charset z nagłówka, potem z <meta>, na końcu utf-8"""
+    candidates = [charset]
+    match = META_CHARSET.search(body[:1024])
+    if match:
+        candidates.append(match.group(1).decode('ascii', 'ignore'))
+    for encoding in candidates:
+        if not encoding:
+            continue
+        try:
+            return body.decode(encoding, 'replace'), encoding
+        except LookupError:
+            continue
+    return body.decode('utf-8', 'replace'), 'utf-8'
+
+def client_timeout(operation: str = "default") -> aiohttp.ClientTimeout:
+    """Timeout aiohttp dla operacji z settings.TIMEOUTS"""
+    timeout = settings.get_timeout(operation)
+    return aiohttp.ClientTimeout(total=timeout.total, connect=timeout.connect, sock_read=timeout.read)
+
+def retry_delay(attempt: int) -> float:
+    """Odstęp przed kolejną próbą (wykładniczo, jak tenacity.wait_exponential)"""
+    config = settings.RETRY_CONFIG
+    return min(config.min_wait * 2 ** attempt, config.max_wait)
+
+# Jedna pula połączeń na pętlę zdarzeń - sesji aiohttp nie wolno używać
+# w innej pętli, a zadania Celery tworzą własne pętle. Sesja trzyma
+# referencję do swojej pętli, więc wpis trzeba usunąć jawnie
+# (`close_http_session` / `run_task_loop`).
+_sessions: Dict[asyncio.AbstractEventLoop, aiohttp.ClientSession] = {}
+
+def _drop_closed_loops() -> None:
+    """Zapomina sesje pętli zamkniętych bez `close_http_session` (nie da się ich już zamknąć)"""
+    for loop in [loop for loop in _sessions if loop.is_closed()]:
+        logger.warning("HTTP session of a closed event loop was not closed")
+        del _sessions[loop]
+
+def get_http_session(limit: Optional[int] = None, limit_per_host: Optional[int] = None) -> aiohttp.ClientSession:
+    """Współdzielona sesja aiohttp bieżącej pętli: keep-alive, cache DNS, kompresja.
+
+    Limity puli obowiązują od pierwszego wywołania w danej pętli.
+    """
+    loop = asyncio.get_running_loop()
+    session = _sessions.get(loop)
+    if session is None or session.closed:
+        _drop_closed_loops()
+        connector = aiohttp.TCPConnector(
+            limit=limit or settings.HTTP_POOL_SIZE,
+            limit_per_host=limit_per_host or settings.HTTP_POOL_SIZE_PER_HOST,
+            ttl_dns_cache=settings.HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=settings.HTTP_KEEPALIVE_TIMEOUT
+        )
+        session = aiohttp.ClientSession(
+            connector=connector,
+            headers=DEFAULT_HEADERS,
+            timeout=client_timeout()
+        )
+        _sessions[loop] = session
+    return session
+
+async def close_http_session() -> None:
+    """Zamyka sesję bieżącej pętli (przed zamknięciem pętli zadania)"""
+    session = _sessions.pop(asyncio.get_running_loop(), None)
+    if session is not None and not session.closed:
+        await session.close()
+
+def run_task_loop(coro: Awaitable[T]) -> T:
+    """Wykonuje korutynę zadania Celery we własnej pętli i sprząta po niej.
+
+    Przed zamknięciem pętli zamyka jej sesję HTTP (połączenia, connector)
+    i niedokończone generatory asynchroniczne.
+    """
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    try:
+        return loop.run_until_complete(coro)
+    finally:
+        try:
+            loop.run_until_complete(close_http_session())
+            loop.run_until_complete(loop.shutdown_asyncgens())
+        finally:
+            asyncio.set_event_loop(None)
+            loop.close()
+
+async def request_with_retries(
+    session: aiohttp.ClientSession,
+    method: str,
+    url: str,
+    read: Callable[[aiohttp.ClientResponse], Awaitable[T]],
+    **kwargs: Any
+) -> T:
+    """Request z ponowieniami wg settings.RETRY_CONFIG; `read` przetwarza odpowiedź.
+
+    Błędy połączenia, timeouty i kody z RETRY_HTTP_CODES są ponawiane;
+    po ostatniej próbie wyjątek jest przekazywany dalej, a odpowiedź
+    z kodem błędu trafia do `read`.
+    """
+    attempts = settings.RETRY_CONFIG.max_attempts
+    for attempt in range(attempts):
+        last = attempt == attempts - 1
+        try:
+            async with session.request(method, url, **kwargs) as response:
+                if response.status in RETRY_HTTP_CODES and not last:
+                    logger.debug(f"{method} {url} returned {response.status}, retrying")
+                else:
+                    return await read(response)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError) as e:
+            if last:
+                raise
+            logger.debug(f"{method} {url} failed ({e!r}), retrying")
+        await asyncio.sleep(retry_delay(attempt))
+
+async def fetch(
+    url: str,
+    method: str = "GET",
+    operation: str = "default",
+    session: Optional[aiohttp.ClientSession] = None,
+    **kwargs: Any
+) -> HTTPResponse:
+    """Wykonuje request przez współdzieloną pulę i czyta całą odpowiedź"""
+    async def read(response: aiohttp.ClientResponse) -> HTTPResponse:
+        return HTTPResponse(
+            url=str(response.url),
+            status=response.status,
+            headers=dict(response.headers),
+            body=await response.read(),
+            history=tuple(str(r.url) for r in response.history),
+            charset=response.charset
+        )
+
+    kwargs.setdefault('timeout', client_timeout(operation))
+    return await request_with_retries(session or get_http_session(), method, url, read, **kwargs)
+
+async def read_capped(response: aiohttp.ClientResponse, max_bytes: Optional[int]) -> bytes:
+    """Czyta treść strumieniowo, przerywając po przekroczeniu `max_bytes`"""
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+        body += chunk
+        if max_bytes and len(body) > max_bytes:
+            raise ResponseRejected(f"Body exceeds {max_bytes} bytes")
+    return bytes(body)
+
+async def fetch_html(
+    url: str,
+    operation: str = "default",
+    max_bytes: Optional[int] = None,
+    session: Optional[aiohttp.ClientSession] = None,
+    **kwargs: Any
+) -> HTMLPage:
+    """Pobiera stronę HTML, odrzucając inne odpowiedzi już po nagłówkach.
+
+    Treść ponad `max_bytes` (domyślnie HTTP_MAX_BODY_BYTES) przerywa
+    pobieranie; rzuca ResponseRejected.
+    """
+    max_bytes = max_bytes or settings.HTTP_MAX_BODY_BYTES
+
+    async def read(response: aiohttp.ClientResponse) -> HTMLPage:
+        check_html_headers(response.status, response.headers, max_bytes)
+        text, encoding = decode_html(await read_capped(response, max_bytes), response.charset)
+        if not text.strip():
+            raise ResponseRejected("Empty body")
+        return HTMLPage(str(response.url), response.status, dict(response.headers), text, encoding)
+
+    kwargs.setdefault('timeout', client_timeout(operation))
+    return await request_with_retries(session or get_http_session(), "GET", url, read, **kwargs)
+
+def sync_timeout(operation: str = "default") -> Tuple[int, int]:
+    """Timeout (connect, read) dla requests"""
+    timeout = settings.get_timeout(operation)
+    return timeout.connect, timeout.read
+
+_local = threading.local()
+
+def get_sync_session() -> requests.Session:
+    """Sesja requests z pulą keep-alive i retry, osobna dla każdego wątku"""
+    session = getattr(_local, 'session', None)
+    if session is None:
+        config = settings.RETRY_CONFIG
+        adapter = HTTPAdapter(
+            pool_connections=settings.HTTP_POOL_SIZE_PER_HOST,
+            pool_maxsize=settings.HTTP_POOL_SIZE_PER_HOST,
+            max_retries=Retry(
+                total=config.max_attempts - 1,
+                backoff_factor=config.min_wait,
+                status_forcelist=RETRY_HTTP_CODES,
+                allowed_methods=frozenset({'GET', 'HEAD', 'OPTIONS'}),
+                raise_on_status=False
+            )
+        )
+        session = requests.Session()
+        session.headers.update(DEFAULT_HEADERS)
+        session.mount('http://', adapter)
+        session.mount('https://', adapter)
+        _local.session = session
+    return session
+
+def fetch_html_sync(url: str, operation: str = "default", max_bytes: Optional[int] = None) -> HTMLPage:
+    """Synchroniczny odpowiednik `fetch_html` (requests, stream=True)"""
+    max_bytes = max_bytes or settings.HTTP_MAX_BODY_BYTES
+    with get_sync_session().get(url, timeout=sync_timeout(operation), stream=True) as response:
+        check_html_headers(response.status_code, response.headers, max_bytes)
+        body = bytearray()
+        for chunk in response.iter_content(CHUNK_SIZE):
+            body += chunk
+            if len(body) > max_bytes:
+                raise ResponseRejected(f"Body exceeds {max_bytes} bytes")
+        # requests zgaduje ISO-8859-1 dla text/* bez charsetu - bierzemy tylko jawny
+        charset = requests.utils.get_encoding_from_headers(response.headers)
+        if charset == 'ISO-8859-1' and 'charset' not in response.headers.get('Content-Type', '').lower():
+            charset = None
+        text, encoding = decode_html(bytes(body), charset)
+        if not text.strip():
+            raise ResponseRejected("Empty body")
+        return HTMLPage(response.url, response.status_code, dict(response.headers), text, encoding)
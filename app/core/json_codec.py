@@ -0,0 +1,54 @@
+"""Wspólny koder JSON dla danych audytu, cache i logów aktywności.
+
+Korzysta z orjson, jeśli jest zainstalowany, a w przeciwnym razie
+z biblioteki standardowej. Oba warianty dają to samo: UTF-8 bez
+escapowania znaków spoza ASCII, daty jako ISO 8601, klucze inne niż
+str zamieniane na tekst.
+"""
+import datetime
+import json
+from typing import Any, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# orjson.JSONDecodeError dziedziczy po json.JSONDecodeError
+JSONDecodeError = json.JSONDecodeError
+
+BACKEND = 'orjson' if orjson is not None else 'json'
+
+def _default(obj: Any) -> Any:
+    if isinstance(obj, (datetime.datetime, datetime.date, datetime.time)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_NON_STR_KEYS
+
+    def dumpb(obj: Any) -> bytes:
+        """JSON jako bajty UTF-8 (np. do Redis)"""
+        return orjson.dumps(obj, option=_OPTIONS)
+
+    def dumps(obj: Any) -> str:
+        """JSON jako tekst (np. do kolumn Text)"""
+        return orjson.dumps(obj, option=_OPTIONS).decode('utf-8')
+
+    def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        return orjson.loads(data)
+else:
+    _encoder = json.JSONEncoder(ensure_ascii=False, separators=(',', ':'), default=_default)
+
+    def dumpb(obj: Any) -> bytes:
+        """JSON jako bajty UTF-8 (np. do Redis)"""
+        return _encoder.encode(obj).encode('utf-8')
+
+    def dumps(obj: Any) -> str:
+        """JSON jako tekst (np. do kolumn Text)"""
+        return _encoder.encode(obj)
+
+    def loads(data: Union[str, bytes, bytearray, memoryview]) -> Any:
+        if isinstance(data, memoryview):
+            data = data.tobytes()
+        return json.loads(data)
@@ -3,7 +3,7 @@ from fastapi import HTTPException, status, Depends, Request
 from fastapi.responses import JSONResponse
 from app.models.user import User, UserRole, SubscriptionTier
 from app.models.audit import Audit
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from functools import wraps
 from typing import List, Optional, Callable
 from app.core.auth import get_current_user
@@ -74,9 +74,9 @@ def require_subscription(required_tier: SubscriptionTier):
         return wrapper
     return decorator
 
-async def check_permissions(user: User, audit_id: int, db: Session) -> Optional[Audit]:
+async def check_permissions(user: User, audit_id: int, db: AsyncSession) -> Optional[Audit]:
     """Sprawdza uprawnienia użytkownika do dostępu do audytu"""
-    audit = db.query(Audit).filter(Audit.id == audit_id).first()
+    audit = await db.get(Audit, audit_id)
     if not audit:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
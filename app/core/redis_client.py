@@ -1,4 +1,5 @@
 from redis import Redis
+from redis.asyncio import Redis as AsyncRedis
 from app.config.settings import settings
 
 def get_redis_client(host=None):
@@ -7,4 +8,12 @@ def get_redis_client(host=None):
         return Redis(host=host, port=settings.REDIS_PORT, db=0)
     return Redis.from_url(settings.REDIS_URL)
 
-redis_client = get_redis_client() 
\ No newline at end of file
+redis_client = get_redis_client() 
+
+def get_async_redis_client() -> AsyncRedis:
+    """Klient redis.asyncio dla kodu działającego w pętli zdarzeń.
+
+    Połączenia należą do pętli, w której powstały - klienta tworzymy
+    w zadaniu i zamykamy przed końcem jego pętli (`async with`).
+    """
+    return AsyncRedis.from_url(settings.REDIS_URL)
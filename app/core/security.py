@@ -4,7 +4,7 @@ from jose import JWTError, jwt
 from passlib.context import CryptContext
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.settings import settings
 from app.core.database import get_db
 import logging
@@ -97,7 +97,7 @@ class SecurityService:
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Pobieranie aktualnego użytkownika na podstawie tokenu"""
     credentials_exception = HTTPException(
@@ -114,7 +114,7 @@ async def get_current_user(
         raise credentials_exception
     
     from app.models.user import User  # Import przeniesiony tutaj aby uniknąć cyklicznego importu
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user = await db.get(User, int(user_id))
     if user is None:
         raise credentials_exception
     return user
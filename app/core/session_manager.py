@@ -1,8 +1,8 @@
 from datetime import datetime, timedelta
 from typing import Optional
+from app.core import json_codec
 from app.core.redis_client import redis_client
 from app.models.user import User
-import json
 
 class SessionManager:
     SESSION_TIMEOUT = 30  # minuty
@@ -16,18 +16,18 @@ class SessionManager:
         redis_client.setex(
             f"session:{session_id}",
             self.SESSION_TIMEOUT * 60,
-            json.dumps(session_data)
+            json_codec.dumpb(session_data)
         )
     
     async def update_session_activity(self, session_id: str) -> None:
         session = redis_client.get(f"session:{session_id}")
         if session:
-            session_data = json.loads(session)
+            session_data = json_codec.loads(session)
             session_data['last_activity'] = datetime.utcnow().isoformat()
             redis_client.setex(
                 f"session:{session_id}",
                 self.SESSION_TIMEOUT * 60,
-                json.dumps(session_data)
+                json_codec.dumpb(session_data)
             ) 
 
     async def is_session_valid(self, session_id: str) -> bool:
@@ -36,9 +36,9 @@ class SessionManager:
             return False
         
         try:
-            session_data = json.loads(session)
+            session_data = json_codec.loads(session)
             last_activity = datetime.fromisoformat(session_data['last_activity'])
             time_diff = datetime.utcnow() - last_activity
             return time_diff.total_seconds() < self.SESSION_TIMEOUT * 60
-        except (json.JSONDecodeError, KeyError, ValueError):
+        except (json_codec.JSONDecodeError, KeyError, ValueError):
             return False 
\ No newline at end of file
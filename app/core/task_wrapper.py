@@ -3,7 +3,6 @@ from typing import Callable, Any
 from .error_handling import handle_task_error, TaskExecutionError
 from .rate_limiter import RateLimiter
 from .cache_manager import CacheManager
-from ..database_utils import get_db
 
 rate_limiter = RateLimiter()
 cache_manager = CacheManager()
@@ -23,14 +22,13 @@ def unified_task_handler():
                 # Sprawdź rate limit
                 await rate_limiter.wait_for_slot(task_name)
 
-                # Wykonaj zadanie
-                async with get_db() as db:
-                    result = await task_func(*args, **kwargs)
-                    
-                    # Cache wynik
-                    await cache_manager.set_cached(cache_key, result)
-                    
-                    return result
+                # Wykonaj zadanie (sesję bazy zadanie otwiera samo przez db_session)
+                result = await task_func(*args, **kwargs)
+                
+                # Cache wynik
+                await cache_manager.set_cached(cache_key, result)
+                
+                return result
 
             except Exception as exc:
                 error_details = await handle_task_error(task_name, exc)
@@ -0,0 +1,202 @@
+"""Kolumnowy zapis stron z crawla (Arrow IPC) - jeden katalog na audyt.
+
+Każdy crawl (albo partycja crawla rozproszonego) zapisuje własny plik
+`part-<n>.arrow`. Pliki są nieskompresowane, więc przy analizie mapujemy
+je do pamięci bez kopiowania i liczymy statystyki wektorowo, bez
+słownika na każdą stronę.
+"""
+import glob
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional
+from urllib.parse import urlparse
+
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+
+from ..config.settings import settings
+
+LINK_TYPE = pa.struct([('url', pa.string()), ('text', pa.string())])
+IMAGE_TYPE = pa.struct([('src', pa.string()), ('alt', pa.string())])
+
+PAGE_SCHEMA = pa.schema([
+    ('url', pa.string()),
+    ('status_code', pa.int32()),
+    ('title', pa.string()),
+    ('meta_description', pa.string()),
+    ('title_length', pa.int32()),
+    ('description_length', pa.int32()),
+    ('h1_count', pa.int32()),
+    ('images_count', pa.int32()),
+    ('images_missing_alt', pa.int32()),
+    ('links_count', pa.int32()),
+    ('internal_links', pa.int32()),
+    ('external_links', pa.int32()),
+    ('redirect_count', pa.int32()),
+    ('needs_rendering', pa.bool_()),
+    ('unchanged', pa.bool_()),
+    ('etag', pa.string()),
+    ('last_modified', pa.string()),
+    ('content_hash', pa.string()),
+    ('sitemap_lastmod', pa.string()),
+    ('h1_tags', pa.list_(pa.string())),
+    ('links', pa.list_(LINK_TYPE)),
+    ('images', pa.list_(IMAGE_TYPE)),
+])
+
+# Kolumny zagnieżdżone pomijane w eksporcie CSV
+NESTED_COLUMNS = ('h1_tags', 'links', 'images')
+EXPORT_FORMATS = ('parquet', 'arrow', 'csv')
+
+def audit_dir(audit_id: int, root: Optional[str] = None) -> str:
+    return os.path.join(root or settings.PAGE_STORE_DIR, f"audit_{audit_id}")
+
+def part_path(audit_id: int, part: int = 0, root: Optional[str] = None) -> str:
+    return os.path.join(audit_dir(audit_id, root), f"part-{part}.arrow")
+
+def clear_pages(audit_id: int, root: Optional[str] = None) -> None:
+    """Usuwa pliki poprzedniego crawla - nowy crawl nie może dziedziczyć starych partycji"""
+    directory = audit_dir(audit_id, root)
+    for path in glob.glob(os.path.join(directory, 'part-*.arrow*')):
+        os.remove(path)
+
+def _append_page(columns: Dict[str, List[Any]], page: Dict[str, Any]) -> None:
+    """Dopisuje wartości jednej strony (format z `extract_page_data`) do list kolumn"""
+    host = urlparse(page.get('url') or '').netloc
+    links = [
+        {'url': link.get('url'), 'text': link.get('text')} if isinstance(link, dict) else {'url': link, 'text': None}
+        for link in page.get('links') or []
+    ]
+    images = [
+        {'src': img.get('src'), 'alt': img.get('alt')} if isinstance(img, dict) else {'src': img, 'alt': None}
+        for img in page.get('images') or []
+    ]
+    internal = sum(1 for link in links if urlparse(link['url'] or '').netloc == host)
+    h1_tags = page.get('h1_tags') or []
+    lastmod = page.get('sitemap_lastmod')
+    columns['url'].append(page.get('url'))
+    columns['status_code'].append(page.get('status_code'))
+    columns['title'].append(page.get('title'))
+    columns['meta_description'].append(page.get('meta_description'))
+    columns['title_length'].append(len((page.get('title') or '').strip()))
+    columns['description_length'].append(len((page.get('meta_description') or '').strip()))
+    columns['h1_count'].append(len(h1_tags))
+    columns['images_count'].append(len(images))
+    columns['images_missing_alt'].append(sum(1 for img in images if not (img['alt'] or '').strip()))
+    columns['links_count'].append(len(links))
+    columns['internal_links'].append(internal)
+    columns['external_links'].append(len(links) - internal)
+    columns['redirect_count'].append(len(page.get('redirect_chain') or []))
+    columns['needs_rendering'].append(bool(page.get('needs_rendering')))
+    columns['unchanged'].append(bool(page.get('unchanged')))
+    columns['etag'].append(page.get('etag'))
+    columns['last_modified'].append(page.get('last_modified'))
+    columns['content_hash'].append(page.get('content_hash'))
+    columns['sitemap_lastmod'].append(str(lastmod) if lastmod is not None else None)
+    columns['h1_tags'].append(h1_tags)
+    columns['links'].append(links)
+    columns['images'].append(images)
+
+class PageStoreWriter:
+    """Dopisuje strony partiami (RecordBatch) do pliku Arrow IPC audytu.
+
+    Plik powstaje pod tymczasową nazwą i jest podmieniany dopiero
+    w `close()`, więc ponowione zadanie nie zostawia połowy pliku.
+    """
+
+    def __init__(self, audit_id: int, part: int = 0, batch_size: Optional[int] = None,
+                 root: Optional[str] = None):
+        self.path = part_path(audit_id, part, root)
+        self.batch_size = batch_size or settings.PAGE_STORE_BATCH_SIZE
+        self.rows = 0
+        self._tmp_path = self.path + '.tmp'
+        self._columns: Dict[str, List[Any]] = {name: [] for name in PAGE_SCHEMA.names}
+        self._pending = 0
+        self._sink: Optional[pa.OSFile] = None
+        self._writer: Optional[pa.RecordBatchFileWriter] = None
+
+    def _open(self) -> None:
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        self._sink = pa.OSFile(self._tmp_path, 'wb')
+        self._writer = pa.ipc.new_file(self._sink, PAGE_SCHEMA)
+
+    def write(self, page: Dict[str, Any]) -> None:
+        _append_page(self._columns, page)
+        self._pending += 1
+        self.rows += 1
+        if self._pending >= self.batch_size:
+            self.flush()
+
+    def write_many(self, pages: Iterable[Dict[str, Any]]) -> None:
+        for page in pages:
+            self.write(page)
+
+    def flush(self) -> None:
+        if not self._pending:
+            return
+        if self._writer is None:
+            self._open()
+        self._writer.write_batch(pa.RecordBatch.from_pydict(self._columns, schema=PAGE_SCHEMA))
+        self._columns = {name: [] for name in PAGE_SCHEMA.names}
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        if self._writer is None:
+            self._open()
+        self._writer.close()
+        self._sink.close()
+        os.replace(self._tmp_path, self.path)
+
+    def abort(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._sink.close()
+            os.remove(self._tmp_path)
+
+    def __enter__(self) -> 'PageStoreWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+def open_pages(audit_id: int, columns: Optional[List[str]] = None,
+               root: Optional[str] = None) -> Optional[pa.Table]:
+    """Strony audytu jako tabela Arrow zmapowana do pamięci (None, gdy brak plików)"""
+    paths = sorted(glob.glob(os.path.join(audit_dir(audit_id, root), 'part-*.arrow')))
+    if not paths:
+        return None
+    tables = [pa.ipc.open_file(pa.memory_map(path, 'r')).read_all() for path in paths]
+    table = pa.concat_tables(tables) if len(tables) > 1 else tables[0]
+    return table.select(columns) if columns else table
+
+def export_pages(audit_id: int, fmt: str = 'parquet', root: Optional[str] = None) -> str:
+    """Zapisuje strony audytu do nowego pliku tymczasowego w formacie `fmt`.
+
+    Każde wywołanie dostaje własny plik (równoległe eksporty się nie
+    nadpisują); usunięcie go po wysłaniu należy do wywołującego.
+    """
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    table = open_pages(audit_id, root=root)
+    if table is None:
+        raise FileNotFoundError(f"No crawl data stored for audit {audit_id}")
+
+    fd, path = tempfile.mkstemp(prefix=f"audit_{audit_id}_pages_", suffix=f".{fmt}")
+    os.close(fd)
+    try:
+        if fmt == 'parquet':
+            pq.write_table(table, path, compression='zstd')
+        elif fmt == 'arrow':
+            with pa.ipc.new_file(path, table.schema) as writer:
+                writer.write_table(table)
+        else:
+            pa_csv.write_csv(table.drop(list(NESTED_COLUMNS)), path)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
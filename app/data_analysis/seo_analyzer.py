@@ -1,19 +1,29 @@
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import Dict, List, Any
+import pyarrow as pa
+import pyarrow.compute as pc
+from typing import Dict, List, Any, Optional
 from urllib.parse import urlparse
 import json
 import io
 import base64
 
+from .page_store import open_pages
+
 class SEODataAnalyzer:
-    def __init__(self, audit_data: Dict[str, Any]):
+    def __init__(self, audit_data: Dict[str, Any], pages: Optional[pa.Table] = None):
         self.audit_data = audit_data
+        # Strony z crawla w formacie kolumnowym (page_store)
+        self.pages = pages
         self.df_links = self._prepare_links_df()
         self.df_images = self._prepare_images_df()
         self.df_headings = self._prepare_headings_df()
     
+    @classmethod
+    def for_audit(cls, audit_id: int, audit_data: Dict[str, Any]) -> 'SEODataAnalyzer':
+        return cls(audit_data, open_pages(audit_id))
+    
     def _prepare_links_df(self) -> pd.DataFrame:
         links = self.audit_data.get('links', [])
         return pd.DataFrame(links)
@@ -56,6 +66,40 @@ class SEODataAnalyzer:
         }
         return stats
     
+    def generate_site_stats(self) -> Dict[str, Any]:
+        """Statystyki całej witryny liczone wektorowo na kolumnach Arrow"""
+        if self.pages is None or self.pages.num_rows == 0:
+            return {}
+        pages = self.pages
+        
+        def count(mask) -> int:
+            return int(pc.sum(mask).as_py() or 0)
+        
+        titles = pc.value_counts(pc.drop_null(pages['title']))
+        statuses = pc.value_counts(pages['status_code'])
+        h1_count = pages['h1_count']
+        stats = {
+            'total_pages': pages.num_rows,
+            'status_distribution': {
+                str(value): int(n) for value, n in zip(
+                    statuses.field('values').to_pylist(), statuses.field('counts').to_pylist()
+                )
+            },
+            'missing_title': count(pc.equal(pages['title_length'], 0)),
+            'title_too_long': count(pc.greater(pages['title_length'], 65)),
+            'missing_description': count(pc.equal(pages['description_length'], 0)),
+            'description_too_long': count(pc.greater(pages['description_length'], 160)),
+            'duplicate_titles': count(pc.greater(titles.field('counts'), 1)),
+            'no_h1': count(pc.equal(h1_count, 0)),
+            'multiple_h1': count(pc.greater(h1_count, 1)),
+            'images_missing_alt': int(pc.sum(pages['images_missing_alt']).as_py() or 0),
+            'redirected_pages': count(pc.greater(pages['redirect_count'], 0)),
+            'needs_rendering': count(pages['needs_rendering']),
+            'avg_internal_links': round(pc.mean(pages['internal_links']).as_py() or 0, 1),
+            'avg_external_links': round(pc.mean(pages['external_links']).as_py() or 0, 1)
+        }
+        return stats
+    
     def generate_visualizations(self) -> Dict[str, str]:
         """Generuje wykresy jako base64 strings"""
         visualizations = {}
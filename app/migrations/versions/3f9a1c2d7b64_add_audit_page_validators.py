@@ -0,0 +1,30 @@
+"""Add audit page validators
+
+Revision ID: 3f9a1c2d7b64
+Revises: eadbcccbdb34
+Create Date: 2026-10-18 10:12:31.408215
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f9a1c2d7b64'
+down_revision = 'eadbcccbdb34'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('audit_pages', sa.Column('etag', sa.String(), nullable=True))
+    op.add_column('audit_pages', sa.Column('last_modified', sa.String(), nullable=True))
+    op.add_column('audit_pages', sa.Column('content_hash', sa.String(length=32), nullable=True))
+    op.create_index('idx_audit_page_audit_url', 'audit_pages', ['audit_id', 'url'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_audit_page_audit_url', table_name='audit_pages')
+    op.drop_column('audit_pages', 'content_hash')
+    op.drop_column('audit_pages', 'last_modified')
+    op.drop_column('audit_pages', 'etag')
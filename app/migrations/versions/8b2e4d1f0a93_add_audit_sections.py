@@ -0,0 +1,35 @@
+"""Add audit sections
+
+Revision ID: 8b2e4d1f0a93
+Revises: 3f9a1c2d7b64
+Create Date: 2026-10-18 14:05:12.518734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b2e4d1f0a93'
+down_revision = '3f9a1c2d7b64'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('audit_sections',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('audit_id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=64), nullable=False),
+        sa.Column('data', sa.Text(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(['audit_id'], ['audits.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('audit_id', 'name', name='uq_audit_section_audit_name')
+    )
+    op.create_index(op.f('ix_audit_sections_id'), 'audit_sections', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_audit_sections_id'), table_name='audit_sections')
+    op.drop_table('audit_sections')
@@ -0,0 +1,31 @@
+"""Unique audit page url
+
+Revision ID: c41d7e9a2b58
+Revises: 8b2e4d1f0a93
+Create Date: 2026-10-18 16:40:27.193046
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c41d7e9a2b58'
+down_revision = '8b2e4d1f0a93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Duplikaty z ponowionych crawli - zostaje najnowszy rekord strony
+    op.execute(
+        "DELETE FROM audit_pages WHERE id NOT IN "
+        "(SELECT MAX(id) FROM audit_pages GROUP BY audit_id, url)"
+    )
+    op.drop_index('idx_audit_page_audit_url', table_name='audit_pages')
+    op.create_index('idx_audit_page_audit_url', 'audit_pages', ['audit_id', 'url'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_audit_page_audit_url', table_name='audit_pages')
+    op.create_index('idx_audit_page_audit_url', 'audit_pages', ['audit_id', 'url'], unique=False)
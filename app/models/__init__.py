@@ -2,5 +2,6 @@ from app.core.database import Base
 from .user import User
 from .audit import Audit
 from .audit_page import AuditPage
+from .audit_section import AuditSection
 
-__all__ = ['Base', 'User', 'Audit', 'AuditPage']
+__all__ = ['Base', 'User', 'Audit', 'AuditPage', 'AuditSection']
@@ -1,16 +1,25 @@
-from sqlalchemy import Column, Integer, String, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from app.core import Base
 from datetime import datetime
 
 class AuditPage(Base):
     __tablename__ = "audit_pages"
+    __table_args__ = (
+        Index('idx_audit_page_audit_url', 'audit_id', 'url', unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     url = Column(String, index=True)
     title = Column(String)
+    meta_description = Column(String, nullable=True)
     content = Column(String)
+    analysis_data = Column(Text, nullable=True)  # Przechowywane jako JSON
     status_code = Column(Integer)
+    # Walidatory do warunkowego crawla przy ponownym audycie
+    etag = Column(String, nullable=True)
+    last_modified = Column(String, nullable=True)
+    content_hash = Column(String(32), nullable=True)
     created_at = Column(DateTime, default=datetime.utcnow)
     audit_id = Column(Integer, ForeignKey("audits.id"))
 
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, Integer, String, Text, ForeignKey, DateTime, UniqueConstraint
+from app.core import Base
+from datetime import datetime
+
+class AuditSection(Base):
+    """Jedna sekcja wyników audytu (np. imageAudit, linkChecker) zapisywana osobno"""
+    __tablename__ = "audit_sections"
+    __table_args__ = (
+        UniqueConstraint('audit_id', 'name', name='uq_audit_section_audit_name'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    audit_id = Column(Integer, ForeignKey("audits.id", ondelete="CASCADE"), nullable=False)
+    name = Column(String(64), nullable=False)
+    data = Column(Text, nullable=True)  # Przechowywane jako JSON
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -8,9 +8,9 @@ from app.core.permissions import require_subscription
 from typing import List, Dict, Any, Optional
 import json
 from pydantic import BaseModel, HttpUrl
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.audit_service import AuditService
-from app.db.database import get_db
+from app.core.database import get_db
 
 router = APIRouter(prefix="/api/v1/audits", tags=["audit"])
 security_service = SecurityService()
@@ -35,7 +35,7 @@ async def list_audits(current_user: User = Depends(get_current_user)):
 async def create_audit(
     audit: AuditCreateRequest,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     audit_service = AuditService(db)
     return await audit_service.create_audit(audit, current_user.id)
@@ -1,6 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core import get_db, SecurityService, get_password_hash, verify_password
 from app.models.user import User
 from app.schemas.user import UserCreate
@@ -12,10 +13,10 @@ security_service = SecurityService()
 logger = logging.getLogger(__name__)
 
 @router.post("/register")
-async def register(user: UserCreate, db: Session = Depends(get_db)):
+async def register(user: UserCreate, db: AsyncSession = Depends(get_db)):
     """Rejestracja nowego użytkownika"""
     # Sprawdź czy użytkownik już istnieje
-    db_user = db.query(User).filter(User.email == user.email).first()
+    db_user = await db.scalar(select(User).where(User.email == user.email))
     if db_user:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -31,13 +32,13 @@ async def register(user: UserCreate, db: Session = Depends(get_db)):
         is_active=False  # Użytkownik musi aktywować konto
     )
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.commit()
+    await db.refresh(db_user)
     
     return {"message": "User created successfully"}
 
 @router.post("/login")
-async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session = Depends(get_db)):
+async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: AsyncSession = Depends(get_db)):
     """Logowanie użytkownika"""
     logger.debug(f"Próba logowania dla użytkownika: {form_data.username}")
     
@@ -49,7 +50,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         )
     
     # Znajdź użytkownika
-    user = db.query(User).filter(User.email == form_data.username).first()
+    user = await db.scalar(select(User).where(User.email == form_data.username))
     if not user:
         logger.warning(f"Nieudana próba logowania - użytkownik nie istnieje: {form_data.username}")
         raise HTTPException(
@@ -84,13 +85,13 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         # Jeśli przekroczono limit prób, zablokuj konto
         if user.login_attempts >= 5:
             user.blocked_until = datetime.utcnow() + timedelta(minutes=30)
-            db.commit()
+            await db.commit()
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Too many login attempts. Account blocked for 30 minutes"
             )
         
-        db.commit()
+        await db.commit()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -100,7 +101,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
     user.login_attempts = 0
     user.last_login_attempt = None
     user.blocked_until = None
-    db.commit()
+    await db.commit()
     
     # Wygeneruj tokeny
     tokens = security_service.create_tokens(user.id)
@@ -1,20 +1,25 @@
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import os
 
 from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
-from sqlalchemy.orm import Session
+from fastapi.responses import FileResponse
+from starlette.background import BackgroundTask
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models.audit import AuditCreate, AuditResponse
 from app.services.audit_service import AuditService
 from app.core.security import get_current_user
 from app.core.permissions import check_permissions
 from app.core.database import get_db
+from app.data_analysis.page_store import export_pages
 
 router = APIRouter()
 
 @router.post("/create", response_model=AuditResponse)
 async def create_audit(
     audit_data: AuditCreate,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     try:
@@ -27,7 +32,7 @@ async def create_audit(
             meta_title=audit.meta_title,
             meta_description=audit.meta_description,
             status_code=audit.status_code,
-            audit_data=audit.audit_data,
+            audit_data=await audit_service.get_audit_data(audit.id),
             suggestions_data=audit.suggestions_data,
             owner_id=audit.owner_id,
             created_at=audit.created_at,
@@ -39,13 +44,13 @@ async def create_audit(
 @router.get("/{audit_id}/status")
 async def get_audit_status(
     audit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     try:
         audit_service = AuditService(db)
         await check_permissions(current_user, audit_id, db)
-        status = audit_service.get_audit_status(audit_id)
+        status = await audit_service.get_audit_status(audit_id)
         return {"status": status}
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -54,13 +59,13 @@ async def get_audit_status(
 async def analyze_audit(
     audit_id: int,
     analysis_type: str,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     try:
         audit_service = AuditService(db)
         await check_permissions(current_user, audit_id, db)
-        result = audit_service.analyze_audit(audit_id, analysis_type)
+        result = await audit_service.analyze_audit(audit_id, analysis_type)
         return result
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -70,7 +75,7 @@ async def generate_report(
     audit_id: int,
     report_options: Dict[str, Any],
     background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     try:
@@ -84,13 +89,13 @@ async def generate_report(
 @router.get("/{audit_id}/download_report")
 async def download_report(
     audit_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     try:
         audit_service = AuditService(db)
         await check_permissions(current_user, audit_id, db)
-        report = audit_service.get_report(audit_id)
+        report = await audit_service.get_report(audit_id)
         return report
     except Exception as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -99,13 +104,42 @@ async def download_report(
 async def generate_suggestions(
     audit_id: int,
     suggestion_type: Dict[str, str],
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     current_user = Depends(get_current_user)
 ):
     try:
         audit_service = AuditService(db)
         await check_permissions(current_user, audit_id, db)
-        suggestions = audit_service.generate_suggestions(audit_id, suggestion_type["type"])
+        suggestions = await audit_service.generate_suggestions(audit_id, suggestion_type["type"])
         return {"suggestions": suggestions}
     except Exception as e:
         raise HTTPException(status_code=400, detail=str(e))
+
+EXPORT_MEDIA_TYPES = {
+    "parquet": "application/vnd.apache.parquet",
+    "arrow": "application/vnd.apache.arrow.file",
+    "csv": "text/csv"
+}
+
+@router.get("/{audit_id}/pages/export")
+async def export_audit_pages(
+    audit_id: int,
+    format: str = "parquet",
+    db: AsyncSession = Depends(get_db),
+    current_user = Depends(get_current_user)
+):
+    """Eksport stron z crawla (Parquet, Arrow IPC albo CSV bez kolumn zagnieżdżonych)"""
+    if format not in EXPORT_MEDIA_TYPES:
+        raise HTTPException(status_code=400, detail=f"Unsupported format: {format}")
+    try:
+        await check_permissions(current_user, audit_id, db)
+        path = await run_in_threadpool(export_pages, audit_id, format)
+    except FileNotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    # Plik eksportu jest jednorazowy - usuwany po wysłaniu odpowiedzi
+    return FileResponse(
+        path,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        filename=f"audit_{audit_id}_pages.{format}",
+        background=BackgroundTask(os.remove, path)
+    )
@@ -0,0 +1,323 @@
+import asyncio
+import logging
+import time
+from typing import AsyncIterator, Dict, Any, NamedTuple, Optional, Set, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from parsel import Selector
+
+from ..config.settings import settings
+from ..core.http_client import (
+    ResponseRejected, check_html_headers, close_http_session, decode_html, get_http_session, read_capped,
+    retry_delay
+)
+from ..services.robots_service import RobotsService, robots_service
+from .extraction import extract_page_data
+from .frontier import PriorityFrontier
+from .revalidation import RevalidationIndex, page_validators
+from .settings import USER_AGENT
+from .sitemaps import SitemapEntry, default_sitemap_url, iter_sitemap_urls
+from .throttle import AIMDThrottle, parse_retry_after
+
+logger = logging.getLogger(__name__)
+
+RETRY_HTTP_CODES = {500, 502, 503, 504, 522, 524, 408, 429}
+
+# Pula połączeń współdzielona z resztą aplikacji (app.core.http_client)
+get_shared_session = get_http_session
+close_shared_session = close_http_session
+
+class FetchResult(NamedTuple):
+    url: str
+    status: int
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: bytes
+    text: str
+    # Przekierowania przed `url`: (adres, kod)
+    redirects: Tuple[Tuple[str, int], ...] = ()
+
+class _HostSlot:
+    """Limit równoległości i odstęp między requestami dla jednego hosta.
+
+    Oba parametry pochodzą z `HostThrottle` i zmieniają się w trakcie crawla.
+    """
+
+    def __init__(self, throttle: AIMDThrottle, host: str):
+        self.throttle = throttle
+        self.host = host
+        self.state = throttle.host(host)
+        self.active = 0
+        self.condition = asyncio.Condition()
+        self.next_at = 0.0
+
+    async def __aenter__(self):
+        async with self.condition:
+            await self.condition.wait_for(lambda: self.active < self.state.limit)
+            self.active += 1
+        now = time.monotonic()
+        start = max(now + self.throttle.wait_time(self.host, now), self.next_at)
+        self.next_at = start + self.state.delay
+        if start > now:
+            await asyncio.sleep(start - now)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        async with self.condition:
+            self.active -= 1
+            self.condition.notify_all()
+
+class AsyncCrawlEngine:
+    """Crawler oparty o aiohttp - alternatywa dla ścieżki Twisted/Scrapy.
+
+    Działa w bieżącej pętli asyncio, więc jeden proces workera może
+    obsługiwać kolejne audyty bez restartowania reaktora. Zwraca strony
+    w tym samym formacie co `SEOSpider.parse`.
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        per_host_concurrency: int = 8,
+        download_delay: float = 0.5,
+        timeout: float = 15,
+        retry_times: int = 3,
+        obey_robots: bool = True,
+        session: Optional[aiohttp.ClientSession] = None,
+        throttle: Optional[AIMDThrottle] = None,
+        detect_rendering: bool = False,
+        max_body_bytes: Optional[int] = None,
+        robots: Optional[RobotsService] = None
+    ):
+        self.concurrency = concurrency
+        self.per_host_concurrency = per_host_concurrency
+        self.download_delay = download_delay
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retry_times = retry_times
+        self.obey_robots = obey_robots
+        self.session = session
+        self.detect_rendering = detect_rendering
+        self.max_body_bytes = max_body_bytes or settings.HTTP_MAX_BODY_BYTES
+        # per_host_concurrency i download_delay to górny limit i wartość startowa
+        self.throttle = throttle or AIMDThrottle(
+            max_concurrency=per_host_concurrency,
+            start_delay=download_delay
+        )
+        self._slots: Dict[str, _HostSlot] = {}
+        # robots.txt ze wspólnego cache; Crawl-delay trafia do throttle raz na host
+        self.robots = robots or robots_service
+        self._crawl_delays: Set[str] = set()
+
+    async def crawl(
+        self,
+        start_url: str,
+        max_pages: int = 30,
+        depth_limit: int = 2,
+        revalidation: Optional[RevalidationIndex] = None,
+        use_sitemaps: bool = False,
+        lowercase_paths: bool = False
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Crawluje stronę i oddaje dane kolejnych podstron.
+
+        Kolejne adresy pobierane są według priorytetu (`PriorityFrontier`),
+        więc limit `max_pages` trafia najpierw w najważniejsze strony.
+        Z `use_sitemaps` frontier jest dodatkowo zasilany adresami z sitemap
+        (z robots.txt albo /sitemap.xml) jako stronami na głębokości 0.
+        `lowercase_paths` traktuje ścieżki różniące się wielkością liter jak jedną.
+        """
+        session = self.session or get_shared_session(limit_per_host=self.per_host_concurrency)
+        base_domain = urlparse(start_url).netloc
+        frontier = PriorityFrontier(lowercase_path=lowercase_paths)
+        frontier.push(start_url, 0)
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+        wakeup = asyncio.Condition()
+        # active - strony w trakcie pobierania; razem z pages nie przekraczają max_pages
+        state = {'pages': 0, 'active': 0, 'seeding': use_sitemaps}
+        lastmod: Dict[str, str] = {}
+
+        def finished() -> bool:
+            return state['pages'] >= max_pages or (
+                not frontier and not state['active'] and not state['seeding']
+            )
+
+        def can_start() -> bool:
+            return bool(frontier) and state['pages'] + state['active'] < max_pages
+
+        async def worker():
+            while True:
+                async with wakeup:
+                    await wakeup.wait_for(lambda: can_start() or finished())
+                    if finished():
+                        wakeup.notify_all()
+                        return
+                    url, depth = frontier.pop()
+                    state['active'] += 1
+                try:
+                    data = await self.fetch_page(session, url, revalidation)
+                    if data is None:
+                        continue
+
+                    state['pages'] += 1
+                    if lastmod:
+                        data['sitemap_lastmod'] = lastmod.get(frontier.canonicalize(url))
+                    await results.put(data)
+
+                    if state['pages'] >= max_pages or (depth_limit and depth >= depth_limit):
+                        continue
+                    links = {(link.get('url') or '').split('#', 1)[0] for link in data.get('links', [])}
+                    for link_url in links:
+                        if urlparse(link_url).netloc == base_domain:
+                            frontier.push(link_url, depth + 1)
+                except Exception:
+                    logger.exception(f"Error while crawling {url}")
+                finally:
+                    async with wakeup:
+                        state['active'] -= 1
+                        wakeup.notify_all()
+
+        async def seed():
+            async for entry in self.sitemap_entries(session, start_url, max_pages):
+                if state['pages'] >= max_pages:
+                    break
+                async with wakeup:
+                    if frontier.push(entry.loc, 0, entry.priority):
+                        if entry.lastmod:
+                            lastmod[frontier.canonicalize(entry.loc)] = entry.lastmod
+                        wakeup.notify()
+
+        async def monitor():
+            if use_sitemaps:
+                try:
+                    await seed()
+                except Exception:
+                    logger.exception(f"Sitemap seeding failed for {start_url}")
+                finally:
+                    async with wakeup:
+                        state['seeding'] = False
+                        wakeup.notify_all()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(self._DONE)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        tasks = workers + [asyncio.create_task(monitor())]
+        try:
+            while True:
+                item = await results.get()
+                if item is self._DONE:
+                    break
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def sitemap_entries(
+        self,
+        session: aiohttp.ClientSession,
+        start_url: str,
+        max_urls: int
+    ) -> AsyncIterator[SitemapEntry]:
+        """Adresy stron z sitemap witryny - z robots.txt, a w razie ich braku z /sitemap.xml"""
+        parsed = urlparse(start_url)
+        robots = await self.robots.get(start_url, session)
+        sitemap_urls = robots.sitemaps or [default_sitemap_url(start_url)]
+        async for entry in iter_sitemap_urls(session, sitemap_urls, parsed.netloc, max_urls,
+                                             timeout=self.timeout.total or 15):
+            if not self.obey_robots or robots.can_fetch(entry.loc, USER_AGENT):
+                yield entry
+
+    async def fetch_page(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        revalidation: Optional[RevalidationIndex] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Pobiera i parsuje jedną stronę; None, jeśli nie da się jej pobrać"""
+        headers = revalidation.request_headers(url) if revalidation else None
+        fetched = await self._fetch(session, url, headers)
+        if fetched is None:
+            return None
+
+        if revalidation and revalidation.is_unchanged(fetched.url, fetched.status, fetched.body):
+            data = revalidation.previous_page(fetched.url)
+            if data is not None:
+                return data
+        if fetched.status == 304:
+            fetched = await self._fetch(session, url)
+            if fetched is None:
+                return None
+
+        data = extract_page_data(fetched.url, fetched.status, Selector(text=fetched.text), self.detect_rendering)
+        data.update(page_validators(fetched.etag, fetched.last_modified, fetched.body))
+        if fetched.redirects:
+            data['redirect_chain'] = [list(hop) for hop in fetched.redirects]
+        return data
+
+    def _slot(self, host: str) -> _HostSlot:
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = _HostSlot(self.throttle, host)
+        return slot
+
+    async def _fetch(
+        self,
+        session: aiohttp.ClientSession,
+        url: str,
+        headers: Optional[Dict[str, str]] = None
+    ) -> Optional[FetchResult]:
+        """Pobiera stronę HTML (lub 304 przy warunkowym GET); None przy błędzie"""
+        if self.obey_robots and not await self._can_fetch(session, url):
+            logger.debug(f"Forbidden by robots.txt: {url}")
+            return None
+
+        host = urlparse(url).netloc
+        for attempt in range(self.retry_times + 1):
+            if attempt:
+                # Odstęp przed ponowieniem (5xx/429/timeout) - poza slotem hosta
+                await asyncio.sleep(retry_delay(attempt - 1))
+            try:
+                async with self._slot(host):
+                    started = time.monotonic()
+                    async with session.get(url, headers=headers, timeout=self.timeout) as response:
+                        self.throttle.on_response(
+                            host,
+                            time.monotonic() - started,
+                            response.status,
+                            parse_retry_after(response.headers.get('Retry-After'))
+                        )
+                        if response.status in RETRY_HTTP_CODES and attempt < self.retry_times:
+                            continue
+                        if response.status == 304 and headers:
+                            return FetchResult(str(response.url), 304, None, None, b'', '')
+                        # Status, typ i rozmiar z nagłówków - treść PDF-ów itp. nie jest pobierana
+                        check_html_headers(response.status, response.headers, self.max_body_bytes)
+                        body = await read_capped(response, self.max_body_bytes)
+                        return FetchResult(
+                            str(response.url),
+                            response.status,
+                            response.headers.get('ETag'),
+                            response.headers.get('Last-Modified'),
+                            body,
+                            decode_html(body, response.charset)[0],
+                            tuple((str(r.url), r.status) for r in response.history)
+                        )
+            except ResponseRejected as e:
+                logger.debug(f"Skipping {url}: {e}")
+                return None
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                self.throttle.on_error(host)
+                if attempt >= self.retry_times:
+                    logger.warning(f"Giving up on {url}: {e!r}")
+                    return None
+        return None
+
+    async def _can_fetch(self, session: aiohttp.ClientSession, url: str) -> bool:
+        rules = await self.robots.get(url, session)
+        host = urlparse(url).netloc
+        if host not in self._crawl_delays:
+            self._crawl_delays.add(host)
+            self.throttle.set_crawl_delay(host, rules.crawl_delay(USER_AGENT))
+        return rules.can_fetch(url, USER_AGENT)
@@ -0,0 +1,473 @@
+import asyncio
+import hashlib
+import json
+import logging
+import time
+import uuid
+from typing import AsyncIterator, Dict, Any, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+from redis.asyncio import Redis
+
+from .async_engine import AsyncCrawlEngine, _HostSlot, get_shared_session
+from .frontier import canonicalize_url
+from .throttle import AIMDThrottle
+
+logger = logging.getLogger(__name__)
+
+# Dodaje porcję URL-i (trójki ARGV: odcisk, dane, partycja), pomijając
+# widziane i zbyt głębokie; KEYS: seen, pending, kolejki partycji
+_PUSH_SCRIPT = """
+local depth_limit = tonumber(ARGV[2])
+if depth_limit > 0 and tonumber(ARGV[1]) > depth_limit then
+    return 0
+end
+local added = 0
+for i = 4, #ARGV, 3 do
+    if redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+        local queue = KEYS[3 + tonumber(ARGV[i + 2])]
+        redis.call('RPUSH', queue, ARGV[i + 1])
+        redis.call('EXPIRE', queue, ARGV[3])
+        added = added + 1
+    end
+end
+if added > 0 then
+    redis.call('INCRBY', KEYS[2], added)
+end
+return added
+"""
+
+# Pobiera URL z pierwszej niepustej partycji i rezerwuje dla niego miejsce
+# w max_pages. Rezerwacja to dzierżawa w ZSET in-flight (wynik - termin):
+# wygasłe dzierżawy martwych workerów wracają najpierw do kolejki, a ich
+# miejsce w limicie stron jest zwalniane. KEYS: pages, in-flight, kolejki
+# (własna pierwsza); ARGV: max_pages, czas dzierżawy, TTL kluczy
+_RESERVE_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+local expired = redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)
+for _, item in ipairs(expired) do
+    redis.call('ZREM', KEYS[2], item)
+    redis.call('LPUSH', KEYS[3], item)
+    redis.call('DECR', KEYS[1])
+end
+if tonumber(redis.call('GET', KEYS[1]) or '0') >= tonumber(ARGV[1]) then
+    return {'exhausted'}
+end
+for i = 3, #KEYS do
+    local item = redis.call('LPOP', KEYS[i])
+    if item then
+        redis.call('INCR', KEYS[1])
+        redis.call('ZADD', KEYS[2], now + tonumber(ARGV[2]), item)
+        redis.call('EXPIRE', KEYS[2], ARGV[3])
+        return {'ok', item}
+    end
+end
+return {'empty'}
+"""
+
+# Przedłuża dzierżawy URL-i przetwarzanych przez żywego workera (tylko istniejące)
+_RENEW_SCRIPT = """
+local t = redis.call('TIME')
+local deadline = tonumber(t[1]) + tonumber(t[2]) / 1000000 + tonumber(ARGV[1])
+for i = 2, #ARGV do
+    redis.call('ZADD', KEYS[1], 'XX', deadline, ARGV[i])
+end
+return #ARGV - 1
+"""
+
+# Kończy rezerwację: zdejmuje pending (i miejsce w limicie stron, gdy strony
+# nie pobrano). Po wygaśnięciu dzierżawy URL jest już z powrotem w kolejce
+# i rozliczy go worker, który go ponownie pobierze. KEYS: in-flight, pending, pages
+_DONE_SCRIPT = """
+if redis.call('ZREM', KEYS[1], ARGV[1]) == 0 then
+    return 0
+end
+redis.call('DECR', KEYS[2])
+if ARGV[2] == '0' then
+    redis.call('DECR', KEYS[3])
+end
+return 1
+"""
+
+# Zajmuje miejsce w limicie równoległości hosta wspólnym dla workerów audytu.
+# Zajęte miejsca to dzierżawy w ZSET (żeton -> termin), więc miejsca
+# martwego workera wygasają same. Zwraca {0, limit, odstęp}, gdy host jest
+# zajęty, albo {1, limit, odstęp, ile czekać} - kolejne starty są rozsuwane
+# o odstęp i wstrzymywane do końca blokady z Retry-After. Czas z Redis, więc
+# zegary workerów nie mają znaczenia. KEYS: hash hosta, zbiór kluczy hostów,
+# miejsca hosta; ARGV: limit, odstęp, TTL kluczy, żeton, czas dzierżawy miejsca
+_ACQUIRE_HOST_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+local active = redis.call('ZCARD', KEYS[3])
+local h = redis.call('HMGET', KEYS[1], 'next_at', 'concurrency', 'delay', 'blocked_until')
+local concurrency = tonumber(h[2] or ARGV[1])
+local delay = tonumber(h[3] or ARGV[2])
+redis.call('SADD', KEYS[2], KEYS[1], KEYS[3])
+if active >= math.max(1, math.floor(concurrency)) then
+    return {0, tostring(concurrency), tostring(delay)}
+end
+local start = math.max(now, tonumber(h[1] or '0'), tonumber(h[4] or '0'))
+redis.call('HSET', KEYS[1], 'next_at', tostring(start + delay),
+           'concurrency', tostring(concurrency), 'delay', tostring(delay))
+redis.call('ZADD', KEYS[3], start + tonumber(ARGV[5]), ARGV[4])
+for i = 1, 3 do
+    redis.call('EXPIRE', KEYS[i], ARGV[3])
+end
+return {1, tostring(concurrency), tostring(delay), tostring(start - now)}
+"""
+
+# Zwalnia miejsce hosta (żeton) i zapisuje limity po odpowiedzi;
+# ARGV[3] - sekundy blokady z Retry-After. KEYS: hash hosta, miejsca hosta
+_RELEASE_HOST_SCRIPT = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+redis.call('ZREM', KEYS[2], ARGV[4])
+redis.call('HSET', KEYS[1], 'concurrency', ARGV[1], 'delay', ARGV[2])
+local blocked_for = tonumber(ARGV[3])
+if blocked_for > 0 then
+    local blocked_until = tonumber(redis.call('HGET', KEYS[1], 'blocked_until') or '0')
+    redis.call('HSET', KEYS[1], 'blocked_until', tostring(math.max(blocked_until, now + blocked_for)))
+end
+return redis.call('ZCARD', KEYS[2])
+"""
+
+def url_fingerprint(url: str, lowercase_path: bool = False) -> bytes:
+    return hashlib.blake2b(canonicalize_url(url, lowercase_path).encode(), digest_size=8).digest()
+
+def url_partition(fingerprint: bytes, partitions: int) -> int:
+    """Stała (niezależna od procesu) partycja URL-a.
+
+    Crawl obejmuje zwykle jeden host, więc dzielimy po adresie, nie po
+    hoście - inaczej cała praca trafiałaby do jednej partycji.
+    """
+    return int.from_bytes(fingerprint[:4], 'little') % partitions
+
+class RedisFrontier:
+    """Frontier i zbiór odwiedzonych URL-i jednego audytu trzymane w Redis.
+
+    Kolejki są podzielone na partycje według skrótu URL-a. Limity
+    `max_pages` i głębokości są sprawdzane w skryptach Lua, więc kilka
+    workerów Celery może atomowo dzielić ten sam budżet crawla. W Redis
+    są też limity tempa hostów (`acquire_host` / `release_host`), żeby
+    N workerów nie obciążało serwisu N razy mocniej niż jeden.
+
+    Zarezerwowane URL-e i zajęte miejsca hostów są dzierżawami z terminem
+    (`lease_timeout`, `slot_timeout`). Worker zabity między `reserve`
+    a `done` (SIGKILL, limit czasu Celery) nie blokuje więc crawla: jego
+    URL wraca do kolejki, a miejsce hosta się zwalnia. Żywy worker
+    przedłuża swoje dzierżawy przez `renew`.
+    """
+
+    KEY_TTL = 24 * 3600
+    LEASE_TIMEOUT = 120.0
+    SLOT_TIMEOUT = 120.0
+
+    def __init__(self, redis: Redis, audit_id: int, partitions: int = 4,
+                 lease_timeout: float = LEASE_TIMEOUT, slot_timeout: float = SLOT_TIMEOUT):
+        self.redis = redis
+        self.audit_id = audit_id
+        self.partitions = partitions
+        self.lease_timeout = lease_timeout
+        self.slot_timeout = slot_timeout
+        # Hash tag {..} trzyma wszystkie klucze audytu w jednym slocie Redis Cluster
+        self.prefix = f"crawl:{{{audit_id}}}"
+        self._push = redis.register_script(_PUSH_SCRIPT)
+        self._reserve = redis.register_script(_RESERVE_SCRIPT)
+        self._renew = redis.register_script(_RENEW_SCRIPT)
+        self._done = redis.register_script(_DONE_SCRIPT)
+        self._acquire_host = redis.register_script(_ACQUIRE_HOST_SCRIPT)
+        self._release_host = redis.register_script(_RELEASE_HOST_SCRIPT)
+        self._meta: Optional[Dict[str, Any]] = None
+        # Dzierżawy tej instancji: (url, głębokość) -> element in-flight; żetony miejsc hostów
+        self._leases: Dict[Tuple[str, int], bytes] = {}
+        self._host_tokens: Dict[str, List[str]] = {}
+
+    def _key(self, name: str) -> str:
+        return f"{self.prefix}:{name}"
+
+    def _queue_key(self, partition: int) -> str:
+        return self._key(f"queue:{partition}")
+
+    async def meta(self) -> Dict[str, Any]:
+        if self._meta is None:
+            raw = await self.redis.hgetall(self._key('meta'))
+            self._meta = {
+                'max_pages': int(raw.get(b'max_pages', 0)),
+                'depth_limit': int(raw.get(b'depth_limit', 0)),
+                'base_domain': raw.get(b'base_domain', b'').decode(),
+                'lowercase_paths': raw.get(b'lowercase_paths') == b'1'
+            }
+        return self._meta
+
+    async def setup(self, start_url: str, max_pages: int, depth_limit: int,
+                    lowercase_paths: bool = False) -> None:
+        """Czyści poprzedni stan i dodaje URL startowy"""
+        await self.cleanup()
+        meta_key = self._key('meta')
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.hset(meta_key, mapping={
+                'max_pages': max_pages,
+                'depth_limit': depth_limit,
+                'base_domain': urlparse(start_url).netloc,
+                'partitions': self.partitions,
+                'lowercase_paths': int(lowercase_paths)
+            })
+            pipe.expire(meta_key, self.KEY_TTL)
+            for name in ('pages', 'pending'):
+                pipe.set(self._key(name), 0, ex=self.KEY_TTL)
+            await pipe.execute()
+        self._meta = None
+        await self.push(start_url, 0)
+        await self.redis.expire(self._key('seen'), self.KEY_TTL)
+
+    async def push(self, url: str, depth: int) -> bool:
+        """Dodaje URL do jego partycji; False dla duplikatu lub zbyt głębokiego"""
+        return await self.push_many([url], depth) == 1
+
+    async def push_many(self, urls: Iterable[str], depth: int) -> int:
+        """Dodaje linki jednej strony jednym wywołaniem skryptu; zwraca liczbę nowych"""
+        meta = await self.meta()
+        args: List[Any] = []
+        for url in urls:
+            fingerprint = url_fingerprint(url, meta['lowercase_paths'])
+            args += [fingerprint, json.dumps([url, depth]), url_partition(fingerprint, self.partitions)]
+        if not args:
+            return 0
+        return int(await self._push(
+            keys=[self._key('seen'), self._key('pending')] + [self._queue_key(p) for p in range(self.partitions)],
+            args=[depth, meta['depth_limit'], self.KEY_TTL] + args
+        ))
+
+    async def reserve(self, partition: int) -> Tuple[str, Optional[Tuple[str, int]]]:
+        """Pobiera kolejny URL - najpierw z własnej partycji, potem z pozostałych.
+
+        Zwraca ('ok', (url, głębokość)), ('empty', None) albo ('exhausted', None),
+        gdy wyczerpano wspólny limit stron.
+        """
+        order = [partition] + [p for p in range(self.partitions) if p != partition]
+        meta = await self.meta()
+        result = await self._reserve(
+            keys=[self._key('pages'), self._key('inflight')] + [self._queue_key(p) for p in order],
+            args=[meta['max_pages'], self.lease_timeout, self.KEY_TTL]
+        )
+        status = result[0].decode() if isinstance(result[0], bytes) else result[0]
+        if status != 'ok':
+            return status, None
+        url, depth = json.loads(result[1])
+        self._leases[(url, depth)] = result[1]
+        return status, (url, depth)
+
+    async def renew(self) -> int:
+        """Przedłuża dzierżawy URL-i zarezerwowanych przez tę instancję"""
+        if not self._leases:
+            return 0
+        return int(await self._renew(
+            keys=[self._key('inflight')], args=[self.lease_timeout] + list(self._leases.values())
+        ))
+
+    async def done(self, item: Tuple[str, int], fetched: bool = True) -> bool:
+        """Kończy rezerwację URL-a (po dodaniu jego linków).
+
+        `fetched=False` oddaje też miejsce w limicie stron. False, gdy
+        dzierżawa zdążyła wygasnąć - URL przetworzy wtedy inny worker.
+        """
+        member = self._leases.pop(tuple(item), None)
+        if member is None:
+            return False
+        return bool(await self._done(
+            keys=[self._key('inflight'), self._key('pending'), self._key('pages')],
+            args=[member, int(fetched)]
+        ))
+
+    async def pending(self) -> int:
+        return int(await self.redis.get(self._key('pending')) or 0)
+
+    async def pages(self) -> int:
+        return int(await self.redis.get(self._key('pages')) or 0)
+
+    def _host_key(self, host: str) -> str:
+        return self._key(f"host:{host}")
+
+    def _host_slots_key(self, host: str) -> str:
+        return self._key(f"host:{host}:slots")
+
+    async def acquire_host(self, host: str, concurrency: float, delay: float) -> Tuple[bool, float, float, float]:
+        """Próbuje zająć miejsce w limicie hosta.
+
+        Zwraca (zajęto, wspólny limit równoległości, wspólny odstęp, ile
+        czekać do startu requestu). `concurrency` i `delay` są wartościami
+        startowymi dla hosta, którego jeszcze nikt nie odwiedził.
+        """
+        token = uuid.uuid4().hex
+        result = await self._acquire_host(
+            keys=[self._host_key(host), self._key('hosts'), self._host_slots_key(host)],
+            args=[concurrency, delay, self.KEY_TTL, token, self.slot_timeout]
+        )
+        acquired = int(result[0]) == 1
+        if acquired:
+            self._host_tokens.setdefault(host, []).append(token)
+        wait = float(result[3]) if acquired else 0.0
+        return acquired, float(result[1]), float(result[2]), wait
+
+    async def release_host(self, host: str, concurrency: float, delay: float, blocked_for: float = 0.0) -> None:
+        """Zwalnia jedno z miejsc hosta zajętych przez tę instancję i zapisuje limity po odpowiedzi"""
+        tokens = self._host_tokens.get(host)
+        token = tokens.pop(0) if tokens else ''
+        await self._release_host(
+            keys=[self._host_key(host), self._host_slots_key(host)],
+            args=[concurrency, delay, blocked_for, token]
+        )
+
+    async def cleanup(self) -> None:
+        hosts = await self.redis.smembers(self._key('hosts'))
+        keys = [self._key(name) for name in ('meta', 'seen', 'pages', 'pending', 'inflight', 'hosts')]
+        keys += [self._queue_key(p) for p in range(self.partitions)]
+        keys += [key.decode() if isinstance(key, bytes) else key for key in hosts]
+        await self.redis.delete(*keys)
+
+class _SharedHostSlot(_HostSlot):
+    """`_HostSlot`, którego limit równoległości i odstęp są wspólne w Redis.
+
+    Wartości AIMD z Redis trafiają do lokalnego `HostThrottle` przed
+    requestem, a po odpowiedzi wracają do Redis - wszyscy workerzy
+    audytu zwalniają i przyspieszają razem. Dwie jednoczesne
+    aktualizacje mogą się nadpisać; gubi to najwyżej jeden krok AIMD.
+    Czekanie na miejsce trwa najwyżej `max_wait` sekund - potem
+    asyncio.TimeoutError, obsługiwany w `_fetch` jak timeout requestu.
+    """
+
+    POLL_INTERVAL = 0.05
+    MAX_WAIT = 300.0
+
+    def __init__(self, throttle: AIMDThrottle, host: str, frontier: RedisFrontier,
+                 max_wait: float = MAX_WAIT):
+        super().__init__(throttle, host)
+        self.frontier = frontier
+        self.max_wait = max_wait
+
+    async def __aenter__(self):
+        deadline = time.monotonic() + self.max_wait
+        while True:
+            acquired, concurrency, delay, wait = await self.frontier.acquire_host(
+                self.host, self.state.concurrency, self.state.delay
+            )
+            # Crawl-delay z robots.txt zostaje dolną granicą
+            self.state.concurrency = 1 if self.state.crawl_delay else concurrency
+            self.state.delay = max(delay, self.state.crawl_delay)
+            if acquired:
+                break
+            if time.monotonic() >= deadline:
+                logger.warning(f"Gave up waiting {self.max_wait:.0f}s for a shared slot of {self.host}")
+                raise asyncio.TimeoutError(f"No free slot for {self.host}")
+            await asyncio.sleep(self.POLL_INTERVAL)
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.frontier.release_host(
+            self.host, self.state.concurrency, self.state.delay, self.throttle.wait_time(self.host)
+        )
+
+class SharedThrottleEngine(AsyncCrawlEngine):
+    """`AsyncCrawlEngine` z limitami hostów wspólnymi dla workerów audytu"""
+
+    def __init__(self, frontier: RedisFrontier, **kwargs: Any):
+        super().__init__(**kwargs)
+        self.frontier = frontier
+
+    def _slot(self, host: str) -> _HostSlot:
+        slot = self._slots.get(host)
+        if slot is None:
+            slot = self._slots[host] = _SharedHostSlot(self.throttle, host, self.frontier)
+        return slot
+
+class DistributedCrawlWorker:
+    """Jeden z workerów wspólnie crawlujących audyt przez `RedisFrontier`.
+
+    Każdy worker obsługuje przede wszystkim swoją partycję URL-i, a gdy
+    jest pusta - podbiera pracę z pozostałych. Kończy, gdy wyczerpano limit
+    stron albo żaden URL nie czeka ani nie jest przetwarzany. W tle co
+    trzecią część `lease_timeout` przedłuża dzierżawy swoich URL-i.
+    """
+
+    def __init__(
+        self,
+        frontier: RedisFrontier,
+        partition: int,
+        engine: Optional[AsyncCrawlEngine] = None,
+        concurrency: int = 16,
+        poll_interval: float = 1.0
+    ):
+        self.frontier = frontier
+        self.partition = partition
+        self.engine = engine or SharedThrottleEngine(frontier, concurrency=concurrency)
+        self.concurrency = concurrency
+        self.poll_interval = poll_interval
+
+    async def crawl(self) -> AsyncIterator[Dict[str, Any]]:
+        session = self.engine.session or get_shared_session(limit_per_host=self.engine.per_host_concurrency)
+        base_domain = (await self.frontier.meta())['base_domain']
+        results: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency)
+
+        async def worker():
+            while True:
+                status, item = await self.frontier.reserve(self.partition)
+                if status == 'exhausted':
+                    return
+                if status == 'empty':
+                    if await self.frontier.pending() <= 0:
+                        return
+                    await asyncio.sleep(self.poll_interval)
+                    continue
+
+                url, depth = item
+                fetched = False
+                try:
+                    data = await self.engine.fetch_page(session, url)
+                    if data is None:
+                        continue
+                    fetched = True
+                    await results.put(data)
+                    await self.frontier.push_many(self._internal_links(data, base_domain), depth + 1)
+                except Exception:
+                    logger.exception(f"Error while crawling {url}")
+                finally:
+                    await self.frontier.done(item, fetched)
+
+        async def heartbeat():
+            while True:
+                await asyncio.sleep(self.frontier.lease_timeout / 3)
+                try:
+                    await self.frontier.renew()
+                except Exception:
+                    logger.exception("Renewing crawl leases failed")
+
+        async def monitor():
+            await asyncio.gather(*workers, return_exceptions=True)
+            await results.put(None)
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+        tasks = workers + [asyncio.create_task(monitor()), asyncio.create_task(heartbeat())]
+        try:
+            while True:
+                item = await results.get()
+                if item is None:
+                    break
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    @staticmethod
+    def _internal_links(data: Dict[str, Any], base_domain: str) -> List[str]:
+        links = []
+        for link in data.get('links', []):
+            url = (link.get('url') or '').split('#', 1)[0]
+            if url and urlparse(url).netloc == base_domain:
+                links.append(url)
+        return links
@@ -0,0 +1,34 @@
+from urllib.parse import urljoin
+from typing import Dict, Any
+from .rendering import needs_rendering
+
+def extract_page_data(url: str, status_code: int, selector, detect_rendering: bool = False) -> Dict[str, Any]:
+    """Wyciąga dane SEO ze strony.
+
+    `selector` to dowolny obiekt z metodami `css()`/`xpath()` - odpowiedź
+    Scrapy albo `parsel.Selector` - dzięki temu oba silniki crawla zwracają
+    identyczny format danych. Z `detect_rendering` dane dostają flagę
+    `needs_rendering` dla stron, których treść powstaje w JS.
+    """
+    data = {
+        'url': url,
+        'status_code': status_code,
+        'title': selector.css('title::text').get(),
+        'meta_description': selector.css('meta[name="description"]::attr(content)').get(),
+        'h1_tags': selector.css('h1::text').getall(),
+        'images': [
+            {
+                'src': img.attrib.get('src'),
+                'alt': img.attrib.get('alt')
+            } for img in selector.css('img')
+        ],
+        'links': [
+            {
+                'url': urljoin(url, a.attrib.get('href')),
+                'text': a.css('::text').get()
+            } for a in selector.css('a[href]')
+        ]
+    }
+    if detect_rendering:
+        data['needs_rendering'] = needs_rendering(selector)
+    return data
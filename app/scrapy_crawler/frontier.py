@@ -0,0 +1,288 @@
+import hashlib
+import heapq
+import itertools
+import math
+import re
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+
+# Parametry śledzące, które nie zmieniają treści strony
+TRACKING_PARAMS = {
+    'gclid', 'gclsrc', 'dclid', 'gbraid', 'wbraid', 'fbclid', 'msclkid',
+    'yclid', 'igshid', 'mc_cid', 'mc_eid', '_ga', '_gl', 'phpsessid', 'jsessionid'
+}
+TRACKING_PREFIXES = ('utm_',)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# Parametry typowe dla fasetów, sortowania i paginacji
+FACET_PARAMS = {
+    'sort', 'order', 'orderby', 'dir', 'filter', 'page', 'p', 'pg', 'offset', 'limit',
+    'per_page', 'view', 'color', 'colour', 'size', 'price', 'min_price', 'max_price', 'brand'
+}
+# Sekcje rzadko istotne dla audytu SEO
+LOW_VALUE_SEGMENTS = {
+    'login', 'logout', 'register', 'signup', 'cart', 'basket', 'checkout', 'account',
+    'search', 'tag', 'tags', 'feed', 'print', 'share', 'wp-admin', 'wp-login.php', 'calendar'
+}
+PAGINATION_PATH = re.compile(r'/(page|strona)/\d+/?$', re.IGNORECASE)
+
+# Do tylu adresów trzymamy dokładny zbiór, powyżej przechodzimy na filtr Blooma
+EXACT_SET_LIMIT = 100_000
+BLOOM_ERROR_RATE = 0.001
+
+def canonicalize_url(url: str, lowercase_path: bool = False) -> str:
+    """Sprowadza URL do postaci kanonicznej na potrzeby deduplikacji.
+
+    Usuwa fragment, parametry śledzące, domyślny port, sesyjne parametry
+    ścieżki i końcowy ukośnik; sortuje parametry zapytania i normalizuje
+    wielkość liter hosta. Ścieżka w URL-u rozróżnia wielkość liter, więc
+    sprowadzamy ją do małych liter tylko na życzenie (`lowercase_path`),
+    dla serwisów, które wiadomo, że jej nie rozróżniają.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').rstrip('.')
+    if ':' in host:
+        host = f"[{host}]"
+    try:
+        port = parts.port
+    except ValueError:
+        port = None
+    netloc = host if port is None or DEFAULT_PORTS.get(scheme) == port else f"{host}:{port}"
+
+    path = parts.path.split(';', 1)[0] or '/'
+    if len(path) > 1:
+        path = path.rstrip('/') or '/'
+    if lowercase_path:
+        path = path.lower()
+
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS and not key.lower().startswith(TRACKING_PREFIXES)
+    ))
+    return urlunsplit((scheme, netloc, path, query, ''))
+
+class BloomFilter:
+    """Filtr Blooma o stałym rozmiarze (fałszywe trafienia z prawdop. `error_rate`)"""
+
+    def __init__(self, capacity: int, error_rate: float = BLOOM_ERROR_RATE):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key: bytes) -> Iterable[int]:
+        digest = hashlib.blake2b(key, digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return ((h1 + i * h2) % self.num_bits for i in range(self.num_hashes))
+
+    def __contains__(self, key: bytes) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def add(self, key: bytes) -> bool:
+        """Dodaje klucz; zwraca False, jeśli (prawdopodobnie) już był"""
+        added = False
+        for pos in self._positions(key):
+            mask = 1 << (pos & 7)
+            if not self.bits[pos >> 3] & mask:
+                self.bits[pos >> 3] |= mask
+                added = True
+        if added:
+            self.count += 1
+        return added
+
+class ScalableBloomFilter:
+    """Seria filtrów Blooma o rosnącej pojemności - nie trzeba znać liczby URL-i z góry"""
+
+    def __init__(self, initial_capacity: int = EXACT_SET_LIMIT, error_rate: float = BLOOM_ERROR_RATE):
+        self.initial_capacity = initial_capacity
+        self.error_rate = error_rate
+        self.filters: List[BloomFilter] = []
+
+    def __contains__(self, key: bytes) -> bool:
+        return any(key in f for f in self.filters)
+
+    def add(self, key: bytes) -> bool:
+        if key in self:
+            return False
+        if not self.filters or self.filters[-1].count >= self.filters[-1].capacity:
+            # Każdy kolejny filtr jest 2x większy i ma 2x mniejszy błąd,
+            # więc łączny odsetek fałszywych trafień nie przekracza 2x error_rate
+            level = len(self.filters)
+            self.filters.append(BloomFilter(
+                self.initial_capacity * 2 ** level,
+                self.error_rate / 2 ** level
+            ))
+        return self.filters[-1].add(key)
+
+    @property
+    def nbytes(self) -> int:
+        return sum(len(f.bits) for f in self.filters)
+
+class VisitedSet:
+    """Zbiór odwiedzonych URL-i.
+
+    Do `exact_limit` elementów to zwykły, dokładny zbiór; po jego
+    przekroczeniu zawartość przenoszona jest do skalowalnego filtra Blooma,
+    który przy milionie adresów zajmuje kilka MB zamiast setek.
+    """
+
+    def __init__(self, exact_limit: int = EXACT_SET_LIMIT, error_rate: float = BLOOM_ERROR_RATE):
+        self.exact_limit = exact_limit
+        self.error_rate = error_rate
+        self._exact: Optional[Set[str]] = set()
+        self._bloom: Optional[ScalableBloomFilter] = None
+        self._count = 0
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, key: str) -> bool:
+        if self._exact is not None:
+            return key in self._exact
+        return key.encode() in self._bloom
+
+    def add(self, key: str) -> bool:
+        """Dodaje klucz; zwraca True, jeśli wcześniej go nie było"""
+        if self._exact is not None:
+            if key in self._exact:
+                return False
+            self._exact.add(key)
+            if len(self._exact) > self.exact_limit:
+                self._switch_to_bloom()
+        elif not self._bloom.add(key.encode()):
+            return False
+        self._count += 1
+        return True
+
+    @property
+    def is_exact(self) -> bool:
+        return self._exact is not None
+
+    def _switch_to_bloom(self) -> None:
+        self._bloom = ScalableBloomFilter(self.exact_limit * 4, self.error_rate)
+        for key in self._exact:
+            self._bloom.add(key.encode())
+        self._exact = None
+
+class URLFrontier:
+    """Kanonizuje URL-e i odrzuca już widziane"""
+
+    def __init__(self, lowercase_path: bool = False, exact_limit: int = EXACT_SET_LIMIT):
+        self.lowercase_path = lowercase_path
+        self.visited = VisitedSet(exact_limit)
+        self.duplicates = 0
+
+    def canonicalize(self, url: str) -> str:
+        return canonicalize_url(url, lowercase_path=self.lowercase_path)
+
+    def add(self, url: str) -> bool:
+        """Rejestruje URL; zwraca True, jeśli to nowy adres do pobrania"""
+        if self.visited.add(self.canonicalize(url)):
+            return True
+        self.duplicates += 1
+        return False
+
+    def __contains__(self, url: str) -> bool:
+        return self.canonicalize(url) in self.visited
+
+    def __len__(self) -> int:
+        return len(self.visited)
+
+def url_priority(url: str, depth: int, inlinks: int = 0, sitemap_priority: Optional[float] = None) -> float:
+    """Szacowana ważność strony - wyższa wartość oznacza wcześniejsze pobranie.
+
+    Promuje płytkie strony, linkowane z wielu miejsc i z wysokim
+    priorytetem w sitemapie; karze fasety, paginację, długie ścieżki
+    i sekcje typu koszyk/logowanie/wyszukiwarka.
+    """
+    parts = urlsplit(url)
+    segments = [s for s in parts.path.lower().split('/') if s]
+    params = [key.lower() for key, _ in parse_qsl(parts.query, keep_blank_values=True)]
+
+    score = 10.0 - 2.0 * depth + 1.5 * math.log2(1 + inlinks)
+    if sitemap_priority is not None:
+        score += 4.0 * (sitemap_priority - 0.5)
+    score -= min(len(params), 4)
+    if any(key in FACET_PARAMS for key in params):
+        score -= 3.0
+    if PAGINATION_PATH.search(parts.path):
+        score -= 3.0
+    if any(segment in LOW_VALUE_SEGMENTS or segment.rsplit('.', 1)[0] in LOW_VALUE_SEGMENTS
+           for segment in segments):
+        score -= 4.0
+    score -= 0.5 * max(len(segments) - 1, 0)
+    return score
+
+class _QueuedURL:
+    __slots__ = ('url', 'depth', 'inlinks', 'sitemap_priority', 'score')
+
+    def __init__(self, url: str, depth: int, inlinks: int, sitemap_priority: Optional[float]):
+        self.url = url
+        self.depth = depth
+        self.inlinks = inlinks
+        self.sitemap_priority = sitemap_priority
+        self.score = url_priority(url, depth, inlinks, sitemap_priority)
+
+class PriorityFrontier:
+    """Kolejka URL-i do pobrania uporządkowana według `url_priority`.
+
+    Każdy kolejny link do czekającego jeszcze adresu podnosi jego
+    priorytet (nieaktualne pozycje kopca są pomijane przy `pop`).
+    Linki odkryte na stronach (depth > 0) liczą się jako inlinki,
+    seedy - start i sitemapy - nie.
+    """
+
+    def __init__(self, lowercase_path: bool = False, exact_limit: int = EXACT_SET_LIMIT):
+        self.seen = URLFrontier(lowercase_path, exact_limit)
+        self._queued: Dict[str, _QueuedURL] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._counter = itertools.count()
+
+    def __len__(self) -> int:
+        return len(self._queued)
+
+    def canonicalize(self, url: str) -> str:
+        return self.seen.canonicalize(url)
+
+    def push(self, url: str, depth: int, sitemap_priority: Optional[float] = None) -> bool:
+        """Dodaje URL; zwraca True, jeśli to nowy adres (a nie kolejny link do znanego)"""
+        key = self.canonicalize(url)
+        entry = self._queued.get(key)
+        if entry is None:
+            if not self.seen.add(url):
+                return False
+            entry = self._queued[key] = _QueuedURL(url, depth, 1 if depth else 0, sitemap_priority)
+            self._schedule(key, entry)
+            return True
+
+        entry.depth = min(entry.depth, depth)
+        if depth:
+            entry.inlinks += 1
+        if sitemap_priority is not None:
+            entry.sitemap_priority = sitemap_priority
+        entry.score = url_priority(entry.url, entry.depth, entry.inlinks, entry.sitemap_priority)
+        self._schedule(key, entry)
+        return False
+
+    def pop(self) -> Optional[Tuple[str, int]]:
+        """Najważniejszy czekający URL jako (url, głębokość) albo None"""
+        while self._heap:
+            score, _, key = heapq.heappop(self._heap)
+            entry = self._queued.get(key)
+            if entry is None or -score != entry.score:
+                continue
+            del self._queued[key]
+            return entry.url, entry.depth
+        return None
+
+    def _schedule(self, key: str, entry: _QueuedURL) -> None:
+        heapq.heappush(self._heap, (-entry.score, next(self._counter), key))
+        if len(self._heap) > 4 * len(self._queued) + 1000:
+            # Przebudowa kopca bez nieaktualnych pozycji
+            self._heap = [(-e.score, next(self._counter), k) for k, e in self._queued.items()]
+            heapq.heapify(self._heap)
@@ -0,0 +1,104 @@
+import asyncio
+import logging
+from typing import Any, Callable, Dict, Optional, Set
+
+from ..selenium_crawler.browser import get_browser
+
+logger = logging.getLogger(__name__)
+
+# Puste kontenery, do których aplikacje SPA renderują treść po stronie klienta
+SPA_ROOT_XPATH = (
+    '//body//*[@id="root" or @id="app" or @id="__next" or @id="__nuxt" or @id="svelte"'
+    ' or @ng-app or @data-ng-app][not(*)][not(normalize-space())]'
+)
+VISIBLE_TEXT_XPATH = '//body//text()[not(ancestor::script) and not(ancestor::style) and not(ancestor::noscript)]'
+
+# Poniżej tylu znaków tekstu strona jest podejrzana, jeśli przeważają skrypty
+MIN_TEXT_LENGTH = 500
+MIN_TEXT_TO_SCRIPT_RATIO = 0.05
+# Zewnętrzny skrypt liczymy jako tyle znaków kodu
+EXTERNAL_SCRIPT_WEIGHT = 5000
+
+def needs_rendering(selector) -> bool:
+    """Czy treść strony powstaje dopiero w JS (pusty body, korzeń SPA, prawie sam skrypt)"""
+    text_length = sum(len(text.strip()) for text in selector.xpath(VISIBLE_TEXT_XPATH).getall())
+    if text_length == 0:
+        return True
+    if selector.xpath(SPA_ROOT_XPATH):
+        return True
+    if text_length >= MIN_TEXT_LENGTH:
+        return False
+    script_length = sum(len(code) for code in selector.xpath('//script[not(@src)]/text()').getall())
+    script_length += EXTERNAL_SCRIPT_WEIGHT * len(selector.xpath('//script[@src]'))
+    return text_length < MIN_TEXT_TO_SCRIPT_RATIO * script_length
+
+def render_page(url: str) -> Dict[str, Any]:
+    """Renderuje stronę w przeglądarce z puli procesu (wywołanie blokujące)"""
+    with get_browser() as browser:
+        return browser.get_page_data(url)
+
+class RenderedPage:
+    """Wynik renderowania w strumieniu crawla - odróżnia go od stron z crawlera"""
+
+    __slots__ = ('data',)
+
+    def __init__(self, data: Dict[str, Any]):
+        self.data = data
+
+class HybridRenderer:
+    """Ograniczona kolejka stron do wyrenderowania w przeglądarce.
+
+    `submit` czeka, gdy w kolejce jest już `max_pending` stron, więc
+    wolne renderowanie spowalnia też crawl. Wyniki (dane z HTTP nadpisane
+    danymi z przeglądarki) trafiają do `output` jako `RenderedPage`;
+    przy błędzie renderowania zostają dane z HTTP. `render` może być
+    funkcją blokującą (wątek) albo korutyną (np. renderer CDP).
+    """
+
+    def __init__(
+        self,
+        output: asyncio.Queue,
+        concurrency: int = 2,
+        max_pending: int = 10,
+        render: Callable[[str], Any] = render_page
+    ):
+        self.output = output
+        self.render = render
+        self._concurrency = asyncio.Semaphore(concurrency)
+        self._pending = asyncio.Semaphore(max_pending)
+        self._tasks: Set[asyncio.Task] = set()
+        self.rendered = 0
+
+    async def submit(self, page: Dict[str, Any]) -> None:
+        await self._pending.acquire()
+        task = asyncio.create_task(self._render(page))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _render(self, page: Dict[str, Any]) -> None:
+        data: Dict[str, Any] = {**page, 'needs_rendering': True}
+        try:
+            async with self._concurrency:
+                if asyncio.iscoroutinefunction(self.render):
+                    rendered = await self.render(page['url'])
+                else:
+                    rendered = await asyncio.get_running_loop().run_in_executor(None, self.render, page['url'])
+            data.update(rendered, url=page['url'], rendered=True)
+            self.rendered += 1
+        except Exception as e:
+            logger.warning(f"Rendering {page['url']} failed: {e!r}")
+            data['render_error'] = str(e)
+        finally:
+            self._pending.release()
+        await self.output.put(RenderedPage(data))
+
+    async def finish(self, done_marker: Optional[Any] = None) -> None:
+        """Czeka na wszystkie renderowania; potem opcjonalnie wstawia znacznik końca"""
+        while self._tasks:
+            await asyncio.gather(*list(self._tasks), return_exceptions=True)
+        if done_marker is not None:
+            await self.output.put(done_marker)
+
+    def cancel(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
@@ -0,0 +1,73 @@
+import hashlib
+from typing import Callable, Dict, Optional, Tuple, Any
+from .frontier import canonicalize_url
+
+# (etag, last_modified, content_hash)
+Validators = Tuple[Optional[str], Optional[str], Optional[str]]
+
+def content_hash(body: bytes) -> str:
+    """Skrót treści strony używany do wykrywania zmian"""
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+def page_validators(etag: Optional[str], last_modified: Optional[str], body: bytes) -> Dict[str, Optional[str]]:
+    """Pola walidatorów zapisywane razem z danymi strony"""
+    return {
+        'etag': etag,
+        'last_modified': last_modified,
+        'content_hash': content_hash(body)
+    }
+
+class RevalidationIndex:
+    """Walidatory stron z poprzedniego audytu tej samej witryny.
+
+    Pozwala wysłać warunkowe requesty (If-None-Match / If-Modified-Since)
+    i rozpoznać niezmienione strony - po odpowiedzi 304 albo po zgodnym
+    skrócie treści. Dla takich stron zamiast parsowania zwracane są dane
+    z poprzedniego audytu przez `load_previous`. Jest ono wywoływane
+    w pętli asyncio albo w wątku reaktora, więc nie może sięgać do bazy -
+    dane muszą być wczytane wcześniej.
+    """
+
+    def __init__(self, validators: Dict[str, Validators], load_previous: Callable[[str], Optional[Dict[str, Any]]]):
+        # kanoniczny URL -> (URL zapisany w poprzednim audycie, walidatory)
+        self._entries = {canonicalize_url(url): (url, v) for url, v in validators.items()}
+        self.load_previous = load_previous
+        self.unchanged = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _get(self, url: str) -> Optional[Validators]:
+        entry = self._entries.get(canonicalize_url(url))
+        return entry[1] if entry else None
+
+    def request_headers(self, url: str) -> Dict[str, str]:
+        """Nagłówki warunkowego GET dla strony znanej z poprzedniego audytu"""
+        validators = self._get(url)
+        if not validators:
+            return {}
+        etag, last_modified, _ = validators
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        return headers
+
+    def is_unchanged(self, url: str, status: int, body: bytes = b'') -> bool:
+        validators = self._get(url)
+        if not validators:
+            return False
+        if status == 304:
+            return True
+        previous_hash = validators[2]
+        return status == 200 and previous_hash is not None and content_hash(body) == previous_hash
+
+    def previous_page(self, url: str) -> Optional[Dict[str, Any]]:
+        """Dane strony z poprzedniego audytu, oznaczone jako niezmienione"""
+        entry = self._entries.get(canonicalize_url(url))
+        data = self.load_previous(entry[0]) if entry else None
+        if data is None:
+            return None
+        self.unchanged += 1
+        return {**data, 'unchanged': True}
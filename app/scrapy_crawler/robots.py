@@ -0,0 +1,55 @@
+from typing import Dict
+
+from scrapy.downloadermiddlewares.robotstxt import RobotsTxtMiddleware
+from scrapy.utils.httpobj import urlparse_cached
+from scrapy.utils.python import to_unicode
+
+from ..services.robots_service import RobotsRules, robots_service
+
+class _RulesParser:
+    """`RobotsRules` z interfejsem parserów robots.txt Scrapy"""
+
+    def __init__(self, rules: RobotsRules):
+        self.rules = rules
+
+    def allowed(self, url, user_agent) -> bool:
+        return self.rules.can_fetch(to_unicode(url), to_unicode(user_agent))
+
+class SharedRobotsTxtMiddleware(RobotsTxtMiddleware):
+    """RobotsTxtMiddleware korzystający ze wspólnego cache robots.txt.
+
+    Reguły zapisane przez inne audyty i workery (`robots_service`) są
+    używane bez pobierania pliku; pobrany plik trafia do cache. Cache
+    czytany jest synchronicznie w wątku reaktora - klient Redis ma krótkie
+    timeouty (ROBOTS_REDIS_TIMEOUT), a jego błąd oznacza po prostu brak trafienia.
+    """
+
+    def __init__(self, crawler):
+        super().__init__(crawler)
+        self._origins: Dict[str, str] = {}
+
+    def robot_parser(self, request, spider):
+        url = urlparse_cached(request)
+        netloc = url.netloc
+        if netloc not in self._parsers:
+            origin = self._origins[netloc] = f"{url.scheme}://{netloc}"
+            rules = robots_service.load_cached(origin)
+            if rules is not None:
+                self._parsers[netloc] = _RulesParser(rules)
+                self.crawler.stats.inc_value("robotstxt/shared_cache_hit")
+        return super().robot_parser(request, spider)
+
+    def _parse_robots(self, response, netloc, spider):
+        self.crawler.stats.inc_value("robotstxt/response_count")
+        self.crawler.stats.inc_value(f"robotstxt/response_status_count/{response.status}")
+        rules = robots_service.store(
+            self._origins[netloc], response.status, response.body.decode('utf-8', 'replace')
+        )
+        rp = _RulesParser(rules)
+        rp_dfd = self._parsers[netloc]
+        self._parsers[netloc] = rp
+        rp_dfd.callback(rp)
+
+    def _robots_error(self, failure, netloc):
+        robots_service.store(self._origins[netloc], None, '')
+        return super()._robots_error(failure, netloc)
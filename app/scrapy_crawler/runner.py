@@ -1,30 +1,288 @@
+import asyncio
+import functools
+import threading
+from scrapy import signals
 from scrapy.crawler import CrawlerRunner
 from scrapy.utils.project import get_project_settings
 from twisted.internet import reactor
-from typing import Dict, List, Any
+from typing import AsyncIterator, Callable, Dict, List, Any, Optional
 from .spiders.seo_spider import SEOSpider
+from .async_engine import AsyncCrawlEngine
+from .revalidation import RevalidationIndex
+from .rendering import HybridRenderer, RenderedPage
 from ..selenium_crawler.browser import get_browser
+from ..selenium_crawler.cdp import ResourceBlocking, close_cdp_renderer, render_page_cdp
+from ..config.settings import settings
+
+_reactor_lock = threading.Lock()
+_reactor_thread: Optional[threading.Thread] = None
+
+def _ensure_reactor_running() -> None:
+    """Uruchamia reaktor Twisted w osobnym wątku (raz na proces)"""
+    global _reactor_thread
+    with _reactor_lock:
+        if _reactor_thread is not None and _reactor_thread.is_alive():
+            return
+        _reactor_thread = threading.Thread(
+            target=reactor.run,
+            kwargs={'installSignalHandlers': False},
+            name='scrapy-reactor',
+            daemon=True
+        )
+        _reactor_thread.start()
+
+class _CrawlStream:
+    """Bufor między wątkiem reaktora a konsumentem asyncio.
+
+    Gdy konsument nie nadąża i w buforze jest `max_buffered` stron,
+    silnik Scrapy jest pauzowany (nie pobiera nowych requestów z kolejki)
+    i wznawiany dopiero po spadku poniżej połowy limitu. Liczniki i stan
+    pauzy zmienia tylko wątek reaktora - konsument zgłasza pobranie
+    strony przez `callFromThread`, więc wznowienie nie może się zgubić.
+    """
+
+    _DONE = object()
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, max_buffered: int,
+                 call_in_reactor: Optional[Callable[..., Any]] = None):
+        self.loop = loop
+        self._call_in_reactor = call_in_reactor or reactor.callFromThread
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.max_buffered = max_buffered
+        self.resume_below = max(max_buffered // 2, 1)
+        self.crawler = None
+        self.produced = 0
+        self.consumed = 0
+        self.paused = False
+
+    @property
+    def pending(self) -> int:
+        return self.produced - self.consumed
+
+    # --- wątek reaktora ---
+    def on_item_scraped(self, item, response, spider) -> None:
+        self.produced += 1
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, dict(item))
+        if not self.paused and self.pending >= self.max_buffered:
+            self.paused = True
+            self.crawler.engine.pause()
+
+    def on_finished(self, result) -> None:
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, self._DONE)
+        return result
+
+    def on_error(self, failure) -> None:
+        self.loop.call_soon_threadsafe(self.queue.put_nowait, failure.value)
+
+    def _resume(self) -> None:
+        engine = self.crawler.engine
+        if engine is None:
+            return
+        self.paused = False
+        engine.unpause()
+        if engine.slot is not None:
+            engine.slot.nextcall.schedule()
+
+    def _on_consumed(self) -> None:
+        self.consumed += 1
+        if self.paused and self.pending < self.resume_below:
+            self._resume()
+
+    def _stop(self) -> None:
+        if self.crawler.crawling:
+            self.crawler.stop()
+
+    # --- wątek konsumenta ---
+    def mark_consumed(self) -> None:
+        self._call_in_reactor(self._on_consumed)
+
+    def start(self, runner: CrawlerRunner, url: str, max_pages: int, depth_limit: int,
+              revalidation: Optional[RevalidationIndex] = None, use_sitemaps: bool = False,
+              detect_rendering: bool = False, lowercase_paths: bool = False) -> None:
+        def _start():
+            crawler = runner.create_crawler(SEOSpider)
+            self.crawler = crawler
+            crawler.signals.connect(self.on_item_scraped, signal=signals.item_scraped)
+            d = runner.crawl(
+                crawler,
+                start_url=url,
+                max_pages=max_pages,
+                depth_limit=depth_limit,
+                revalidation=revalidation,
+                use_sitemaps=use_sitemaps,
+                detect_rendering=detect_rendering,
+                lowercase_paths=lowercase_paths
+            )
+            d.addCallbacks(self.on_finished, self.on_error)
+
+        _ensure_reactor_running()
+        reactor.callFromThread(_start)
+
+    def stop(self) -> None:
+        self._call_in_reactor(self._stop)
+
+class _EngineStream:
+    """Odpowiednik `_CrawlStream` dla silnika asyncio.
+
+    Ograniczona kolejka sama realizuje backpressure - gdy jest pełna,
+    silnik przestaje pobierać kolejne strony.
+    """
+
+    _DONE = _CrawlStream._DONE
+
+    def __init__(self, engine: AsyncCrawlEngine, max_buffered: int):
+        self.engine = engine
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered)
+        self.task: Optional[asyncio.Task] = None
+
+    def start(self, url: str, max_pages: int, depth_limit: int,
+              revalidation: Optional[RevalidationIndex] = None, use_sitemaps: bool = False,
+              lowercase_paths: bool = False) -> None:
+        async def _pump():
+            try:
+                async for page in self.engine.crawl(url, max_pages=max_pages, depth_limit=depth_limit,
+                                                    revalidation=revalidation, use_sitemaps=use_sitemaps,
+                                                    lowercase_paths=lowercase_paths):
+                    await self.queue.put(page)
+            except Exception as e:
+                await self.queue.put(e)
+            else:
+                await self.queue.put(self._DONE)
+
+        self.task = asyncio.create_task(_pump())
+
+    def mark_consumed(self) -> None:
+        pass
+
+    def stop(self) -> None:
+        if self.task is not None:
+            self.task.cancel()
 
 class ScrapyRunner:
-    def __init__(self, use_selenium: bool = False):
+    def __init__(self, use_selenium: bool = False, engine: Optional[str] = None,
+                 render_mode: Optional[str] = None, renderer: Optional[str] = None,
+                 render_config: Optional[Dict[str, Any]] = None):
         self.use_selenium = use_selenium
+        self.engine = engine or settings.CRAWL_ENGINE
+        # none - tylko HTTP, hybrid - strony wymagające JS renderowane w przeglądarce
+        self.render_mode = render_mode or settings.CRAWL_RENDER_MODE
+        # selenium - pula WebDriverów, cdp - Chrome przez DevTools z blokowaniem zasobów
+        self.renderer = renderer or settings.CRAWL_RENDERER
+        self.blocking = ResourceBlocking.from_config(render_config)
         self.settings = get_project_settings()
+        # Bez scrapy.cfg get_project_settings() nie widzi naszego modułu ustawień
+        self.settings.setmodule('app.scrapy_crawler.settings', priority='project')
         self.runner = CrawlerRunner(self.settings)
-        self.results: List[Dict[str, Any]] = []
 
     async def crawl(self, url: str, max_pages: int = 30, depth_limit: int = 2) -> List[Dict[str, Any]]:
+        results: List[Dict[str, Any]] = []
+        async for chunk in self.crawl_in_chunks(url, max_pages=max_pages, depth_limit=depth_limit):
+            results.extend(chunk)
+        return results
+
+    async def crawl_in_chunks(
+        self,
+        url: str,
+        max_pages: int = 30,
+        depth_limit: int = 2,
+        chunk_size: int = 100,
+        max_buffered: Optional[int] = None,
+        flush_interval: float = 5.0,
+        revalidation: Optional[RevalidationIndex] = None,
+        use_sitemaps: Optional[bool] = None,
+        lowercase_paths: bool = False
+    ) -> AsyncIterator[List[Dict[str, Any]]]:
+        """Strumieniuje wyniki crawla porcjami w trakcie działania pająka.
+
+        W pamięci trzymane jest najwyżej `max_buffered` stron (domyślnie
+        dwa chunki) plus requesty będące w locie. Niepełny chunk jest
+        oddawany, jeśli przez `flush_interval` sekund nie przyszła nowa strona.
+        Przy ponownym audycie `revalidation` pozwala pominąć niezmienione strony.
+        `use_sitemaps` (domyślnie CRAWL_USE_SITEMAPS) dodaje do frontiera adresy z sitemap.
+        `lowercase_paths` (opcja audytu) łączy adresy różniące się tylko wielkością liter ścieżki.
+        W trybie `hybrid` strony oznaczone `needs_rendering` przechodzą jeszcze
+        przez przeglądarkę i trafiają do tego samego strumienia.
+        """
         if self.use_selenium:
+            if self.renderer == "cdp":
+                try:
+                    yield [await render_page_cdp(url, self.blocking)]
+                finally:
+                    await close_cdp_renderer()
+                return
             with get_browser() as browser:
-                return [browser.get_page_data(url)]
+                yield [browser.get_page_data(url)]
+            return
+
+        if use_sitemaps is None:
+            use_sitemaps = settings.CRAWL_USE_SITEMAPS
+        hybrid = self.render_mode == "hybrid"
+        if self.engine == "asyncio":
+            stream = _EngineStream(AsyncCrawlEngine(detect_rendering=hybrid), max_buffered or chunk_size * 2)
+            stream.start(url, max_pages, depth_limit, revalidation, use_sitemaps, lowercase_paths)
         else:
-            def _crawl():
-                d = self.runner.crawl(
-                    SEOSpider,
-                    start_url=url,
-                    max_pages=max_pages,
-                    depth_limit=depth_limit
-                )
-                return d
-            
-            await reactor.callFromThread(_crawl)
-            return self.results 
\ No newline at end of file
+            stream = _CrawlStream(asyncio.get_running_loop(), max_buffered or chunk_size * 2)
+            stream.start(self.runner, url, max_pages, depth_limit, revalidation, use_sitemaps, hybrid,
+                         lowercase_paths)
+        renderer: Optional[HybridRenderer] = None
+        if hybrid and self.renderer == "cdp":
+            renderer = HybridRenderer(
+                stream.queue,
+                concurrency=settings.CDP_MAX_TABS,
+                max_pending=settings.CRAWL_RENDER_QUEUE_SIZE,
+                render=functools.partial(render_page_cdp, blocking=self.blocking)
+            )
+        elif hybrid:
+            renderer = HybridRenderer(
+                stream.queue,
+                concurrency=settings.SELENIUM_POOL_SIZE,
+                max_pending=settings.CRAWL_RENDER_QUEUE_SIZE
+            )
+        finishing: Optional[asyncio.Task] = None
+
+        chunk: List[Dict[str, Any]] = []
+        finished = False
+        try:
+            while True:
+                try:
+                    item = await asyncio.wait_for(stream.queue.get(), timeout=flush_interval)
+                except asyncio.TimeoutError:
+                    if chunk:
+                        yield chunk
+                        chunk = []
+                    continue
+
+                if item is stream._DONE:
+                    if renderer is not None and finishing is None:
+                        # Crawl skończony - czekamy jeszcze na renderowane strony
+                        finishing = asyncio.create_task(renderer.finish(stream._DONE))
+                        continue
+                    finished = True
+                    break
+                if isinstance(item, BaseException):
+                    finished = True
+                    raise item
+
+                if isinstance(item, RenderedPage):
+                    item = item.data
+                else:
+                    stream.mark_consumed()
+                    if renderer is not None and item.get('needs_rendering'):
+                        await renderer.submit(item)
+                        continue
+                chunk.append(item)
+                if len(chunk) >= chunk_size:
+                    yield chunk
+                    chunk = []
+
+            if chunk:
+                yield chunk
+        finally:
+            if renderer is not None:
+                renderer.cancel()
+                if finishing is not None:
+                    finishing.cancel()
+                if self.renderer == "cdp":
+                    await close_cdp_renderer()
+            if not finished:
+                stream.stop()
@@ -6,5 +6,25 @@ NEWSPIDER_MODULE = 'app.scrapy_crawler.spiders'
 USER_AGENT = 'SEO-MVP-Crawler/1.0'
 
 ROBOTSTXT_OBEY = True
-CONCURRENT_REQUESTS = 8
-DOWNLOAD_DELAY = 1 
\ No newline at end of file
+
+# Limit jak HTTP_MAX_BODY_BYTES klienta HTTP - większe odpowiedzi są przerywane
+DOWNLOAD_MAXSIZE = 10 * 1024 * 1024
+DOWNLOAD_WARNSIZE = 2 * 1024 * 1024
+CONCURRENT_REQUESTS = 16
+
+# Wartości startowe - dalej limity per host ustala AdaptiveThrottleMiddleware
+CONCURRENT_REQUESTS_PER_DOMAIN = 2
+DOWNLOAD_DELAY = 0.5
+
+ADAPTIVE_THROTTLE_ENABLED = True
+ADAPTIVE_THROTTLE_MAX_CONCURRENCY = 16
+ADAPTIVE_THROTTLE_MAX_DELAY = 60.0
+ADAPTIVE_THROTTLE_TARGET_LATENCY = 2.0
+ADAPTIVE_THROTTLE_RECOVERY = 0.5
+
+DOWNLOADER_MIDDLEWARES = {
+    # robots.txt ze wspólnego cache (app.services.robots_service)
+    'scrapy.downloadermiddlewares.robotstxt.RobotsTxtMiddleware': None,
+    'app.scrapy_crawler.robots.SharedRobotsTxtMiddleware': 100,
+    'app.scrapy_crawler.throttle.AdaptiveThrottleMiddleware': 560,
+}
@@ -0,0 +1,186 @@
+import asyncio
+import logging
+import zlib
+from typing import AsyncIterator, Iterable, List, NamedTuple, Optional
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import XMLPullParser, ParseError
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+GZIP_MAGIC = b'\x1f\x8b'
+CHUNK_SIZE = 64 * 1024
+# Limit specyfikacji to 50 MB na plik - większe ucinamy
+MAX_SITEMAP_BYTES = 50 * 1024 * 1024
+MAX_SITEMAPS = 50
+
+class SitemapEntry(NamedTuple):
+    loc: str
+    lastmod: Optional[str]
+    # 'url' - strona, 'sitemap' - zagnieżdżona mapa z indeksu
+    kind: str
+    priority: Optional[float] = None
+
+def default_sitemap_url(url: str) -> str:
+    return urljoin(url, '/sitemap.xml')
+
+def robots_sitemaps(robots_txt: str) -> List[str]:
+    """Adresy z dyrektyw `Sitemap:` w robots.txt"""
+    sitemaps = []
+    for line in robots_txt.splitlines():
+        key, _, value = line.partition(':')
+        if key.strip().lower() == 'sitemap' and value.strip():
+            sitemaps.append(value.strip())
+    return sitemaps
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+def _priority(value: Optional[str]) -> Optional[float]:
+    try:
+        return min(max(float(value), 0.0), 1.0) if value else None
+    except ValueError:
+        return None
+
+class SitemapParser:
+    """Przyrostowy parser sitemap / indeksów sitemap (także .xml.gz).
+
+    Dane podaje się kawałkami przez `feed()`, który od razu zwraca
+    kompletne wpisy. Przetworzone elementy są usuwane z drzewa, więc
+    zużycie pamięci nie zależy od rozmiaru pliku.
+    """
+
+    def __init__(self, max_bytes: int = MAX_SITEMAP_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.truncated = False
+        self._parser = XMLPullParser(events=('start', 'end'))
+        self._decompressor = None
+        self._started = False
+        self._root = None
+        self._failed = False
+
+    def feed(self, chunk: bytes) -> List[SitemapEntry]:
+        if not chunk:
+            return []
+        if not self._started:
+            self._started = True
+            if chunk.startswith(GZIP_MAGIC):
+                self._decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        if self._decompressor is None:
+            self._feed_xml(chunk)
+        # Rozpakowujemy porcjami, żeby "bomba" gzip nie przekroczyła limitu w pamięci
+        while chunk and not self.truncated and not self._failed and self._decompressor is not None:
+            try:
+                data = self._decompressor.decompress(chunk, self.max_bytes - self.size + 1)
+            except zlib.error as e:
+                logger.warning(f"Invalid gzipped sitemap: {e}")
+                self._failed = True
+                break
+            self._feed_xml(data)
+            chunk = self._decompressor.unconsumed_tail
+        return self._entries()
+
+    def _feed_xml(self, data: bytes) -> None:
+        if self.truncated or self._failed:
+            return
+        self.size += len(data)
+        if self.size > self.max_bytes:
+            self.truncated = True
+            data = data[:len(data) - (self.size - self.max_bytes)]
+        try:
+            self._parser.feed(data)
+        except ParseError as e:
+            logger.warning(f"Invalid sitemap XML: {e}")
+            self._failed = True
+
+    def close(self) -> List[SitemapEntry]:
+        if not self.truncated and not self._failed:
+            try:
+                self._parser.close()
+            except ParseError:
+                pass
+        return self._entries()
+
+    def _entries(self) -> List[SitemapEntry]:
+        entries = []
+        for event, elem in self._parser.read_events():
+            if event == 'start':
+                if self._root is None:
+                    self._root = elem
+                continue
+            kind = _local_name(elem.tag)
+            if kind not in ('url', 'sitemap'):
+                continue
+            fields = {_local_name(child.tag): (child.text or '').strip() for child in elem}
+            if fields.get('loc'):
+                entries.append(SitemapEntry(
+                    fields['loc'], fields.get('lastmod') or None, kind, _priority(fields.get('priority'))
+                ))
+            # Zwolnienie już przetworzonych elementów
+            self._root.clear()
+        return entries
+
+def parse_sitemap(chunks: Iterable[bytes], max_bytes: int = MAX_SITEMAP_BYTES) -> Iterable[SitemapEntry]:
+    """Parsuje sitemapę podaną jako ciąg kawałków bajtów"""
+    parser = SitemapParser(max_bytes)
+    for chunk in chunks:
+        yield from parser.feed(chunk)
+    yield from parser.close()
+
+def iter_chunks(body: bytes, size: int = CHUNK_SIZE) -> Iterable[bytes]:
+    for start in range(0, len(body), size):
+        yield body[start:start + size]
+
+async def iter_sitemap_urls(
+    session: aiohttp.ClientSession,
+    sitemap_urls: Iterable[str],
+    base_domain: str,
+    max_urls: int,
+    max_sitemaps: int = MAX_SITEMAPS,
+    timeout: float = 15
+) -> AsyncIterator[SitemapEntry]:
+    """Strumieniowo pobiera sitemapy (wraz z indeksami) i oddaje adresy stron z domeny"""
+    pending = list(sitemap_urls)
+    seen = set(pending)
+    fetched = found = 0
+    # Limit na odczyt kolejnych porcji zamiast na cały (nawet 50 MB) plik
+    client_timeout = aiohttp.ClientTimeout(total=None, sock_connect=timeout, sock_read=timeout)
+
+    def pages(entries: List[SitemapEntry]) -> List[SitemapEntry]:
+        result = []
+        for entry in entries:
+            if entry.kind == 'sitemap':
+                if entry.loc not in seen:
+                    seen.add(entry.loc)
+                    pending.append(entry.loc)
+            elif urlparse(entry.loc).netloc == base_domain:
+                result.append(entry)
+        return result
+
+    while pending and fetched < max_sitemaps and found < max_urls:
+        sitemap_url = pending.pop(0)
+        fetched += 1
+        parser = SitemapParser()
+        try:
+            async with session.get(sitemap_url, timeout=client_timeout) as response:
+                if response.status != 200:
+                    continue
+                async for chunk in response.content.iter_chunked(CHUNK_SIZE):
+                    for entry in pages(parser.feed(chunk)):
+                        yield entry
+                        found += 1
+                        if found >= max_urls:
+                            return
+                    if parser.truncated:
+                        logger.warning(f"Sitemap {sitemap_url} exceeds {parser.max_bytes} bytes, truncated")
+                        break
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.warning(f"Could not fetch sitemap {sitemap_url}: {e!r}")
+            continue
+        for entry in pages(parser.close()):
+            yield entry
+            found += 1
+            if found >= max_urls:
+                return
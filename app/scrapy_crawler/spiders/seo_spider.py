@@ -1,60 +1,159 @@
-from scrapy import Spider, Request
+from scrapy import Spider, Request, signals
+from scrapy.exceptions import StopDownload
 from urllib.parse import urljoin, urlparse
-from typing import Dict, Any, Generator
+from typing import Any, Dict, Generator, Optional
+from ...core.http_client import ResponseRejected, check_html_headers
+from ...services.robots_service import robots_origin, robots_service
+from ..extraction import extract_page_data
+from ..frontier import URLFrontier, url_priority
+from ..revalidation import RevalidationIndex, page_validators
+from ..sitemaps import (
+    MAX_SITEMAP_BYTES, MAX_SITEMAPS, default_sitemap_url, iter_chunks, parse_sitemap, robots_sitemaps
+)
 
 class SEOSpider(Spider):
     name = 'seo_spider'
     custom_settings = {
-        'CONCURRENT_REQUESTS': 16,
-        'DOWNLOAD_DELAY': 0.5,
+        # Tempo crawla (równoległość, opóźnienia) - patrz settings.py i throttle.py
         'ROBOTSTXT_OBEY': True,
         'COOKIES_ENABLED': False,
         'RETRY_ENABLED': True,
         'RETRY_TIMES': 3,
         'DOWNLOAD_TIMEOUT': 15,
     }
-    
-    def __init__(self, start_url: str, max_pages: int = 30, depth_limit: int = 2, *args, **kwargs):
+    # 304 trafia do parse - to odpowiedź na warunkowy request przy ponownym audycie
+    handle_httpstatus_list = [304]
+
+    def __init__(self, start_url: str, max_pages: int = 30, depth_limit: int = 2,
+                 revalidation: Optional[RevalidationIndex] = None, use_sitemaps: bool = False,
+                 detect_rendering: bool = False, lowercase_paths: bool = False, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.start_urls = [start_url]
         self.max_pages = max_pages
         self.depth_limit = depth_limit
         self.base_domain = urlparse(start_url).netloc
         self.visited_count = 0
-        self.visited_urls = set()
+        self.frontier = URLFrontier(lowercase_path=lowercase_paths)
+        self.frontier.add(start_url)
+        self.revalidation = revalidation
+        self.use_sitemaps = use_sitemaps
+        self.detect_rendering = detect_rendering
+        self.sitemaps_requested = 0
+        self.sitemap_seeds = 0
+        # kanoniczny URL -> lastmod z sitemapy
+        self.sitemap_lastmod: Dict[str, str] = {}
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        crawler.signals.connect(spider.on_headers_received, signal=signals.headers_received)
+        return spider
 
-    def parse(self, response) -> Generator[Dict[str, Any], None, None]:
-        if self.visited_count >= self.max_pages:
+    def on_headers_received(self, headers, body_length, request, spider) -> None:
+        """Przerywa pobieranie stron, które po nagłówkach nie są HTML-em"""
+        if spider is not self or request.callback != self.parse:
             return
+        try:
+            check_html_headers(200, {
+                'Content-Type': headers.get(b'Content-Type', b'').decode('latin-1'),
+                'Content-Length': str(body_length) if body_length > 0 else ''
+            }, self.settings.getint('DOWNLOAD_MAXSIZE'))
+        except ResponseRejected as e:
+            self.logger.debug(f"Skipping {request.url}: {e}")
+            raise StopDownload(fail=False)
+
+    def start_requests(self) -> Generator[Request, None, None]:
+        for url in self.start_urls:
+            yield self._request(url, dont_filter=True)
+        if self.use_sitemaps:
+            # Sitemapy z robots.txt ze wspólnego cache - bez drugiego pobrania pliku
+            rules = robots_service.load_cached(robots_origin(self.start_urls[0]))
+            if rules is not None:
+                for url in rules.sitemaps or [default_sitemap_url(self.start_urls[0])]:
+                    yield from self._sitemap_request(url)
+                return
+            yield Request(
+                urljoin(self.start_urls[0], '/robots.txt'),
+                callback=self.parse_robots,
+                meta={'handle_httpstatus_all': True},
+                dont_filter=True
+            )
+
+    def _request(self, url: str, depth: int = 0, sitemap_priority: Optional[float] = None, **kwargs) -> Request:
+        headers = self.revalidation.request_headers(url) if self.revalidation else {}
+        # Scheduler Scrapy pobiera najpierw requesty o najwyższym priorytecie.
+        # Priorytet jest ustalany przy odkryciu linku - kolejne inlinki go nie zmieniają.
+        priority = round(url_priority(url, depth, 1 if depth else 0, sitemap_priority) * 10)
+        return Request(url, callback=self.parse, headers=headers, priority=priority, **kwargs)
+
+    def parse(self, response) -> Generator[Any, None, None]:
+        if self.visited_count >= self.max_pages or 'download_stopped' in response.flags:
+            return
+
+        data = None
+        if self.revalidation and self.revalidation.is_unchanged(response.url, response.status, response.body):
+            # Strona bez zmian - przenosimy wyniki z poprzedniego audytu
+            data = self.revalidation.previous_page(response.url)
 
+        if data is None:
+            if response.status == 304:
+                # Brak zapisanych danych - pobieramy stronę ponownie bez warunków
+                yield Request(response.url, callback=self.parse, dont_filter=True)
+                return
+            # Zbieramy dane SEO
+            data = extract_page_data(response.url, response.status, response, self.detect_rendering)
+            data.update(page_validators(
+                response.headers.get('ETag', b'').decode('latin-1') or None,
+                response.headers.get('Last-Modified', b'').decode('latin-1') or None,
+                response.body
+            ))
+            if response.meta.get('redirect_urls'):
+                # Kroki przekierowań przed tą stroną (RedirectMiddleware)
+                data['redirect_chain'] = [
+                    [url, status] for url, status in
+                    zip(response.meta['redirect_urls'], response.meta.get('redirect_reasons', []))
+                ]
+
+        if self.sitemap_lastmod:
+            data['sitemap_lastmod'] = self.sitemap_lastmod.get(self.frontier.canonicalize(response.url))
         self.visited_count += 1
-        
-        # Zbieramy dane SEO
-        data = {
-            'url': response.url,
-            'status_code': response.status,
-            'title': response.css('title::text').get(),
-            'meta_description': response.css('meta[name="description"]::attr(content)').get(),
-            'h1_tags': response.css('h1::text').getall(),
-            'images': [
-                {
-                    'src': img.attrib.get('src'),
-                    'alt': img.attrib.get('alt')
-                } for img in response.css('img')
-            ],
-            'links': [
-                {
-                    'url': urljoin(response.url, a.attrib.get('href')),
-                    'text': a.css('::text').get()
-                } for a in response.css('a[href]')
-            ]
-        }
-        
         yield data
 
         # Crawl linków wewnętrznych
         if self.visited_count < self.max_pages:
-            for link in response.css('a[href]'):
-                url = urljoin(response.url, link.attrib.get('href'))
-                if urlparse(url).netloc == self.base_domain:
-                    yield Request(url, callback=self.parse) 
\ No newline at end of file
+            depth = response.meta.get('depth', 0) + 1
+            for link in data.get('links', []):
+                url = link.get('url')
+                if url and urlparse(url).netloc == self.base_domain and self.frontier.add(url):
+                    yield self._request(url, depth)
+
+    def parse_robots(self, response) -> Generator[Request, None, None]:
+        sitemaps = robots_sitemaps(response.body.decode('utf-8', 'replace')) if response.status == 200 else []
+        for url in sitemaps or [default_sitemap_url(response.url)]:
+            yield from self._sitemap_request(url)
+
+    def _sitemap_request(self, url: str) -> Generator[Request, None, None]:
+        if self.sitemaps_requested >= MAX_SITEMAPS:
+            return
+        self.sitemaps_requested += 1
+        yield Request(
+            url,
+            callback=self.parse_sitemap,
+            meta={'handle_httpstatus_all': True, 'download_maxsize': MAX_SITEMAP_BYTES}
+        )
+
+    def parse_sitemap(self, response) -> Generator[Request, None, None]:
+        """Zasila frontier adresami z sitemapy (parsowanej przyrostowo, także .gz)"""
+        if response.status != 200:
+            return
+        for entry in parse_sitemap(iter_chunks(response.body)):
+            if entry.kind == 'sitemap':
+                yield from self._sitemap_request(entry.loc)
+                continue
+            if self.sitemap_seeds >= self.max_pages or self.visited_count >= self.max_pages:
+                return
+            if urlparse(entry.loc).netloc == self.base_domain and self.frontier.add(entry.loc):
+                self.sitemap_seeds += 1
+                if entry.lastmod:
+                    self.sitemap_lastmod[self.frontier.canonicalize(entry.loc)] = entry.lastmod
+                yield self._request(entry.loc, sitemap_priority=entry.priority)
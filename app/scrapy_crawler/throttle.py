@@ -0,0 +1,209 @@
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Set
+
+from scrapy.exceptions import NotConfigured
+
+from ..services.robots_service import robots_origin, robots_service
+
+logger = logging.getLogger(__name__)
+
+# Odpowiedzi oznaczające, że serwer nie nadąża lub prosi o zwolnienie
+BACKOFF_HTTP_CODES = {429, 503}
+
+def parse_retry_after(value, now: Optional[float] = None) -> Optional[float]:
+    """Liczba sekund z nagłówka Retry-After (liczba sekund albo data HTTP)"""
+    if value is None:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode('latin-1')
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        moment = parsedate_to_datetime(value).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return None
+    return max(0.0, moment - (time.time() if now is None else now))
+
+class HostThrottle:
+    """Bieżący limit równoległości i odstęp między requestami dla hosta"""
+
+    def __init__(self, concurrency: float, delay: float):
+        self.concurrency = concurrency
+        self.delay = delay
+        self.latency: Optional[float] = None
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        # Crawl-delay z robots.txt - dolna granica odstępu, jeden request naraz
+        self.crawl_delay = 0.0
+
+    @property
+    def limit(self) -> int:
+        return max(1, int(self.concurrency))
+
+class AIMDThrottle:
+    """Adaptacyjne ograniczanie tempa crawla per host (AIMD).
+
+    Każda zdrowa odpowiedź zwiększa równoległość addytywnie (o `increase`
+    na pełne "okno" requestów) i skraca nadwyżkę odstępu ponad minimum
+    multiplikatywnie (`recovery`), więc po kilku błędach host wraca do
+    normalnego tempa w kilka requestów, a nie w setki. Błąd, timeout,
+    429/503 albo wygładzony czas odpowiedzi powyżej `target_latency`
+    zmniejsza równoległość multiplikatywnie i podwaja odstęp - najwyżej
+    raz na `cooldown`, żeby seria błędów z jednego okna nie zbiła limitu
+    do zera. Retry-After wstrzymuje requesty do hosta na wskazany czas.
+    """
+
+    def __init__(
+        self,
+        start_concurrency: float = 2,
+        min_concurrency: float = 1,
+        max_concurrency: float = 16,
+        start_delay: float = 0.5,
+        min_delay: float = 0.0,
+        max_delay: float = 60.0,
+        increase: float = 1.0,
+        decrease: float = 0.5,
+        recovery: float = 0.5,
+        target_latency: float = 2.0,
+        cooldown: float = 1.0,
+        smoothing: float = 0.3
+    ):
+        self.start_concurrency = start_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.start_delay = start_delay
+        self.min_delay = min_delay
+        self.max_delay = max_delay
+        self.increase = increase
+        self.decrease = decrease
+        self.recovery = recovery
+        self.target_latency = target_latency
+        self.cooldown = cooldown
+        self.smoothing = smoothing
+        self.hosts: Dict[str, HostThrottle] = {}
+
+    def host(self, host: str) -> HostThrottle:
+        state = self.hosts.get(host)
+        if state is None:
+            state = self.hosts[host] = HostThrottle(
+                min(self.max_concurrency, max(self.min_concurrency, self.start_concurrency)),
+                self.start_delay
+            )
+        return state
+
+    def set_crawl_delay(self, host: str, delay: Optional[float]) -> HostThrottle:
+        """Uwzględnia Crawl-delay z robots.txt (ograniczony do `max_delay`)"""
+        state = self.host(host)
+        if delay:
+            state.crawl_delay = min(float(delay), self.max_delay)
+            state.delay = max(state.delay, state.crawl_delay)
+            state.concurrency = 1
+        return state
+
+    def on_response(self, host: str, latency: float, status: int,
+                    retry_after: Optional[float] = None, now: Optional[float] = None) -> HostThrottle:
+        """Aktualizuje limity hosta po otrzymaniu odpowiedzi"""
+        now = time.monotonic() if now is None else now
+        state = self.host(host)
+        if status in BACKOFF_HTTP_CODES or status >= 500:
+            return self._back_off(state, now, retry_after)
+
+        state.latency = latency if state.latency is None else (
+            self.smoothing * latency + (1 - self.smoothing) * state.latency
+        )
+        if state.latency > self.target_latency:
+            return self._back_off(state, now)
+
+        max_concurrency = 1 if state.crawl_delay else self.max_concurrency
+        state.concurrency = min(max_concurrency, state.concurrency + self.increase / state.limit)
+        floor = max(self.min_delay, state.crawl_delay)
+        excess = (state.delay - floor) * self.recovery
+        # Resztki poniżej 10 ms pomijamy - mnożenie nigdy nie dałoby zera
+        state.delay = floor + excess if excess >= 0.01 else floor
+        return state
+
+    def on_error(self, host: str, now: Optional[float] = None) -> HostThrottle:
+        """Timeout lub błąd połączenia"""
+        return self._back_off(self.host(host), time.monotonic() if now is None else now)
+
+    def wait_time(self, host: str, now: Optional[float] = None) -> float:
+        """Ile sekund host jest jeszcze wstrzymany przez Retry-After"""
+        now = time.monotonic() if now is None else now
+        return max(0.0, self.host(host).blocked_until - now)
+
+    def _back_off(self, state: HostThrottle, now: float, retry_after: Optional[float] = None) -> HostThrottle:
+        if retry_after:
+            retry_after = min(retry_after, self.max_delay)
+            state.blocked_until = max(state.blocked_until, now + retry_after)
+        if now - state.last_decrease < self.cooldown:
+            return state
+        state.last_decrease = now
+        state.concurrency = max(self.min_concurrency, state.concurrency * self.decrease)
+        state.delay = min(self.max_delay, max(state.delay * 2, self.start_delay, self.min_delay))
+        return state
+
+class AdaptiveThrottleMiddleware:
+    """Downloader middleware Scrapy ustawiający slot hosta według `AIMDThrottle`.
+
+    Zastępuje stałe DOWNLOAD_DELAY / CONCURRENT_REQUESTS_PER_DOMAIN:
+    po każdej odpowiedzi lub błędzie zmienia `concurrency` i `delay`
+    slotu downloadera, z którego przyszedł request.
+    """
+
+    def __init__(self, crawler, throttle: AIMDThrottle):
+        self.crawler = crawler
+        self.throttle = throttle
+        # Sloty, dla których uwzględniono już Crawl-delay z robots.txt
+        self._robots_checked: Set[str] = set()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        s = crawler.settings
+        if not s.getbool('ADAPTIVE_THROTTLE_ENABLED'):
+            raise NotConfigured
+        return cls(crawler, AIMDThrottle(
+            start_concurrency=s.getint('CONCURRENT_REQUESTS_PER_DOMAIN'),
+            max_concurrency=s.getint('ADAPTIVE_THROTTLE_MAX_CONCURRENCY', 16),
+            start_delay=s.getfloat('DOWNLOAD_DELAY'),
+            max_delay=s.getfloat('ADAPTIVE_THROTTLE_MAX_DELAY', 60.0),
+            target_latency=s.getfloat('ADAPTIVE_THROTTLE_TARGET_LATENCY', 2.0),
+            recovery=s.getfloat('ADAPTIVE_THROTTLE_RECOVERY', 0.5)
+        ))
+
+    def process_response(self, request, response, spider):
+        key, slot = self._slot(request)
+        if slot is not None and key not in self._robots_checked:
+            # Sama odpowiedź z robots.txt przychodzi, zanim reguły trafią do cache
+            rules = robots_service.peek(robots_origin(request.url))
+            if rules is not None:
+                self._robots_checked.add(key)
+                self.throttle.set_crawl_delay(key, rules.crawl_delay(self.crawler.settings.get('USER_AGENT')))
+        if slot is not None:
+            latency = request.meta.get('download_latency', 0.0)
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            self._apply(slot, self.throttle.on_response(key, latency, response.status, retry_after), key)
+        return response
+
+    def process_exception(self, request, exception, spider):
+        key, slot = self._slot(request)
+        if slot is not None:
+            self._apply(slot, self.throttle.on_error(key), key)
+        return None
+
+    def _slot(self, request):
+        key = request.meta.get('download_slot')
+        engine = self.crawler.engine
+        if key is None or engine is None:
+            return key, None
+        return key, engine.downloader.slots.get(key)
+
+    def _apply(self, slot, state: HostThrottle, key: str) -> None:
+        # Retry-After wydłuża opóźnienie slotu do końca blokady
+        delay = max(state.delay, self.throttle.wait_time(key))
+        if slot.concurrency != state.limit or abs(slot.delay - delay) > 0.01:
+            logger.debug(f"Throttle {key}: concurrency={state.limit} delay={delay:.2f}s")
+        slot.concurrency = state.limit
+        slot.delay = delay
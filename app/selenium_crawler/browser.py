@@ -4,9 +4,76 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.common.by import By
+from selenium.common.exceptions import WebDriverException
 from webdriver_manager.chrome import ChromeDriverManager
 from contextlib import contextmanager
-from typing import Generator, Dict, Any
+from functools import lru_cache
+from typing import Generator, Dict, Any, List, Optional
+import atexit
+import json
+import logging
+import os
+import threading
+
+from ..config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Odpowiednik get_attribute()/.text Selenium: href/src jako pełne URL-e, tekst widoczny
+EXTRACT_PAGE_DATA_SCRIPT = """
+var text = function (el) { return (el.innerText || '').trim(); };
+var all = function (selector) { return Array.prototype.slice.call(document.querySelectorAll(selector)); };
+// <a> w SVG ma href typu SVGAnimatedString
+var href = function (a) { return typeof a.href === 'string' ? a.href : a.getAttribute('href'); };
+var meta = document.querySelector('meta[name="description"]');
+return JSON.stringify({
+    title: document.title,
+    meta_description: meta ? meta.getAttribute('content') : null,
+    h1_tags: all('h1').map(text).filter(function (t) { return t; }),
+    links: all('a').filter(href).map(function (a) {
+        return {url: href(a), text: text(a)};
+    }),
+    images: all('img').filter(function (img) { return img.src; }).map(function (img) {
+        return {src: img.src, alt: img.getAttribute('alt')};
+    })
+});
+"""
+
+@lru_cache(maxsize=None)
+def _driver_path() -> str:
+    """Ścieżka do chromedrivera - sprawdzana przez webdriver_manager raz na proces"""
+    return ChromeDriverManager().install()
+
+def _process_tree_rss_mb(pid: int) -> Optional[float]:
+    """Pamięć (RSS) procesu i jego potomków w MB; None poza Linuksem"""
+    if not os.path.isdir('/proc'):
+        return None
+    children: Dict[int, List[int]] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # Pole ppid jest czwarte, za nazwą procesu w nawiasach
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    total_kb = 0
+    stack = [pid]
+    while stack:
+        current = stack.pop()
+        stack.extend(children.get(current, []))
+        try:
+            with open(f'/proc/{current}/status') as f:
+                for line in f:
+                    if line.startswith('VmRSS:'):
+                        total_kb += int(line.split()[1])
+                        break
+        except (OSError, ValueError):
+            continue
+    return total_kb / 1024
 
 class SeleniumBrowser:
     def __init__(self, headless: bool = True):
@@ -17,9 +84,27 @@ class SeleniumBrowser:
         chrome_options.add_argument('--disable-dev-shm-usage')
         
         self.driver = webdriver.Chrome(
-            service=Service(ChromeDriverManager().install()),
+            service=Service(_driver_path()),
             options=chrome_options
         )
+        self.pages_served = 0
+        
+    def is_healthy(self) -> bool:
+        """Czy przeglądarka nadal odpowiada"""
+        try:
+            return self.driver.execute_script('return 1') == 1
+        except WebDriverException:
+            return False
+    
+    def memory_mb(self) -> Optional[float]:
+        """Pamięć chromedrivera i procesów Chrome"""
+        process = getattr(self.driver.service, 'process', None)
+        return _process_tree_rss_mb(process.pid) if process else None
+    
+    def reset(self) -> None:
+        """Czyści stan po stronie, zanim przeglądarka trafi do kolejnego zadania"""
+        self.driver.delete_all_cookies()
+        self.driver.get('about:blank')
         
     def get_page_data(self, url: str, wait_time: int = 5) -> Dict[str, Any]:
         self.driver.get(url)
@@ -27,41 +112,140 @@ class SeleniumBrowser:
             EC.presence_of_element_located((By.TAG_NAME, "body"))
         )
         
-        return {
-            'url': url,
-            'title': self.driver.title,
-            'meta_description': self._get_meta_description(),
-            'h1_tags': self._get_elements_text('h1'),
-            'links': self._get_links(),
-            'images': self._get_images()
-        }
-    
-    def _get_meta_description(self) -> str:
-        meta = self.driver.find_elements(By.CSS_SELECTOR, 'meta[name="description"]')
-        return meta[0].get_attribute('content') if meta else None
-        
-    def _get_elements_text(self, tag: str) -> list:
-        elements = self.driver.find_elements(By.TAG_NAME, tag)
-        return [el.text for el in elements if el.text.strip()]
-        
-    def _get_links(self) -> list:
-        links = self.driver.find_elements(By.TAG_NAME, 'a')
-        return [{'url': link.get_attribute('href'), 'text': link.text}
-                for link in links if link.get_attribute('href')]
-                
-    def _get_images(self) -> list:
-        images = self.driver.find_elements(By.TAG_NAME, 'img')
-        return [{'src': img.get_attribute('src'), 'alt': img.get_attribute('alt')}
-                for img in images if img.get_attribute('src')]
+        # Jeden round-trip do przeglądarki zamiast osobnego dla każdego elementu
+        data = json.loads(self.driver.execute_script(EXTRACT_PAGE_DATA_SCRIPT))
+        return {'url': url, **data}
     
     def close(self):
         if self.driver:
-            self.driver.quit()
+            try:
+                self.driver.quit()
+            except WebDriverException:
+                logger.warning("Could not quit Chrome cleanly", exc_info=True)
+            self.driver = None
+
+class BrowserPool:
+    """Pula "ciepłych" przeglądarek współdzielona w obrębie procesu.
+
+    Najwyżej `size` przeglądarek renderuje jednocześnie - kolejne
+    wypożyczenia czekają na zwrot. Przed wydaniem przeglądarka jest
+    sprawdzana, a po `max_pages` stronach lub przekroczeniu
+    `max_memory_mb` zamykana i zastępowana nową.
+    """
+
+    def __init__(
+        self,
+        size: int = 2,
+        headless: bool = True,
+        max_pages: int = 50,
+        max_memory_mb: Optional[float] = 1024,
+        lease_timeout: Optional[float] = 120
+    ):
+        self.size = size
+        self.headless = headless
+        self.max_pages = max_pages
+        self.max_memory_mb = max_memory_mb
+        self.lease_timeout = lease_timeout
+        self._idle: List[SeleniumBrowser] = []
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def warm(self, count: Optional[int] = None) -> None:
+        """Uruchamia przeglądarki z wyprzedzeniem (domyślnie całą pulę)"""
+        with self._lock:
+            missing = min(count or self.size, self.size) - len(self._idle)
+        for _ in range(max(missing, 0)):
+            browser = SeleniumBrowser(self.headless)
+            with self._lock:
+                self._idle.append(browser)
+
+    @contextmanager
+    def lease(self) -> Generator[SeleniumBrowser, None, None]:
+        if not self._slots.acquire(timeout=self.lease_timeout):
+            raise TimeoutError(f"No browser available within {self.lease_timeout}s")
+        browser = None
+        try:
+            browser = self._checkout()
+            yield browser
+        except WebDriverException:
+            # Przeglądarka po błędzie WebDrivera nie wraca do puli
+            if browser is not None:
+                browser.close()
+                browser = None
+            raise
+        finally:
+            if browser is not None:
+                browser.pages_served += 1
+                self._checkin(browser)
+            self._slots.release()
+
+    def _checkout(self) -> SeleniumBrowser:
+        while True:
+            with self._lock:
+                browser = self._idle.pop() if self._idle else None
+            if browser is None:
+                return SeleniumBrowser(self.headless)
+            if browser.is_healthy():
+                return browser
+            logger.info("Replacing unresponsive browser")
+            browser.close()
+
+    def _checkin(self, browser: SeleniumBrowser) -> None:
+        reason = None
+        if self._closed:
+            reason = 'pool closed'
+        elif browser.pages_served >= self.max_pages:
+            reason = f'served {browser.pages_served} pages'
+        elif self.max_memory_mb:
+            memory = browser.memory_mb()
+            if memory is not None and memory > self.max_memory_mb:
+                reason = f'uses {memory:.0f} MB'
+        if reason is None:
+            try:
+                browser.reset()
+            except WebDriverException:
+                reason = 'reset failed'
+        if reason is not None:
+            logger.info(f"Recycling browser: {reason}")
+            browser.close()
+            return
+        with self._lock:
+            self._idle.append(browser)
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for browser in idle:
+            browser.close()
+
+_pools: Dict[bool, BrowserPool] = {}
+_pools_lock = threading.Lock()
+
+def get_browser_pool(headless: bool = True) -> BrowserPool:
+    """Pula przeglądarek procesu (osobna dla trybu headless i z oknem)"""
+    with _pools_lock:
+        pool = _pools.get(headless)
+        if pool is None:
+            pool = _pools[headless] = BrowserPool(
+                size=settings.SELENIUM_POOL_SIZE,
+                headless=headless,
+                max_pages=settings.SELENIUM_MAX_PAGES_PER_BROWSER,
+                max_memory_mb=settings.SELENIUM_MAX_MEMORY_MB
+            )
+        return pool
+
+@atexit.register
+def close_browser_pools() -> None:
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
 
 @contextmanager
 def get_browser(headless: bool = True) -> Generator[SeleniumBrowser, None, None]:
-    browser = SeleniumBrowser(headless)
-    try:
-        yield browser
-    finally:
-        browser.close() 
\ No newline at end of file
+    """Wypożycza przeglądarkę z puli procesu"""
+    with get_browser_pool(headless).lease() as browser:
+        yield browser 
\ No newline at end of file
@@ -0,0 +1,324 @@
+import asyncio
+import itertools
+import json
+import logging
+import shutil
+import tempfile
+import time
+from typing import Any, Callable, Dict, Iterable, Optional, Set
+from urllib.parse import urlparse
+
+import aiohttp
+
+from ..config.settings import settings
+from .browser import EXTRACT_PAGE_DATA_SCRIPT
+
+logger = logging.getLogger(__name__)
+
+CHROME_BINARIES = ('google-chrome', 'google-chrome-stable', 'chromium', 'chromium-browser', 'chrome')
+
+class RenderError(Exception):
+    pass
+
+class ResourceBlocking:
+    """Zasoby, których renderer nie pobiera - typy CDP (Image, Media, Font...) i domeny"""
+
+    def __init__(self, resource_types: Iterable[str] = (), domains: Iterable[str] = ()):
+        self.resource_types = {t.lower() for t in resource_types}
+        self.domains = tuple(d.lower().lstrip('.') for d in domains)
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]] = None) -> 'ResourceBlocking':
+        """Ustawienia audytu (`block_resource_types`, `block_domains`) albo domyślne z settings"""
+        config = config or {}
+        return cls(
+            config.get('block_resource_types', settings.CDP_BLOCKED_RESOURCE_TYPES),
+            config.get('block_domains', settings.CDP_BLOCKED_DOMAINS)
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.resource_types or self.domains)
+
+    def blocks(self, url: str, resource_type: str) -> bool:
+        if resource_type.lower() in self.resource_types:
+            return True
+        host = (urlparse(url).hostname or '').lower()
+        return any(host == d or host.endswith('.' + d) for d in self.domains)
+
+class _Connection:
+    """Połączenie WebSocket z przeglądarką (protokół CDP, tryb flatten)"""
+
+    def __init__(self, ws: aiohttp.ClientWebSocketResponse, timeout: float):
+        self.ws = ws
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._listeners: Dict[str, Callable[[str, Dict[str, Any]], None]] = {}
+        self._reader = asyncio.create_task(self._read())
+
+    async def send(self, method: str, params: Optional[Dict[str, Any]] = None,
+                   session_id: Optional[str] = None) -> Dict[str, Any]:
+        message_id = next(self._ids)
+        message = {'id': message_id, 'method': method, 'params': params or {}}
+        if session_id:
+            message['sessionId'] = session_id
+        future = asyncio.get_running_loop().create_future()
+        self._pending[message_id] = future
+        try:
+            await self.ws.send_str(json.dumps(message))
+            return await asyncio.wait_for(future, self.timeout)
+        finally:
+            self._pending.pop(message_id, None)
+
+    def listen(self, session_id: str, callback: Callable[[str, Dict[str, Any]], None]) -> None:
+        self._listeners[session_id] = callback
+
+    def unlisten(self, session_id: str) -> None:
+        self._listeners.pop(session_id, None)
+
+    async def _read(self) -> None:
+        try:
+            async for msg in self.ws:
+                if msg.type != aiohttp.WSMsgType.TEXT:
+                    continue
+                data = json.loads(msg.data)
+                if 'id' in data:
+                    future = self._pending.get(data['id'])
+                    if future is None or future.done():
+                        continue
+                    if 'error' in data:
+                        future.set_exception(RenderError(data['error'].get('message', 'CDP error')))
+                    else:
+                        future.set_result(data.get('result', {}))
+                elif data.get('sessionId') in self._listeners:
+                    self._listeners[data['sessionId']](data['method'], data.get('params', {}))
+        finally:
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(RenderError('Connection to Chrome closed'))
+
+    async def close(self) -> None:
+        self._reader.cancel()
+        await self.ws.close()
+
+class _PageState:
+    """Śledzi requesty jednej karty: blokowanie zasobów i bezczynność sieci"""
+
+    def __init__(self, conn: _Connection, session_id: str, blocking: ResourceBlocking):
+        self.conn = conn
+        self.session_id = session_id
+        self.blocking = blocking
+        self.inflight: Set[str] = set()
+        self.loaded = False
+        self.last_activity = time.monotonic()
+        self.blocked = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    def on_event(self, method: str, params: Dict[str, Any]) -> None:
+        if method == 'Fetch.requestPaused':
+            if self.blocking.blocks(params['request']['url'], params.get('resourceType', '')):
+                self.blocked += 1
+                self._send('Fetch.failRequest', {'requestId': params['requestId'], 'errorReason': 'BlockedByClient'})
+            else:
+                self._send('Fetch.continueRequest', {'requestId': params['requestId']})
+        elif method == 'Network.requestWillBeSent':
+            self.inflight.add(params['requestId'])
+            self.last_activity = time.monotonic()
+        elif method in ('Network.loadingFinished', 'Network.loadingFailed'):
+            self.inflight.discard(params['requestId'])
+            self.last_activity = time.monotonic()
+        elif method == 'Page.loadEventFired':
+            self.loaded = True
+            self.last_activity = time.monotonic()
+
+    def _send(self, method: str, params: Dict[str, Any]) -> None:
+        task = asyncio.create_task(self.conn.send(method, params, self.session_id))
+        self._tasks.add(task)
+        task.add_done_callback(self._done)
+
+    def _done(self, task: asyncio.Task) -> None:
+        self._tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.debug(f"CDP request failed: {task.exception()!r}")
+
+    async def wait_for_network_idle(self, idle_time: float, max_connections: int, timeout: float) -> bool:
+        """Czeka na załadowanie strony i `idle_time` s bez ruchu ponad `max_connections` połączeń"""
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            now = time.monotonic()
+            if self.loaded and len(self.inflight) <= max_connections and now - self.last_activity >= idle_time:
+                return True
+            await asyncio.sleep(0.05)
+        return False
+
+    def cancel(self) -> None:
+        for task in list(self._tasks):
+            task.cancel()
+
+class CDPRenderer:
+    """Renderer stron sterujący headless Chrome bezpośrednio przez DevTools Protocol.
+
+    W odróżnieniu od `SeleniumBrowser` przechwytuje requesty (Fetch) i nie
+    pobiera zasobów wskazanych w `ResourceBlocking` - obrazów, mediów,
+    fontów, skryptów analitycznych - a na gotowość strony czeka do
+    bezczynności sieci zamiast na sam `<body>`. Jedna przeglądarka
+    obsługuje do `max_tabs` stron równolegle, każdą w osobnej karcie.
+    """
+
+    def __init__(
+        self,
+        chrome_path: Optional[str] = None,
+        max_tabs: int = 4,
+        timeout: float = 30,
+        idle_time: float = 0.5,
+        idle_connections: int = 2
+    ):
+        self.chrome_path = chrome_path or settings.CHROME_PATH or next(
+            (path for path in map(shutil.which, CHROME_BINARIES) if path), None
+        )
+        self.timeout = timeout
+        self.idle_time = idle_time
+        self.idle_connections = idle_connections
+        self._tabs = asyncio.Semaphore(max_tabs)
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._profile: Optional[tempfile.TemporaryDirectory] = None
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._conn: Optional[_Connection] = None
+        self._start_lock = asyncio.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._process is not None and self._process.returncode is None
+
+    async def start(self) -> None:
+        async with self._start_lock:
+            if self.running:
+                return
+            await self.close()
+            if not self.chrome_path:
+                raise RenderError("Chrome binary not found (set CHROME_PATH)")
+            self._profile = tempfile.TemporaryDirectory(prefix='cdp-profile-')
+            self._process = await asyncio.create_subprocess_exec(
+                self.chrome_path,
+                '--headless=new',
+                '--remote-debugging-port=0',
+                f'--user-data-dir={self._profile.name}',
+                '--no-sandbox',
+                '--disable-dev-shm-usage',
+                '--disable-gpu',
+                '--no-first-run',
+                '--no-default-browser-check',
+                'about:blank',
+                stdout=asyncio.subprocess.DEVNULL,
+                stderr=asyncio.subprocess.PIPE
+            )
+            ws_url = await asyncio.wait_for(self._read_ws_url(), self.timeout)
+            self._session = aiohttp.ClientSession()
+            ws = await self._session.ws_connect(ws_url, max_msg_size=0)
+            self._conn = _Connection(ws, self.timeout)
+
+    async def _read_ws_url(self) -> str:
+        prefix = b'DevTools listening on '
+        while True:
+            line = await self._process.stderr.readline()
+            if not line:
+                raise RenderError("Chrome exited before opening the DevTools port")
+            if line.startswith(prefix):
+                # Dalszy stderr nie jest potrzebny, ale nie może zapchać bufora
+                asyncio.create_task(self._drain_stderr())
+                return line[len(prefix):].decode().strip()
+
+    async def _drain_stderr(self) -> None:
+        while self._process and await self._process.stderr.readline():
+            pass
+
+    async def render(self, url: str, blocking: Optional[ResourceBlocking] = None) -> Dict[str, Any]:
+        """Renderuje stronę i zwraca dane w formacie `SeleniumBrowser.get_page_data`"""
+        await self.start()
+        blocking = blocking if blocking is not None else ResourceBlocking.from_config()
+        async with self._tabs:
+            conn = self._conn
+            target = await conn.send('Target.createTarget', {'url': 'about:blank'})
+            session_id = None
+            page = None
+            try:
+                session_id = (await conn.send(
+                    'Target.attachToTarget', {'targetId': target['targetId'], 'flatten': True}
+                ))['sessionId']
+                page = _PageState(conn, session_id, blocking)
+                conn.listen(session_id, page.on_event)
+                await conn.send('Network.enable', session_id=session_id)
+                await conn.send('Page.enable', session_id=session_id)
+                if blocking.enabled:
+                    await conn.send('Fetch.enable', {'patterns': [{'urlPattern': '*', 'requestStage': 'Request'}]},
+                                    session_id=session_id)
+
+                navigation = await conn.send('Page.navigate', {'url': url}, session_id=session_id)
+                if navigation.get('errorText'):
+                    raise RenderError(f"Navigation to {url} failed: {navigation['errorText']}")
+                if not await page.wait_for_network_idle(self.idle_time, self.idle_connections, self.timeout):
+                    logger.info(f"Network not idle after {self.timeout}s, extracting {url} anyway")
+
+                result = await conn.send('Runtime.evaluate', {
+                    'expression': f'(function () {{{EXTRACT_PAGE_DATA_SCRIPT}}})()',
+                    'returnByValue': True
+                }, session_id=session_id)
+                if 'exceptionDetails' in result:
+                    raise RenderError(f"Extraction failed on {url}: {result['exceptionDetails'].get('text')}")
+                if page.blocked:
+                    logger.debug(f"Blocked {page.blocked} requests while rendering {url}")
+                return {'url': url, **json.loads(result['result']['value'])}
+            finally:
+                if page is not None:
+                    page.cancel()
+                if session_id is not None:
+                    conn.unlisten(session_id)
+                try:
+                    await conn.send('Target.closeTarget', {'targetId': target['targetId']})
+                except (RenderError, asyncio.TimeoutError):
+                    pass
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self._conn.close()
+            self._conn = None
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._process is not None:
+            if self._process.returncode is None:
+                self._process.terminate()
+                try:
+                    await asyncio.wait_for(self._process.wait(), 5)
+                except asyncio.TimeoutError:
+                    self._process.kill()
+            self._process = None
+        if self._profile is not None:
+            self._profile.cleanup()
+            self._profile = None
+
+    async def __aenter__(self) -> 'CDPRenderer':
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+# Jedna przeglądarka na pętlę zdarzeń - jak współdzielona sesja aiohttp crawlera
+_renderers: Dict[int, CDPRenderer] = {}
+
+def get_cdp_renderer() -> CDPRenderer:
+    loop_id = id(asyncio.get_running_loop())
+    renderer = _renderers.get(loop_id)
+    if renderer is None:
+        renderer = _renderers[loop_id] = CDPRenderer(max_tabs=settings.CDP_MAX_TABS)
+    return renderer
+
+async def close_cdp_renderer() -> None:
+    renderer = _renderers.pop(id(asyncio.get_running_loop()), None)
+    if renderer is not None:
+        await renderer.close()
+
+async def render_page_cdp(url: str, blocking: Optional[ResourceBlocking] = None) -> Dict[str, Any]:
+    return await get_cdp_renderer().render(url, blocking)
@@ -1,18 +1,17 @@
 from app.models import Audit
-from app.core.database import SessionLocal
+from app.core.database import db_session
 from typing import Optional
 
 class AuditService:
-    def __init__(self):
-        self.db = SessionLocal()
-    
     async def get_audit(self, audit_id: int) -> Optional[Audit]:
-        return await self.db.query(Audit).filter(Audit.id == audit_id).first()
+        async with db_session() as db:
+            return await db.get(Audit, audit_id)
         
     async def create_audit(self, data: dict, owner_id: int) -> Audit:
-        audit = Audit(url=data["url"], owner_id=owner_id)
-        self.db.add(audit)
-        await self.db.commit()
-        return audit
+        async with db_session() as db:
+            audit = Audit(url=data["url"], owner_id=owner_id)
+            db.add(audit)
+            await db.commit()
+            return audit
 
-audit_service = AuditService() 
\ No newline at end of file
+audit_service = AuditService()     
@@ -0,0 +1,197 @@
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, or_, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core import json_codec
+from app.models import Audit, AuditSection
+
+# Sekcje dopisywane porcjami (np. linkChecker) zapisujemy jako wiersze
+# `<nazwa>#<nr>`; przy odczycie są łączone w jedną listę lub słownik
+CHUNK_SEPARATOR = '#'
+
+def chunk_name(name: str, index: int) -> str:
+    return f"{name}{CHUNK_SEPARATOR}{index:06d}"
+
+def _named(names: List[str]):
+    return or_(
+        AuditSection.name.in_(names),
+        *(AuditSection.name.startswith(name + CHUNK_SEPARATOR, autoescape=True) for name in names)
+    )
+
+def _merge(value: Any, part: Any) -> Any:
+    if value is None:
+        return part
+    if isinstance(value, list):
+        value.extend(part)
+    else:
+        value.update(part)
+    return value
+
+# Dialekty z INSERT ... ON CONFLICT
+_UPSERT_INSERTS = {'postgresql': pg_insert, 'sqlite': sqlite_insert}
+
+def _rows(audit_id: int, sections: Dict[str, Any]) -> List[Dict[str, Any]]:
+    now = datetime.utcnow()
+    return [
+        {'audit_id': audit_id, 'name': name, 'data': json_codec.dumps(value), 'updated_at': now}
+        for name, value in sections.items()
+    ]
+
+def _write(db: Session, audit_id: int, rows: List[Dict[str, Any]], overwrite: bool) -> None:
+    """Upsert wierszy sekcji; przy `overwrite=False` istniejące sekcje zostają bez zmian"""
+    dialect_insert = _UPSERT_INSERTS.get(db.get_bind().dialect.name)
+    if dialect_insert is None:
+        _write_fallback(db, audit_id, rows, overwrite)
+        return
+    stmt = dialect_insert(AuditSection).values(rows)
+    if overwrite:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=['audit_id', 'name'],
+            set_={'data': stmt.excluded.data, 'updated_at': stmt.excluded.updated_at}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=['audit_id', 'name'])
+    db.execute(stmt)
+
+def _write_fallback(db: Session, audit_id: int, rows: List[Dict[str, Any]], overwrite: bool) -> None:
+    """Pozostałe dialekty: istniejące sekcje aktualizowane po id, brakujące wstawiane"""
+    existing = dict(db.query(AuditSection.name, AuditSection.id).filter(
+        AuditSection.audit_id == audit_id, AuditSection.name.in_([row['name'] for row in rows])
+    ))
+    fresh = [row for row in rows if row['name'] not in existing]
+    if fresh:
+        db.execute(insert(AuditSection), fresh)
+    changed = [
+        {'id': existing[row['name']], 'data': row['data'], 'updated_at': row['updated_at']}
+        for row in rows if row['name'] in existing
+    ]
+    if overwrite and changed:
+        db.execute(update(AuditSection), changed)
+
+def _migrate_legacy(db: Session, audit_id: int, commit: bool = True) -> bool:
+    """Rozbija stary blob `Audit.audit_data` na sekcje (jednorazowo).
+
+    Sekcje zapisane już przez `put_sections` nie są nadpisywane. Przy
+    `commit=False` migracja jest tylko flushowana w transakcji wywołującego.
+    """
+    blob = db.query(Audit.audit_data).filter(Audit.id == audit_id).scalar()
+    if not blob:
+        return False
+    legacy = json_codec.loads(blob)
+    if legacy:
+        _write(db, audit_id, _rows(audit_id, legacy), overwrite=False)
+    db.query(Audit).filter(Audit.id == audit_id).update({Audit.audit_data: None}, synchronize_session=False)
+    if commit:
+        db.commit()
+    else:
+        db.flush()
+    return True
+
+def _select(db: Session, audit_id: int, names: Optional[Iterable[str]]) -> Dict[str, Any]:
+    query = db.query(AuditSection.name, AuditSection.data).filter(AuditSection.audit_id == audit_id)
+    if names is not None:
+        query = query.filter(_named(list(names)))
+    sections: Dict[str, Any] = {}
+    # Numery porcji są dopełniane zerami - kolejność nazw to kolejność zapisu
+    for row in query.order_by(AuditSection.name):
+        value = json_codec.loads(row.data) if row.data is not None else None
+        base, chunk, _ = row.name.partition(CHUNK_SEPARATOR)
+        sections[base] = _merge(sections.get(base), value) if chunk else value
+    return sections
+
+def get_sections(db: Session, audit_id: int, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    """Wybrane sekcje audytu (wszystkie, gdy `names` to None); brakujących nie ma w wyniku"""
+    names = None if names is None else list(names)
+    sections = _select(db, audit_id, names)
+    if (names is None or len(sections) < len(names)) and _migrate_legacy(db, audit_id):
+        sections = _select(db, audit_id, names)
+    return sections
+
+def get_section(db: Session, audit_id: int, name: str, default: Any = None) -> Any:
+    """Jedna sekcja audytu - parsowany jest tylko jej JSON, nie cały audyt"""
+    return get_sections(db, audit_id, [name]).get(name, default)
+
+def put_sections(db: Session, audit_id: int, sections: Dict[str, Any], commit: bool = True) -> None:
+    """Zapisuje sekcje jednym upsertem; pozostałe sekcje audytu nie są czytane ani zmieniane"""
+    if not sections:
+        return
+    _write(db, audit_id, _rows(audit_id, sections), overwrite=True)
+    if commit:
+        db.commit()
+
+def put_section(db: Session, audit_id: int, name: str, value: Any, commit: bool = True) -> None:
+    put_sections(db, audit_id, {name: value}, commit)
+
+def append_section(db: Session, audit_id: int, name: str, items: List[Any], commit: bool = True) -> None:
+    """Dopisuje `items` do sekcji-listy jako nową porcję, bez czytania poprzednich.
+
+    Porcja nazwana jest czasem zapisu z losowym sufiksem, więc równoległe
+    zadania nie gubią nawzajem swoich wpisów (brak read-modify-write).
+    """
+    key = f"{time.time_ns():020d}{uuid.uuid4().hex[:8]}"
+    db.execute(insert(AuditSection), _rows(audit_id, {f"{name}{CHUNK_SEPARATOR}{key}": items}))
+    if commit:
+        db.commit()
+
+def prune_section(db: Session, audit_id: int, name: str, before: datetime, commit: bool = True) -> None:
+    """Usuwa porcje sekcji (i jej dawny wiersz bazowy) zapisane przed `before` (UTC)"""
+    db.query(AuditSection).filter(
+        AuditSection.audit_id == audit_id, _named([name]), AuditSection.updated_at < before
+    ).delete(synchronize_session=False)
+    if commit:
+        db.commit()
+
+def delete_sections(db: Session, audit_id: int, names: Iterable[str], commit: bool = True) -> None:
+    """Usuwa sekcje razem z ich porcjami (np. przed ponownym przebiegiem analizy)"""
+    # Stary blob mógłby później przywrócić usunięte sekcje
+    _migrate_legacy(db, audit_id, commit)
+    db.query(AuditSection).filter(
+        AuditSection.audit_id == audit_id, _named(list(names))
+    ).delete(synchronize_session=False)
+    if commit:
+        db.commit()
+
+def load_audit_data(db: Session, audit: Audit) -> Dict[str, Any]:
+    """Wszystkie sekcje jako jeden słownik (dawny kształt `audit_data`)"""
+    if db is None:
+        return json_codec.loads(audit.audit_data) if audit.audit_data else {}
+    return get_sections(db, audit.id)
+
+# Odpowiedniki dla AsyncSession - te same zapytania przez `run_sync`
+
+async def get_sections_async(db: AsyncSession, audit_id: int, names: Optional[Iterable[str]] = None) -> Dict[str, Any]:
+    return await db.run_sync(get_sections, audit_id, names)
+
+async def get_section_async(db: AsyncSession, audit_id: int, name: str, default: Any = None) -> Any:
+    return await db.run_sync(get_section, audit_id, name, default)
+
+async def put_sections_async(db: AsyncSession, audit_id: int, sections: Dict[str, Any]) -> None:
+    await db.run_sync(put_sections, audit_id, sections, False)
+    await db.commit()
+
+async def put_section_async(db: AsyncSession, audit_id: int, name: str, value: Any) -> None:
+    await put_sections_async(db, audit_id, {name: value})
+
+async def append_section_async(db: AsyncSession, audit_id: int, name: str, items: List[Any]) -> None:
+    await db.run_sync(append_section, audit_id, name, items, False)
+    await db.commit()
+
+async def prune_section_async(db: AsyncSession, audit_id: int, name: str, before: datetime) -> None:
+    await db.run_sync(prune_section, audit_id, name, before, False)
+    await db.commit()
+
+async def delete_sections_async(db: AsyncSession, audit_id: int, names: Iterable[str]) -> None:
+    await db.run_sync(delete_sections, audit_id, list(names), False)
+    await db.commit()
+
+async def load_audit_data_async(db: Optional[AsyncSession], audit: Audit) -> Dict[str, Any]:
+    if db is None:
+        return load_audit_data(None, audit)
+    return await db.run_sync(get_sections, audit.id)
@@ -1,19 +1,30 @@
 from typing import Dict, List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.models import Audit, AuditPage
 from app.core.error_handling import AuditNotFound
 from app.core.cache_manager import CacheManager
+from app.services.audit_sections import get_sections_async, put_sections_async
+from app.services.page_writer import AuditPageWriter
+from app.scrapy_crawler.revalidation import RevalidationIndex
 from datetime import datetime
 import json
+from app.core import json_codec
 from fastapi import HTTPException
+from functools import partial
+
+def _decode_previous_page(previous: Dict[str, str], url: str) -> Optional[Dict]:
+    """Dane strony z poprzedniego audytu - JSON dekodowany dopiero przy trafieniu"""
+    raw = previous.get(url)
+    return json_codec.loads(raw) if raw else None
 
 class AuditService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.cache = CacheManager()
     
     async def get_audit(self, audit_id: int) -> Optional[Audit]:
-        audit = await self.db.query(Audit).filter(Audit.id == audit_id).first()
+        audit = await self.db.get(Audit, audit_id)
         if not audit:
             raise HTTPException(status_code=404, detail="Audit not found")
         return audit
@@ -36,13 +47,81 @@ class AuditService:
             updated_at=datetime.now()
         )
         self.db.add(audit)
-        self.db.commit()
-        self.db.refresh(audit)
+        await self.db.commit()
+        await self.db.refresh(audit)
         return audit
     
+    async def has_pages(self, audit_id: int) -> bool:
+        """Czy audyt ma już zapisane strony (ponowiony crawl)"""
+        return await self.db.scalar(
+            select(AuditPage.id).where(AuditPage.audit_id == audit_id).limit(1)
+        ) is not None
+    
+    async def page_writer(self, audit_id: int, upsert: Optional[bool] = None) -> AuditPageWriter:
+        """Zbiorczy zapis stron z crawla; upsert, gdy audyt ma już strony"""
+        if upsert is None:
+            upsert = await self.has_pages(audit_id)
+        return AuditPageWriter(self.db, audit_id, upsert=upsert)
+    
+    async def process_page_data(self, audit_id: int, pages: List[Dict]) -> int:
+        """Zapisuje porcję stron z crawla jako rekordy AuditPage (jeden zapis zbiorczy)"""
+        async with await self.page_writer(audit_id) as writer:
+            await writer.add_many(pages)
+        return writer.rows
+    
+    async def build_revalidation_index(self, audit: Audit) -> Optional[RevalidationIndex]:
+        """Walidatory stron z ostatniego zakończonego audytu tej samej witryny"""
+        previous = await self.db.scalar(
+            select(Audit)
+            .where(Audit.url == audit.url, Audit.id != audit.id, Audit.status == "done")
+            .order_by(Audit.created_at.desc())
+            .limit(1)
+        )
+        if not previous:
+            return None
+        
+        # Dane stron wczytujemy od razu, jednym zapytaniem - niezmienione strony
+        # obsługuje crawler w pętli zdarzeń albo w wątku reaktora, gdzie
+        # synchroniczne zapytanie na każdą stronę wstrzymywałoby wszystkie pobrania
+        rows = await self.db.execute(
+            select(AuditPage.url, AuditPage.etag, AuditPage.last_modified, AuditPage.content_hash,
+                   AuditPage.analysis_data)
+            .where(AuditPage.audit_id == previous.id)
+        )
+        validators = {}
+        previous_pages: Dict[str, str] = {}
+        for row in rows:
+            if row.url:
+                validators[row.url] = (row.etag, row.last_modified, row.content_hash)
+                previous_pages[row.url] = row.analysis_data
+        if not validators:
+            return None
+        return RevalidationIndex(validators, partial(_decode_previous_page, previous_pages))
+    
+    async def update_audit_status(self, audit_id: int, status: str, pages_count: Optional[int] = None) -> None:
+        """Aktualizuje status auditu po zakończeniu crawla"""
+        audit = await self.get_audit(audit_id)
+        audit.status = status
+        audit.updated_at = datetime.now()
+        await self.db.commit()
+    
+    async def update_analysis_results(self, audit_id: int, results: Dict) -> None:
+        """Zapisuje wyniki analiz - każdy klucz jako osobną sekcję audytu"""
+        await put_sections_async(self.db, audit_id, results)
+    
+    async def get_audit_data(self, audit_id: int) -> Dict:
+        """Wyniki analiz złożone z sekcji audytu (`Audit.audit_data` jest po migracji pusty)"""
+        return await get_sections_async(self.db, audit_id)
+    
+    async def update_suggestions(self, audit_id: int, suggestions: Dict) -> None:
+        """Zapisuje sugestie AI w suggestions_data"""
+        audit = await self.get_audit(audit_id)
+        audit.suggestions_data = json_codec.dumps(suggestions)
+        await self.db.commit()
+    
     async def get_user_audits(self, user_id: int) -> List[Audit]:
         """Pobiera wszystkie audyty użytkownika"""
-        return self.db.query(Audit).filter(Audit.owner_id == user_id).all()
+        return list(await self.db.scalars(select(Audit).where(Audit.owner_id == user_id)))
     
     async def get_audit_status(self, audit_id: int) -> str:
         """Pobiera status auditu"""
@@ -1,19 +1,20 @@
 from datetime import datetime
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.services.user_service import UserService
 from app.core.security import SecurityService, verify_password
 from app.models.user import User
 from app.core.redis_client import redis_client
 
 class AuthService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.user_service = UserService(db)
         self.security_service = SecurityService()
 
     async def authenticate_user(self, email: str, password: str) -> dict:
-        user = self.db.query(User).filter(User.email == email).first()
+        user = await self.db.scalar(select(User).where(User.email == email))
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
@@ -1,6 +1,8 @@
 from elasticsearch import NotFoundError, AsyncElasticsearch
+from sqlalchemy.ext.asyncio import async_object_session
 from ..config.settings import settings
 from ..config.elasticsearch_settings import audit_index_settings
+from .audit_sections import load_audit_data_async
 
 es_client = AsyncElasticsearch(
     hosts=[f"http://{settings.ELASTICSEARCH_HOST}:{settings.ELASTICSEARCH_PORT}"],
@@ -30,7 +32,7 @@ class ElasticsearchService:
                 "meta_description": audit.meta_description,
                 "status": audit.status,
                 "created_at": audit.created_at.isoformat(),
-                "audit_data": audit.audit_data,
+                "audit_data": await load_audit_data_async(async_object_session(audit), audit),
                 "suggestions_data": audit.suggestions_data
             }
         )
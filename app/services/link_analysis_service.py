@@ -1,18 +1,8 @@
 from typing import Dict, Any
-import aiohttp
-from urllib.parse import urlparse
+from app.services.page_elements_service import analyze_elements
 
 class LinkAnalysisService:
     @staticmethod
     async def analyze(url: str) -> Dict[str, Any]:
         """Analizuje linki na stronie"""
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                links = []
-                # TODO: Implementacja analizy linków
-                return {
-                    'total_links': len(links),
-                    'internal_links': [],
-                    'external_links': [],
-                    'broken_links': []
-                } 
\ No newline at end of file
+        return (await analyze_elements(url, ['links']))['links']
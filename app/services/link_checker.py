@@ -0,0 +1,147 @@
+import asyncio
+from collections import Counter, deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import urldefrag, urlparse
+
+import aiohttp
+
+from ..config.settings import settings
+from .link_status_cache import LinkStatusCache
+from .redirect_resolver import RedirectResolver
+from .robots_service import RobotsService, robots_service
+
+ROBOTS_BLOCKED = "Blocked by robots.txt"
+
+class LinkCheckResult(NamedTuple):
+    href: str
+    status_code: Optional[int]
+    final_url: Optional[str]
+    redirects: int
+    error: Optional[str]
+    priority: str
+    checked_at: Optional[str] = None
+    # Wynik z LinkStatusCache zamiast z sieci
+    cached: bool = False
+    # Łańcuch przekierowań (RedirectChain.to_dict) dla linków, które przekierowują
+    chain: Optional[Dict[str, Any]] = None
+
+def link_priority(status_code: Optional[int], redirects: int, error: Optional[str]) -> str:
+    """ok / warning (przekierowanie) / error (błąd połączenia, 4xx, 5xx)"""
+    if error or status_code is None or status_code >= 400:
+        return "error"
+    if redirects or 300 <= status_code < 400:
+        return "warning"
+    return "ok"
+
+def normalize_link(url: str) -> Optional[str]:
+    """Adres do sprawdzenia (bez fragmentu) albo None dla linków innych niż http(s)"""
+    url, _ = urldefrag(url.strip())
+    return url if urlparse(url).scheme in ('http', 'https') else None
+
+class LinkChecker:
+    """Sprawdza linki z globalnym limitem równoległości i limitem na host.
+
+    Hosty obsługiwane są po kolei (round-robin), więc tysiące linków do
+    jednej domeny nie blokują sprawdzania pozostałych, a pojedynczy host
+    dostaje najwyżej `per_host` requestów naraz.
+
+    Z `cache` statusy linków spoza `own_hosts` są najpierw szukane we
+    współdzielonym cache, a nowe wyniki do niego trafiają. Linki
+    audytowanej witryny zawsze są sprawdzane na nowo.
+
+    Przekierowania rozwiązuje wspólny `RedirectResolver`, więc kroki
+    łańcuchów wspólne dla wielu linków są pobierane tylko raz. Z
+    `obey_robots` linki zablokowane w robots.txt nie są pobierane
+    (wynik `warning` z błędem ROBOTS_BLOCKED).
+    """
+
+    def __init__(
+        self,
+        concurrency: Optional[int] = None,
+        per_host: Optional[int] = None,
+        max_redirects: Optional[int] = None,
+        session: Optional[aiohttp.ClientSession] = None,
+        cache: Optional[LinkStatusCache] = None,
+        own_hosts: Iterable[str] = (),
+        resolver: Optional[RedirectResolver] = None,
+        obey_robots: Optional[bool] = None,
+        robots: Optional[RobotsService] = None
+    ):
+        self.concurrency = concurrency or settings.LINK_CHECK_CONCURRENCY
+        self.per_host = per_host or settings.LINK_CHECK_PER_HOST
+        self.max_redirects = max_redirects or settings.LINK_CHECK_MAX_REDIRECTS
+        self.resolver = resolver or RedirectResolver(self.max_redirects, session)
+        self.cache = cache
+        self.obey_robots = settings.LINK_CHECK_OBEY_ROBOTS if obey_robots is None else obey_robots
+        self.robots = robots or robots_service
+        self.own_hosts = set(own_hosts)
+
+    async def check(self, url: str) -> LinkCheckResult:
+        """Status celu linku; kroki przekierowań idą przez resolver (HEAD, w razie potrzeby GET)"""
+        checked_at = datetime.utcnow().isoformat()
+        if self.obey_robots and not await self.robots.can_fetch(url, session=self.resolver.session):
+            return LinkCheckResult(url, None, None, 0, ROBOTS_BLOCKED, "warning", checked_at)
+        resolved = await self.resolver.resolve(url)
+        return LinkCheckResult(
+            url,
+            resolved.final_status,
+            resolved.final_url,
+            resolved.redirects,
+            resolved.error,
+            link_priority(resolved.final_status, resolved.redirects, resolved.error),
+            checked_at,
+            chain=resolved.to_dict() if resolved.redirects or resolved.loop else None
+        )
+
+    async def check_all(self, urls: Iterable[str]) -> AsyncIterator[LinkCheckResult]:
+        """Sprawdza każdy adres raz i oddaje wyniki w kolejności ukończenia"""
+        unique: Dict[str, str] = {}
+        for url in urls:
+            url = normalize_link(url)
+            if url and url not in unique:
+                unique[url] = urlparse(url).netloc
+
+        to_cache: List[Dict] = []
+        cached: Dict[str, Dict] = {}
+        if self.cache is not None:
+            cached = await self.cache.get_many(url for url, host in unique.items() if host not in self.own_hosts)
+            for url, entry in cached.items():
+                yield LinkCheckResult(href=url, cached=True, **entry)
+
+        pending: Dict[str, Deque[str]] = {}
+        for url, host in unique.items():
+            if url not in cached:
+                pending.setdefault(host, deque()).append(url)
+
+        ready: Deque[str] = deque(pending)
+        active: Counter = Counter()
+        running: Dict[asyncio.Task, str] = {}
+        try:
+            while ready or running:
+                while ready and len(running) < self.concurrency:
+                    host = ready.popleft()
+                    running[asyncio.create_task(self.check(pending[host].popleft()))] = host
+                    active[host] += 1
+                    if pending[host] and active[host] < self.per_host:
+                        ready.append(host)
+
+                done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    host = running.pop(task)
+                    active[host] -= 1
+                    # Host wraca do kolejki, gdy zwolnił miejsce i ma jeszcze linki
+                    if pending[host] and active[host] == self.per_host - 1:
+                        ready.append(host)
+                    result = task.result()
+                    if self.cache is not None and host not in self.own_hosts and result.error != ROBOTS_BLOCKED:
+                        to_cache.append(result._asdict())
+                        if len(to_cache) >= 100:
+                            await self.cache.set_many(to_cache)
+                            to_cache = []
+                    yield result
+        finally:
+            for task in running:
+                task.cancel()
+            if to_cache:
+                await self.cache.set_many(to_cache)
@@ -0,0 +1,87 @@
+import logging
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from ..config.settings import settings
+from ..core import json_codec
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+# Tyle kluczy na jedno MGET / pipeline
+BATCH_SIZE = 500
+
+def canonical_url(url: str) -> str:
+    """Klucz cache: małe litery w schemacie i hoście, bez domyślnego portu i fragmentu"""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or '').lower()
+    if parts.port and parts.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    return urlunsplit((scheme, host, parts.path or '/', parts.query, ''))
+
+class LinkStatusCache:
+    """Statusy linków zewnętrznych współdzielone między audytami (Redis).
+
+    Poprawne linki i przekierowania żyją LINK_STATUS_TTL_OK sekund,
+    błędy - krócej (LINK_STATUS_TTL_BROKEN), żeby chwilowe awarie
+    szybko się przedawniały. Niedostępny Redis oznacza po prostu brak trafień.
+    Klient redis.asyncio nie blokuje pętli `LinkChecker.check_all`; cache
+    utworzony bez klienta zamyka własne połączenia w `close()`.
+    """
+
+    prefix = 'linkstatus:'
+
+    def __init__(self, redis: Optional[Redis] = None, ok_ttl: Optional[int] = None,
+                 broken_ttl: Optional[int] = None):
+        self.redis = redis or Redis.from_url(settings.REDIS_URL)
+        self._owns_redis = redis is None
+        self.ok_ttl = ok_ttl or settings.LINK_STATUS_TTL_OK
+        self.broken_ttl = broken_ttl or settings.LINK_STATUS_TTL_BROKEN
+
+    def key(self, url: str) -> str:
+        return self.prefix + canonical_url(url)
+
+    async def get_many(self, urls: Iterable[str]) -> Dict[str, Dict]:
+        """Zapisane statusy dla podanych adresów (tylko trafienia)"""
+        urls = list(urls)
+        found: Dict[str, Dict] = {}
+        try:
+            for start in range(0, len(urls), BATCH_SIZE):
+                batch = urls[start:start + BATCH_SIZE]
+                for url, value in zip(batch, await self.redis.mget([self.key(url) for url in batch])):
+                    if value is not None:
+                        found[url] = json_codec.loads(value)
+        except RedisError as e:
+            logger.warning(f"Link status cache unavailable: {e!r}")
+        return found
+
+    async def set_many(self, entries: List[Dict]) -> None:
+        """Zapisuje wyniki (`href`, `status_code`, `final_url`, `priority`, `chain`...)"""
+        try:
+            for start in range(0, len(entries), BATCH_SIZE):
+                pipe = self.redis.pipeline(transaction=False)
+                for entry in entries[start:start + BATCH_SIZE]:
+                    value = {
+                        'status_code': entry['status_code'],
+                        'final_url': entry['final_url'],
+                        'redirects': entry['redirects'],
+                        'error': entry['error'],
+                        'priority': entry['priority'],
+                        'checked_at': entry.get('checked_at') or datetime.utcnow().isoformat(),
+                        # Łańcuch przekierowań - trafienia z cache też trafiają do redirectChains
+                        'chain': entry.get('chain')
+                    }
+                    ttl = self.broken_ttl if entry['priority'] == 'error' else self.ok_ttl
+                    pipe.setex(self.key(entry['href']), ttl, json_codec.dumpb(value))
+                await pipe.execute()
+        except RedisError as e:
+            logger.warning(f"Link status cache unavailable: {e!r}")
+
+    async def close(self) -> None:
+        if self._owns_redis:
+            await self.redis.aclose()
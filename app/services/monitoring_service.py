@@ -1,9 +1,9 @@
 from typing import Dict, List
 import asyncio
-import aiohttp
 from datetime import datetime, timedelta
 import pandas as pd
 from ..config.settings import settings
+from ..core.http_client import client_timeout, get_http_session
 from ..models.monitoring import MonitoringMetrics
 
 class PerformanceMonitoringService:
@@ -28,17 +28,17 @@ class PerformanceMonitoringService:
         }
     
     async def _collect_metrics(self, url: str) -> Dict:
-        async with aiohttp.ClientSession() as session:
-            start_time = datetime.now()
-            async with session.get(url) as response:
-                response_time = (datetime.now() - start_time).total_seconds()
-                
-                return {
-                    'response_time': response_time,
-                    'status_code': response.status,
-                    'content_length': len(await response.text()),
-                    'headers': dict(response.headers)
-                }
+        # Bez ponowień - mierzymy pojedynczy request
+        start_time = datetime.now()
+        async with get_http_session().get(url, timeout=client_timeout()) as response:
+            response_time = (datetime.now() - start_time).total_seconds()
+            
+            return {
+                'response_time': response_time,
+                'status_code': response.status,
+                'content_length': len(await response.text()),
+                'headers': dict(response.headers)
+            }
     
     def _calculate_trends(self) -> Dict:
         """Oblicza trendy na podstawie historycznych danych"""
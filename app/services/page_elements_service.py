@@ -0,0 +1,134 @@
+from abc import ABC, abstractmethod
+from typing import Dict, Any, Iterable, List, Type
+from urllib.parse import urljoin, urlparse
+
+from ..core.http_client import fetch_html
+from ..utils.html_parser import Element, iter_elements
+
+class ElementExtractor(ABC):
+    """Zbiera dane jednego typu elementów podczas wspólnego przejścia po drzewie"""
+
+    tags: Iterable[str] = ()
+
+    def __init__(self, url: str):
+        self.url = url
+
+    @abstractmethod
+    def visit(self, tag: Element) -> None:
+        ...
+
+    @abstractmethod
+    def result(self) -> Dict[str, Any]:
+        ...
+
+class LinkExtractor(ElementExtractor):
+    tags = ('a',)
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        self.domain = urlparse(url).netloc
+        self.internal: List[str] = []
+        self.external: List[str] = []
+
+    def visit(self, tag) -> None:
+        href = (tag.get('href') or '').strip()
+        if not href or href.startswith(('#', 'javascript:', 'mailto:', 'tel:')):
+            return
+        link = urljoin(self.url, href)
+        (self.internal if urlparse(link).netloc == self.domain else self.external).append(link)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'total_links': len(self.internal) + len(self.external),
+            'internal_links': self.internal,
+            'external_links': self.external,
+            'broken_links': []
+        }
+
+class ImageExtractor(ElementExtractor):
+    tags = ('img',)
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        self.images = []
+
+    def visit(self, tag) -> None:
+        self.images.append(tag)
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'total_images': len(self.images),
+            'missing_alt': len([img for img in self.images if not img.get('alt')]),
+            'images': [{'src': img.get('src', ''), 'alt': img.get('alt', '')} for img in self.images]
+        }
+
+class HeadingExtractor(ElementExtractor):
+    tags = ('h1', 'h2', 'h3')
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        self.headings = {name: [] for name in self.tags}
+
+    def visit(self, tag) -> None:
+        self.headings[tag.name].append(tag.text.strip())
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'headings': self.headings,
+            'has_h1': bool(self.headings['h1']),
+            'multiple_h1': len(self.headings['h1']) > 1
+        }
+
+class MetaExtractor(ElementExtractor):
+    tags = ('meta', 'title')
+
+    def __init__(self, url: str):
+        super().__init__(url)
+        self.meta_title = None
+        self.title = None
+        self.description = None
+
+    def visit(self, tag) -> None:
+        if tag.name == 'title':
+            self.title = self.title or tag
+        elif tag.get('name') == 'title':
+            self.meta_title = self.meta_title or tag
+        elif tag.get('name') == 'description':
+            self.description = self.description or tag
+
+    def result(self) -> Dict[str, Any]:
+        title = self.meta_title or self.title
+        return {
+            'title': title.text if title else None,
+            'description': self.description.get('content') if self.description else None,
+            'has_title': bool(title),
+            'has_description': bool(self.description)
+        }
+
+EXTRACTORS: Dict[str, Type[ElementExtractor]] = {
+    'links': LinkExtractor,
+    'images': ImageExtractor,
+    'headings': HeadingExtractor,
+    'meta': MetaExtractor
+}
+
+def extract_elements(html: str, url: str, elements: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Parsuje HTML raz (wspólnym parserem, domyślnie lxml) i w jednym przejściu uruchamia wybrane ekstraktory"""
+    extractors = {name: EXTRACTORS[name](url) for name in elements if name in EXTRACTORS}
+    by_tag: Dict[str, List[ElementExtractor]] = {}
+    for extractor in extractors.values():
+        for tag_name in extractor.tags:
+            by_tag.setdefault(tag_name, []).append(extractor)
+
+    if not extractors:
+        return {}
+
+    for tag in iter_elements(html, by_tag):
+        for extractor in by_tag[tag.name]:
+            extractor.visit(tag)
+    return {name: extractor.result() for name, extractor in extractors.items()}
+
+async def analyze_elements(url: str, elements: Iterable[str]) -> Dict[str, Dict[str, Any]]:
+    """Pobiera stronę jeden raz (tylko HTML, z limitem rozmiaru) i analizuje wskazane elementy"""
+    page = await fetch_html(url)
+    return extract_elements(page.text, url, elements)
@@ -0,0 +1,151 @@
+"""Zbiorczy zapis rekordów AuditPage podczas crawla.
+
+Strony są buforowane i zapisywane partiami: na PostgreSQL (asyncpg)
+przez COPY, gdzie indziej jednym executemany. Przy ponownym crawlu
+tego samego audytu (retry zadania, partycje) zapis idzie upsertem
+po (audit_id, url), więc strony nie są dublowane.
+"""
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+from sqlalchemy import insert, select, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config.settings import settings
+from app.core import json_codec
+from app.models import AuditPage
+
+COLUMNS = (
+    'audit_id', 'url', 'title', 'meta_description', 'status_code',
+    'etag', 'last_modified', 'content_hash', 'analysis_data', 'created_at'
+)
+# Kolumny nadpisywane przy upsercie
+UPDATE_COLUMNS = tuple(c for c in COLUMNS if c not in ('audit_id', 'url'))
+
+def page_row(audit_id: int, page: Dict[str, Any], now: Optional[datetime] = None) -> Dict[str, Any]:
+    """Wiersz audit_pages dla strony w formacie z `extract_page_data`"""
+    return {
+        'audit_id': audit_id,
+        'url': page.get('url'),
+        'title': page.get('title'),
+        'meta_description': page.get('meta_description'),
+        'status_code': page.get('status_code'),
+        'etag': page.get('etag'),
+        'last_modified': page.get('last_modified'),
+        'content_hash': page.get('content_hash'),
+        'analysis_data': json_codec.dumps(page),
+        'created_at': now or datetime.utcnow(),
+    }
+
+class AuditPageWriter:
+    """Bufor stron audytu zapisywany co `batch_size` stron lub `flush_interval` sekund.
+
+    Każdy flush to jedna instrukcja (COPY / executemany) i jeden commit.
+    Interwał jest sprawdzany przy dodawaniu stron - wolny crawl nie
+    trzyma więc w buforze stron dłużej, niż trwa pobranie kolejnej.
+    """
+
+    def __init__(self, db: AsyncSession, audit_id: int, upsert: bool = False,
+                 batch_size: Optional[int] = None, flush_interval: Optional[float] = None):
+        self.db = db
+        self.audit_id = audit_id
+        self.upsert = upsert
+        self.batch_size = batch_size or settings.PAGE_WRITER_BATCH_SIZE
+        self.flush_interval = settings.PAGE_WRITER_FLUSH_INTERVAL if flush_interval is None else flush_interval
+        self.rows = 0
+        # Ostatni zapis danego URL wygrywa - także w obrębie jednej partii
+        self._buffer: Dict[str, Dict[str, Any]] = {}
+        self._written: set = set()
+        self._last_flush = time.monotonic()
+
+    async def add(self, page: Dict[str, Any]) -> None:
+        row = page_row(self.audit_id, page)
+        self._buffer[row['url']] = row
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            await self.flush()
+
+    async def add_many(self, pages: Iterable[Dict[str, Any]]) -> None:
+        for page in pages:
+            await self.add(page)
+
+    async def flush(self) -> None:
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        rows = list(self._buffer.values())
+        self._buffer = {}
+        if self.upsert:
+            await self._upsert(rows)
+        else:
+            # URL zapisany już wcześniej w tym crawlu (np. po przekierowaniu) - upsert
+            fresh = [row for row in rows if row['url'] not in self._written]
+            repeated = [row for row in rows if row['url'] in self._written]
+            await self._insert(fresh)
+            await self._upsert(repeated)
+        await self.db.commit()
+        self._written.update(row['url'] for row in rows)
+        self.rows += len(rows)
+
+    async def _insert(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        dialect = self.db.get_bind().dialect
+        if dialect.name == 'postgresql' and dialect.driver == 'asyncpg' and settings.PAGE_WRITER_USE_COPY:
+            conn = await self.db.connection()
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.copy_records_to_table(
+                AuditPage.__tablename__,
+                records=[tuple(row[c] for c in COLUMNS) for row in rows],
+                columns=COLUMNS
+            )
+        else:
+            await self.db.execute(insert(AuditPage), rows)
+
+    async def _upsert(self, rows: List[Dict[str, Any]]) -> None:
+        if not rows:
+            return
+        dialect = self.db.get_bind().dialect.name
+        if dialect == 'postgresql':
+            stmt = pg_insert(AuditPage)
+        elif dialect == 'sqlite':
+            stmt = sqlite_insert(AuditPage)
+        else:
+            await self._upsert_fallback(rows)
+            return
+        await self.db.execute(stmt.on_conflict_do_update(
+            index_elements=['audit_id', 'url'],
+            set_={c: stmt.excluded[c] for c in UPDATE_COLUMNS}
+        ), rows)
+
+    async def _upsert_fallback(self, rows: List[Dict[str, Any]]) -> None:
+        """Dialekty bez ON CONFLICT: istniejące strony aktualizowane po id, nowe wstawiane"""
+        existing = dict((await self.db.execute(
+            select(AuditPage.url, AuditPage.id).where(
+                AuditPage.audit_id == self.audit_id, AuditPage.url.in_([row['url'] for row in rows])
+            )
+        )).all())
+        fresh = [row for row in rows if row['url'] not in existing]
+        if fresh:
+            await self.db.execute(insert(AuditPage), fresh)
+        changed = [
+            {'id': existing[row['url']], **{c: row[c] for c in UPDATE_COLUMNS}}
+            for row in rows if row['url'] in existing
+        ]
+        if changed:
+            await self.db.execute(update(AuditPage), changed)
+
+    async def close(self) -> None:
+        await self.flush()
+
+    async def __aenter__(self) -> 'AuditPageWriter':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        # Po błędzie bufor jest porzucany - ponowione zadanie zapisze strony upsertem
+        if exc_type is None:
+            await self.close()
+        else:
+            self._buffer = {}
@@ -0,0 +1,121 @@
+import asyncio
+from typing import Any, Dict, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+
+from ..config.settings import settings
+from ..core.http_client import client_timeout, get_http_session, request_with_retries
+
+# Kody, którymi serwery odrzucają sam HEAD - wtedy sprawdzamy GET-em
+HEAD_REJECTED_CODES = frozenset({400, 403, 405, 501})
+REDIRECT_CODES = frozenset({301, 302, 303, 307, 308})
+
+class Hop(NamedTuple):
+    status: Optional[int]
+    # Cel przekierowania (bezwzględny) albo None dla odpowiedzi końcowej
+    location: Optional[str]
+    error: Optional[str] = None
+
+class RedirectChain(NamedTuple):
+    url: str
+    # Kolejne adresy z kodami odpowiedzi, od `url` do celu
+    chain: List[Tuple[str, Optional[int]]]
+    final_url: str
+    final_status: Optional[int]
+    loop: bool = False
+    error: Optional[str] = None
+
+    @property
+    def redirects(self) -> int:
+        return len(self.chain) - 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'chain': [list(hop) for hop in self.chain],
+            'final_url': self.final_url,
+            'final_status': self.final_status,
+            'loop': self.loop,
+            'error': self.error
+        }
+
+class RedirectResolver:
+    """Rozwiązuje łańcuchy przekierowań, pamiętając każdy krok osobno.
+
+    Po migracji http -> https -> nowa domena tysiące linków przechodzi
+    przez te same 2-3 kroki; każdy z nich jest pobierany raz na audyt
+    (także przy równoległych zapytaniach), a kroki zaobserwowane przez
+    crawler można dodać przez `seed` bez żadnego requestu.
+    """
+
+    def __init__(self, max_redirects: Optional[int] = None, session: Optional[aiohttp.ClientSession] = None):
+        self.max_redirects = max_redirects or settings.LINK_CHECK_MAX_REDIRECTS
+        self.session = session
+        self._hops: Dict[str, Hop] = {}
+        self._pending: Dict[str, asyncio.Future] = {}
+        self.requests = 0
+
+    def seed(self, chain: Sequence[Sequence[Any]], final_url: str, final_status: Optional[int] = None) -> None:
+        """Dodaje kroki znane z crawla: `chain` to pary (adres, kod) przed `final_url`"""
+        urls = [url for url, _ in chain] + [final_url]
+        for (url, status), target in zip(chain, urls[1:]):
+            self._hops.setdefault(url, Hop(status, target))
+        if final_status is not None:
+            self._hops.setdefault(final_url, Hop(final_status, None))
+
+    async def hop(self, url: str) -> Hop:
+        """Jeden krok (bez podążania za przekierowaniem), pobrany najwyżej raz"""
+        if url in self._hops:
+            return self._hops[url]
+        pending = self._pending.get(url)
+        if pending is not None:
+            return await asyncio.shield(pending)
+        future = self._pending[url] = asyncio.get_running_loop().create_future()
+        try:
+            hop = await self._request_hop(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            hop = Hop(None, None, str(e) or type(e).__name__)
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            self._pending.pop(url, None)
+        self._hops[url] = hop
+        future.set_result(hop)
+        return hop
+
+    async def _request_hop(self, url: str) -> Hop:
+        session = self.session or get_http_session()
+
+        async def read(response: aiohttp.ClientResponse) -> Hop:
+            location = response.headers.get('Location')
+            if response.status in REDIRECT_CODES and location:
+                return Hop(response.status, urljoin(url, location))
+            return Hop(response.status, None)
+
+        self.requests += 1
+        hop = await request_with_retries(
+            session, 'HEAD', url, read, allow_redirects=False, timeout=client_timeout("links")
+        )
+        if hop.status in HEAD_REJECTED_CODES:
+            self.requests += 1
+            hop = await request_with_retries(
+                session, 'GET', url, read, allow_redirects=False, timeout=client_timeout("links")
+            )
+        return hop
+
+    async def resolve(self, url: str) -> RedirectChain:
+        chain: List[Tuple[str, Optional[int]]] = []
+        seen = set()
+        current = url
+        while True:
+            if current in seen:
+                return RedirectChain(url, chain, current, None, loop=True, error="Redirect loop")
+            if len(chain) > self.max_redirects:
+                return RedirectChain(url, chain, current, None, error="Too many redirects")
+            seen.add(current)
+            hop = await self.hop(current)
+            chain.append((current, hop.status))
+            if hop.location is None:
+                return RedirectChain(url, chain, current, hop.status, error=hop.error)
+            current = hop.location
@@ -0,0 +1,212 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+
+import aiohttp
+from protego import Protego
+from redis import Redis, RedisError
+from redis.asyncio import Redis as AsyncRedis
+
+from ..config.settings import settings
+from ..core import json_codec
+from ..core.http_client import client_timeout, get_http_session
+
+logger = logging.getLogger(__name__)
+
+# Jak Google: dłuższa treść robots.txt jest ucinana
+MAX_ROBOTS_BYTES = 500 * 1024
+
+def robots_origin(url: str) -> str:
+    parsed = urlparse(url)
+    return f"{parsed.scheme}://{parsed.netloc}"
+
+class RobotsRules:
+    """Sparsowany robots.txt jednego hosta (reguły skompilowane przez Protego)"""
+
+    __slots__ = ('status', 'expires_at', '_parser')
+
+    def __init__(self, text: str, status: Optional[int], ttl: float):
+        self.status = status
+        self.expires_at = time.monotonic() + ttl
+        # Brak pliku, błąd albo pusta treść - brak ograniczeń (jak w Scrapy)
+        self._parser = Protego.parse(text) if text.strip() else None
+
+    @property
+    def expired(self) -> bool:
+        return time.monotonic() >= self.expires_at
+
+    def can_fetch(self, url: str, user_agent: str = settings.HTTP_USER_AGENT) -> bool:
+        return self._parser is None or self._parser.can_fetch(url, user_agent)
+
+    def crawl_delay(self, user_agent: str = settings.HTTP_USER_AGENT) -> Optional[float]:
+        return self._parser.crawl_delay(user_agent) if self._parser else None
+
+    @property
+    def sitemaps(self) -> List[str]:
+        return list(self._parser.sitemaps) if self._parser else []
+
+class RobotsService:
+    """Wspólny cache robots.txt dla crawlerów, link checkera i analiz.
+
+    Sparsowane reguły żyją w pamięci procesu (LRU), a surowa treść
+    w Redis, więc robots.txt hosta jest pobierany raz na ROBOTS_TTL dla
+    wszystkich workerów i parsowany raz na proces. Błędy pobierania
+    (5xx, timeout) są pamiętane krócej - ROBOTS_ERROR_TTL.
+
+    Ścieżki asynchroniczne (`get`, `can_fetch`) używają redis.asyncio -
+    osobnego klienta na pętlę zdarzeń, bo połączenia należą do pętli.
+    Synchroniczne `load_cached`/`store` służą middleware Scrapy; klient
+    ma krótkie timeouty (ROBOTS_REDIS_TIMEOUT), więc wolny Redis nie
+    zatrzymuje reaktora na dłużej.
+    """
+
+    prefix = 'robots:'
+
+    def __init__(self, redis: Optional[Redis] = None, ttl: Optional[int] = None,
+                 error_ttl: Optional[int] = None, max_hosts: int = 10000,
+                 async_redis: Optional[AsyncRedis] = None):
+        self.redis = redis or Redis.from_url(
+            settings.REDIS_URL,
+            socket_timeout=settings.ROBOTS_REDIS_TIMEOUT,
+            socket_connect_timeout=settings.ROBOTS_REDIS_TIMEOUT
+        )
+        self.ttl = ttl or settings.ROBOTS_TTL
+        self.error_ttl = error_ttl or settings.ROBOTS_ERROR_TTL
+        self.max_hosts = max_hosts
+        self._async_redis = async_redis
+        self._async_clients: Dict[asyncio.AbstractEventLoop, AsyncRedis] = {}
+        self._rules: 'OrderedDict[str, RobotsRules]' = OrderedDict()
+        self._pending: Dict[str, asyncio.Future] = {}
+
+    def async_redis(self) -> AsyncRedis:
+        """Klient redis.asyncio dla bieżącej pętli zdarzeń"""
+        if self._async_redis is not None:
+            return self._async_redis
+        loop = asyncio.get_running_loop()
+        client = self._async_clients.get(loop)
+        if client is None:
+            # Klienci zamkniętych pętli (zadania Celery) nie nadają się już do użycia
+            for closed in [other for other in self._async_clients if other.is_closed()]:
+                del self._async_clients[closed]
+            client = self._async_clients[loop] = AsyncRedis.from_url(
+                settings.REDIS_URL,
+                socket_timeout=settings.ROBOTS_REDIS_TIMEOUT,
+                socket_connect_timeout=settings.ROBOTS_REDIS_TIMEOUT
+            )
+        return client
+
+    def _ttl_for(self, status: Optional[int]) -> int:
+        return self.error_ttl if status is None or status >= 500 else self.ttl
+
+    def _remember(self, origin: str, rules: RobotsRules) -> RobotsRules:
+        self._rules[origin] = rules
+        self._rules.move_to_end(origin)
+        while len(self._rules) > self.max_hosts:
+            self._rules.popitem(last=False)
+        return rules
+
+    def peek(self, origin: str) -> Optional[RobotsRules]:
+        """Reguły z pamięci procesu (bez I/O)"""
+        rules = self._rules.get(origin)
+        return rules if rules is not None and not rules.expired else None
+
+    def load_cached(self, origin: str) -> Optional[RobotsRules]:
+        """Reguły z pamięci procesu, a potem z Redis"""
+        rules = self.peek(origin)
+        if rules is not None:
+            return rules
+        try:
+            key = self.prefix + origin
+            value, ttl = self.redis.pipeline(transaction=False).get(key).ttl(key).execute()
+        except RedisError as e:
+            logger.debug(f"Robots cache unavailable: {e!r}")
+            return None
+        return self._cached(origin, value, ttl)
+
+    async def load_cached_async(self, origin: str) -> Optional[RobotsRules]:
+        """`load_cached` bez blokowania pętli zdarzeń"""
+        rules = self.peek(origin)
+        if rules is not None:
+            return rules
+        try:
+            key = self.prefix + origin
+            async with self.async_redis().pipeline(transaction=False) as pipe:
+                value, ttl = await pipe.get(key).ttl(key).execute()
+        except RedisError as e:
+            logger.debug(f"Robots cache unavailable: {e!r}")
+            return None
+        return self._cached(origin, value, ttl)
+
+    def _cached(self, origin: str, value: Optional[bytes], ttl: int) -> Optional[RobotsRules]:
+        if value is None:
+            return None
+        entry = json_codec.loads(value)
+        return self._remember(origin, RobotsRules(entry['text'], entry['status'], max(ttl, 1)))
+
+    def _entry(self, status: Optional[int], text: str) -> Tuple[str, int, bytes]:
+        if status is not None and not 200 <= status < 300:
+            text = ''
+        return text, self._ttl_for(status), json_codec.dumpb({'status': status, 'text': text})
+
+    def store(self, origin: str, status: Optional[int], text: str) -> RobotsRules:
+        """Zapisuje pobrany robots.txt (`status` None - błąd połączenia)"""
+        text, ttl, value = self._entry(status, text)
+        try:
+            self.redis.setex(self.prefix + origin, ttl, value)
+        except RedisError as e:
+            logger.debug(f"Robots cache unavailable: {e!r}")
+        return self._remember(origin, RobotsRules(text, status, ttl))
+
+    async def store_async(self, origin: str, status: Optional[int], text: str) -> RobotsRules:
+        """`store` bez blokowania pętli zdarzeń"""
+        text, ttl, value = self._entry(status, text)
+        try:
+            await self.async_redis().setex(self.prefix + origin, ttl, value)
+        except RedisError as e:
+            logger.debug(f"Robots cache unavailable: {e!r}")
+        return self._remember(origin, RobotsRules(text, status, ttl))
+
+    async def get(self, url: str, session: Optional[aiohttp.ClientSession] = None) -> RobotsRules:
+        """Reguły dla hosta adresu; równoległe zapytania o ten sam host czekają na jedno pobranie"""
+        origin = robots_origin(url)
+        rules = await self.load_cached_async(origin)
+        if rules is not None:
+            return rules
+        pending = self._pending.get(origin)
+        if pending is not None and pending.get_loop() is asyncio.get_running_loop():
+            return await asyncio.shield(pending)
+
+        future = self._pending[origin] = asyncio.get_running_loop().create_future()
+        try:
+            rules = await self._fetch(origin, session or get_http_session())
+        except BaseException:
+            future.cancel()
+            raise
+        finally:
+            if self._pending.get(origin) is future:
+                del self._pending[origin]
+        future.set_result(rules)
+        return rules
+
+    async def _fetch(self, origin: str, session: aiohttp.ClientSession) -> RobotsRules:
+        try:
+            async with session.get(f"{origin}/robots.txt", timeout=client_timeout()) as response:
+                body = await response.content.read(MAX_ROBOTS_BYTES)
+                status, text = response.status, body.decode('utf-8', 'replace')
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.debug(f"Fetching {origin}/robots.txt failed: {e!r}")
+            status, text = None, ''
+        return await self.store_async(origin, status, text)
+
+    async def can_fetch(self, url: str, user_agent: str = settings.HTTP_USER_AGENT,
+                        session: Optional[aiohttp.ClientSession] = None) -> bool:
+        return (await self.get(url, session)).can_fetch(url, user_agent)
+
+    async def crawl_delay(self, url: str, user_agent: str = settings.HTTP_USER_AGENT) -> Optional[float]:
+        return (await self.get(url)).crawl_delay(user_agent)
+
+# Jeden cache na proces
+robots_service = RobotsService()
@@ -1,7 +1,8 @@
 from typing import TypedDict, List, Dict, Any
 from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import async_object_session
 from app.models import Audit
-import json
+from app.services.audit_sections import load_audit_data_async
 
 class MetaAnalysis(TypedDict):
     titleMissing: bool
@@ -27,9 +28,7 @@ class SEOScoreService:
     @staticmethod
     async def calculate(audit: Audit) -> Dict[str, Any]:
         """Oblicza wynik SEO na podstawie danych audytu"""
-        data = {}
-        if audit.audit_data:
-            data = json.loads(audit.audit_data)
+        data = await load_audit_data_async(async_object_session(audit), audit)
             
         score = 100
         reasons = []
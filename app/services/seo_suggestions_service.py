@@ -1,6 +1,7 @@
 from typing import TypedDict, List
+from sqlalchemy.ext.asyncio import async_object_session
 from app.models import Audit
-import json
+from app.services.audit_sections import load_audit_data_async
 
 class Suggestion(TypedDict):
     type: str
@@ -11,7 +12,7 @@ class SEOSuggestionsService:
     @staticmethod
     async def generate(audit: Audit) -> List[Suggestion]:
         """Generuje sugestie SEO na podstawie danych audytu"""
-        data = json.loads(audit.audit_data) if audit.audit_data else {}
+        data = await load_audit_data_async(async_object_session(audit), audit)
         suggestions = []
         
         # Meta tagi
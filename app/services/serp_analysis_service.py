@@ -4,26 +4,28 @@ from bs4 import BeautifulSoup
 from urllib.parse import urlparse
 from collections import Counter
 from .text_analysis_service import TextAnalysisService
+from ..core.http_client import fetch, get_http_session
+from ..utils.html_parser import HTMLParser
 
 class SerpAnalysisService:
     async def analyze_serp_position(self, keyword: str, domain: str, top_n: int = 10) -> Dict:
         competitors_data = []
         
-        async with aiohttp.ClientSession() as session:
-            # Symulacja wyników SERP (w rzeczywistości użylibyśmy API Google)
-            competitors = await self._get_top_competitors(session, keyword, top_n)
+        session = get_http_session()
+        # Symulacja wyników SERP (w rzeczywistości użylibyśmy API Google)
+        competitors = await self._get_top_competitors(session, keyword, top_n)
+        
+        for comp in competitors:
+            text_content = await self._fetch_page_content(session, comp['url'])
+            analysis = TextAnalysisService.analyze_text(text_content)
             
-            for comp in competitors:
-                text_content = await self._fetch_page_content(session, comp['url'])
-                analysis = TextAnalysisService.analyze_text(text_content)
-                
-                competitors_data.append({
-                    'url': comp['url'],
-                    'position': comp['position'],
-                    'word_count': analysis['words_count'],
-                    'key_phrases': analysis['key_phrases'][:5],
-                    'readability_score': analysis.get('readability_score', 0)
-                })
+            competitors_data.append({
+                'url': comp['url'],
+                'position': comp['position'],
+                'word_count': analysis['words_count'],
+                'key_phrases': analysis['key_phrases'][:5],
+                'readability_score': analysis.get('readability_score', 0)
+            })
         
         return {
             'keyword': keyword,
@@ -37,6 +39,10 @@ class SerpAnalysisService:
         # Na razie zwracamy przykładowe dane
         return [{'url': f'https://example{i}.com', 'position': i} for i in range(1, limit+1)]
 
+    async def _fetch_page_content(self, session: aiohttp.ClientSession, url: str) -> str:
+        response = await fetch(url, session=session)
+        return HTMLParser(response.text).get_text_content()
+
     def _find_common_phrases(self, phrases_lists: List[List[str]]) -> List[str]:
         all_phrases = [phrase for sublist in phrases_lists for phrase in sublist]
         return [phrase for phrase, count in Counter(all_phrases).most_common(5)] 
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from fastapi import HTTPException, status
 from app.models.user import User
 from app.schemas.user import UserCreate
@@ -9,7 +10,7 @@ from datetime import datetime, timedelta
 import secrets
 
 class UserService:
-    def __init__(self, db: Session):
+    def __init__(self, db: AsyncSession):
         self.db = db
         self.email_service = EmailService()
         self.max_login_attempts = 5
@@ -17,7 +18,7 @@ class UserService:
 
     async def create_user(self, user_data: UserCreate) -> User:
         # Sprawdź czy użytkownik już istnieje
-        if self.db.query(User).filter(User.email == user_data.email).first():
+        if await self.db.scalar(select(User).where(User.email == user_data.email)):
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Email already registered"
@@ -35,8 +36,8 @@ class UserService:
         )
         
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        await self.db.commit()
+        await self.db.refresh(user)
         
         # Wysyłanie emaila aktywacyjnego
         await self.email_service.send_activation_email(user.email, activation_token)
@@ -44,26 +45,26 @@ class UserService:
         return user
 
     async def activate_user(self, token: str) -> bool:
-        user = self.db.query(User).filter(
+        user = await self.db.scalar(select(User).where(
             User.activation_token == token,
             User.is_active == False
-        ).first()
+        ))
         
         if not user:
             return False
             
         user.is_active = True
         user.activation_token = None
-        self.db.commit()
+        await self.db.commit()
         return True
 
     async def reset_password_request(self, email: str) -> None:
-        user = self.db.query(User).filter(User.email == email).first()
+        user = await self.db.scalar(select(User).where(User.email == email))
         if user:
             reset_token = secrets.token_urlsafe(32)
             user.reset_token = reset_token
             user.reset_token_expires = datetime.utcnow() + timedelta(hours=24)
-            self.db.commit()
+            await self.db.commit()
             
             await self.email_service.send_password_reset_email(
                 email,
@@ -74,9 +75,9 @@ class UserService:
         user.login_attempts += 1
         if user.login_attempts >= self.max_login_attempts:
             user.blocked_until = datetime.utcnow() + self.block_duration
-        self.db.commit()
+        await self.db.commit()
 
     async def reset_login_attempts(self, user: User) -> None:
         user.login_attempts = 0
         user.blocked_until = None
-        self.db.commit() 
\ No newline at end of file
+        await self.db.commit() 
\ No newline at end of file
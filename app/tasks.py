@@ -1,4 +1,3 @@
-import json
 import os
 import datetime
 import requests
@@ -14,7 +13,8 @@ from urllib.parse import urlparse, urljoin
 from weasyprint import HTML
 
 from .config.settings import settings
-from .core.database import SessionLocal
+from .core.database import SessionLocal, db_session
+from sqlalchemy.ext.asyncio import AsyncSession
 from .models import Audit, AuditPage
 from .exceptions import AuditException, AuditNotFound, CrawlerError, AuditDataNotFound, SerpAnalyError, ContentNotFoundError
 from .celery_config import celery_app
@@ -22,15 +22,17 @@ from .celery_config import celery_app
 from typing import Dict, List, Tuple, Set, Optional, Any
 from celery.exceptions import SoftTimeLimitExceeded
 from requests.exceptions import Timeout
-from tenacity import retry, stop_after_attempt, wait_exponential
 
 from .scrapy_crawler.runner import ScrapyRunner
+from .scrapy_crawler.distributed import RedisFrontier, DistributedCrawlWorker
 from .data_analysis.seo_analyzer import SEODataAnalyzer
+from .data_analysis.page_store import PageStoreWriter, clear_pages
 from .serp_analysis.serp_analyzer import SerpAnalyzer
 
 import aiohttp
 import asyncio
-from collections import defaultdict
+from collections import Counter
+from functools import partial
 
 from app.services.text_analysis_service import TextAnalysisService
 from app.services.competition_analysis_service import CompetitionAnalysisService
@@ -44,17 +46,25 @@ from app.services.ai_seo_optimization_service import AISEOOptimizationService
 from app.services.ai_seo_master_service import AISEOMasterService
 
 from app.core.task_wrapper import unified_task_handler
+from app.core import json_codec
+from app.core.http_client import fetch_html_sync, run_task_loop
+from app.services.link_checker import LinkChecker, normalize_link
+from app.services.link_status_cache import LinkStatusCache
+from app.services.redirect_resolver import RedirectResolver
+from app.services.audit_sections import (
+    get_section, get_sections, put_section, put_sections,
+    get_section_async, get_sections_async, load_audit_data_async, put_section_async, put_sections_async,
+    chunk_name, delete_sections_async, append_section_async, prune_section_async
+)
 from app.core.error_handling import TaskExecutionError, AuditNotFound
 from app.services.audit_service import AuditService
-from app.utils.memory_management import ChunkedProcessor
 
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from urllib.parse import urlparse
-import json
 import aiohttp
 from bs4 import BeautifulSoup
-from celery import Celery
+from celery import Celery, chord
 from sqlalchemy.orm import Session
 
 from .config.settings import settings
@@ -75,12 +85,10 @@ from app.services.content_analysis_service import ContentAnalysisService
 from app.services.performance_analysis_service import PerformanceAnalysisService
 from app.services.elasticsearch_service import ElasticsearchService
 from app.services.ai_analysis_service import AIAnalysisService
-from app.services.link_analysis_service import LinkAnalysisService
-from app.services.image_analysis_service import ImageAnalysisService
-from app.services.heading_analysis_service import HeadingAnalysisService
-from app.services.meta_analysis_service import MetaAnalysisService
+from app.services.page_elements_service import analyze_elements
 
 from app.core.activity_monitor import ActivityMonitor
+from app.core.redis_client import get_async_redis_client
 from app.services.seo_score_service import SEOScoreService
 from app.services.seo_suggestions_service import SEOSuggestionsService
 
@@ -97,13 +105,6 @@ async def cleanup_connections():
     # TODO: Implementacja zamykania połączeń do bazy danych, cache, itp.
     pass
 
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
 celery_app = Celery(
     "seo_mvp",
     broker=f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/0",
@@ -121,66 +122,105 @@ base_task_config = {
 
 @celery_app.task(**base_task_config)
 @unified_task_handler()
-async def crawl_entire_site(self, audit_id: int, max_pages: int = 30, depth_limit: int = 2) -> str:
-    """Rozbudowany crawler z obsługą pamięci i błędów"""
-    async with get_db() as db:
+async def crawl_entire_site(self, audit_id: int, max_pages: int = 30, depth_limit: int = 2,
+                            render_config: Optional[Dict[str, Any]] = None,
+                            lowercase_paths: bool = False) -> str:
+    """Rozbudowany crawler z obsługą pamięci i błędów.
+
+    `render_config` (block_resource_types, block_domains) ustawia blokowanie
+    zasobów przy renderowaniu przez CDP. `lowercase_paths` włącza dla
+    audytu deduplikację adresów bez względu na wielkość liter ścieżki.
+    """
+    async with db_session() as db:
         audit_service = AuditService(db)
         audit = await audit_service.get_audit(audit_id)
         
-        chunked_processor = ChunkedProcessor(chunk_size=100)
-        runner = ScrapyRunner()
+        runner = ScrapyRunner(render_config=render_config)
+        # Przy ponownym audycie niezmienione strony nie są parsowane ani analizowane
+        revalidation = await audit_service.build_revalidation_index(audit)
         
-        # Crawling z podziałem na chunki
-        results = []
-        async for chunk in runner.crawl_in_chunks(
-            url=audit.url,
-            max_pages=max_pages,
-            depth_limit=depth_limit
-        ):
-            processed_chunk = await chunked_processor.process_in_chunks(
-                chunk,
-                audit_service.process_page_data
-            )
-            results.extend(processed_chunk)
+        # Crawling z podziałem na chunki - strony są zapisywane na bieżąco
+        # (zbiorczo do AuditPage i do pliku kolumnowego), w pamięci trzymamy tylko licznik.
+        # Ponowione zadanie zastaje strony z poprzedniej próby - wtedy upsert
+        pages_crawled = 0
+        # Pliki kolumnowe poprzedniego crawla (np. rozproszonego) nie mogą się doliczyć
+        clear_pages(audit_id)
+        async with await audit_service.page_writer(audit_id) as page_rows:
+            with PageStoreWriter(audit_id) as page_store:
+                async for chunk in runner.crawl_in_chunks(
+                    url=audit.url,
+                    max_pages=max_pages,
+                    depth_limit=depth_limit,
+                    chunk_size=100,
+                    revalidation=revalidation,
+                    lowercase_paths=lowercase_paths
+                ):
+                    await page_rows.add_many(chunk)
+                    page_store.write_many(chunk)
+                    pages_crawled += len(chunk)
             
-        await audit_service.update_audit_status(audit_id, "done", len(results))
-        return f"Crawled {len(results)} pages"
+        await audit_service.update_audit_status(audit_id, "done", pages_crawled)
+        return f"Crawled {pages_crawled} pages"
 
-# --------------------------------------------------------------------
-# 2. STARY CRAWL_WEBSITE (jedna strona) – ewentualnie zachowujemy
-# --------------------------------------------------------------------
-def validate_response(response: requests.Response) -> bool:
-    """Sprawdza czy odpowiedź HTTP jest odpowiednia do parsowania."""
-    if not response.ok:
-        return False
-    
-    content_type = response.headers.get('content-type', '').lower()
-    if 'text/html' not in content_type:
-        return False
+@celery_app.task(**base_task_config)
+@unified_task_handler()
+async def crawl_entire_site_distributed(self, audit_id: int, workers: int = 4, max_pages: int = 30, depth_limit: int = 2,
+                                        lowercase_paths: bool = False) -> str:
+    """Crawl jednego audytu rozłożony na kilka workerów ze wspólnym frontierem w Redis"""
+    async with db_session() as db:
+        audit_service = AuditService(db)
+        audit = await audit_service.get_audit(audit_id)
         
-    if not response.text.strip():
-        return False
+        async with get_async_redis_client() as redis:
+            frontier = RedisFrontier(redis, audit_id, partitions=workers)
+            await frontier.setup(audit.url, max_pages=max_pages, depth_limit=depth_limit,
+                                 lowercase_paths=lowercase_paths)
+        # Partycje zapisują part-<n>.arrow - stare pliki (także z większej liczby workerów) znikają
+        clear_pages(audit_id)
         
-    return True
-
-@retry(
-    stop=stop_after_attempt(settings.RETRY_CONFIG.max_attempts),
-    wait=wait_exponential(
-        multiplier=settings.RETRY_CONFIG.min_wait,
-        max=settings.RETRY_CONFIG.max_wait
-    )
-)
-def make_request(url: str, operation: str = "default") -> Optional[requests.Response]:
-    timeout = settings.get_timeout(operation)
-    response = requests.get(
-        url,
-        timeout=(timeout.connect, timeout.read),
-        headers={'User-Agent': 'SEO-MVP-Crawler/1.0'}
-    )
-    if not validate_response(response):
-        raise ValueError(f"Invalid response: {response.status_code}")
-    return response
+        chord(
+            crawl_site_partition.s(audit_id, partition, workers)
+            for partition in range(workers)
+        )(finish_distributed_crawl.s(audit_id, workers))
+        return f"Distributed crawl started on {workers} workers"
+
+@celery_app.task(**base_task_config)
+@unified_task_handler()
+async def crawl_site_partition(self, audit_id: int, partition: int, partitions: int) -> int:
+    """Crawluje partycję URL-i audytu (i podbiera pracę z pozostałych)"""
+    async with db_session() as db, get_async_redis_client() as redis:
+        audit_service = AuditService(db)
+        worker = DistributedCrawlWorker(
+            RedisFrontier(redis, audit_id, partitions=partitions),
+            partition
+        )
+        
+        # Partycje piszą równolegle do tych samych audit_pages - zawsze upsert.
+        # Każda partycja zapisuje też własny plik kolumnowy
+        pages_crawled = 0
+        async with await audit_service.page_writer(audit_id, upsert=True) as page_rows:
+            with PageStoreWriter(audit_id, part=partition) as page_store:
+                async for page in worker.crawl():
+                    await page_rows.add(page)
+                    page_store.write(page)
+                    pages_crawled += 1
+        return pages_crawled
+
+@celery_app.task(**base_task_config)
+@unified_task_handler()
+async def finish_distributed_crawl(self, partition_results: List[int], audit_id: int, partitions: int) -> str:
+    """Zamyka rozproszony crawl po zakończeniu wszystkich partycji"""
+    async with db_session() as db:
+        audit_service = AuditService(db)
+        pages_crawled = sum(partition_results)
+        await audit_service.update_audit_status(audit_id, "done", pages_crawled)
+        async with get_async_redis_client() as redis:
+            await RedisFrontier(redis, audit_id, partitions=partitions).cleanup()
+        return f"Crawled {pages_crawled} pages"
 
+# --------------------------------------------------------------------
+# 2. STARY CRAWL_WEBSITE (jedna strona) – ewentualnie zachowujemy
+# --------------------------------------------------------------------
 @celery_app.task(soft_time_limit=settings.get_celery_timeout("crawl"))
 def crawl_website(audit_id: int) -> str:
     db = SessionLocal()
@@ -190,8 +230,9 @@ def crawl_website(audit_id: int) -> str:
             raise AuditNotFound()
 
         try:
-            response = make_request(audit.url, "crawl")
-            soup = BeautifulSoup(response.text, "html.parser")
+            # Nagłówki sprawdzane przed pobraniem treści, rozmiar ograniczony
+            page = fetch_html_sync(audit.url, "crawl")
+            soup = BeautifulSoup(page.text, "html.parser")
             # reszta kodu parsowania...
         except Exception as e:
             raise CrawlerError(str(e))
@@ -201,23 +242,6 @@ def crawl_website(audit_id: int) -> str:
 # --------------------------------------------------------------------
 # 3. CHECK LINKS, GENERATE LINK FIXES
 # --------------------------------------------------------------------
-async def check_single_link(session: aiohttp.ClientSession, url: str) -> dict:
-    try:
-        async with session.head(url, allow_redirects=True, timeout=10) as response:
-            return {
-                "url": url,
-                "status_code": response.status,
-                "is_redirect": response.history != (),
-                "error": None
-            }
-    except Exception as e:
-        return {
-            "url": url,
-            "status_code": None,
-            "is_redirect": False,
-            "error": str(e)
-        }
-
 @celery_app.task(
     bind=True,
     soft_time_limit=settings.CELERY_TASK_TIMEOUT,
@@ -228,34 +252,92 @@ async def check_single_link(session: aiohttp.ClientSession, url: str) -> dict:
 )
 def check_links(self, audit_id: int, check_external: bool = False) -> str:
     """Zoptymalizowane sprawdzanie linków"""
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    return loop.run_until_complete(_async_check_links(audit_id, check_external))
+    return run_task_loop(_async_check_links(audit_id, check_external))
+
+def _collect_audit_links(db: Session, audit: Audit, check_external: bool,
+                         resolver: RedirectResolver) -> Counter:
+    """Linki z sekcji `links` i ze wszystkich stron audytu; wartość to liczba wystąpień.
+
+    Przekierowania, przez które przeszedł crawler, trafiają do `resolver`.
+    """
+    domain = urlparse(audit.url).netloc
+    occurrences: Counter = Counter()
+
+    def add(links: List[Any]) -> None:
+        for link in links:
+            url = normalize_link(link.get('url') or '' if isinstance(link, dict) else link or '')
+            if url and (check_external or urlparse(url).netloc == domain):
+                occurrences[url] += 1
+
+    add(get_section(db, audit.id, 'links', []))
+    rows = db.query(AuditPage.analysis_data).filter(AuditPage.audit_id == audit.id).yield_per(500)
+    for row in rows:
+        if row.analysis_data:
+            page = json_codec.loads(row.analysis_data)
+            add(page.get('links', []))
+            if page.get('redirect_chain'):
+                resolver.seed(page['redirect_chain'], page['url'], page.get('status_code'))
+    return occurrences
+
+async def _save_link_batch(db: AsyncSession, audit_id: int, index: int, batch: List[Dict[str, Any]],
+                           checked: int, total: int) -> None:
+    """Dopisuje porcję wyników jako osobne sekcje - wcześniejsze porcje nie są przepisywane"""
+    await put_sections_async(db, audit_id, {
+        chunk_name('linkChecker', index): batch,
+        # Pełne łańcuchy, pętle i cel końcowy dla linków, które przekierowują
+        chunk_name('redirectChains', index): {r['href']: r['chain'] for r in batch if r.get('chain')},
+        'linkCheckerProgress': {'checked': checked, 'total': total}
+    })
 
 async def _async_check_links(audit_id: int, check_external: bool) -> str:
-    async with aiohttp.ClientSession() as session:
-        async with get_db() as db:
-            audit = await db.query(Audit).filter(Audit.id == audit_id).first()
-            if not audit:
-                raise AuditNotFound()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
+        if not audit:
+            raise AuditNotFound()
 
-            data_dict = json.loads(audit.audit_data or '{}')
-            links = data_dict.get('links', [])
-            
-            # Grupowanie linków po domenach
-            domains = defaultdict(list)
-            for link in links:
-                domain = urlparse(link['url']).netloc
-                domains[domain].append(link['url'])
-            
-            # Sprawdzanie linków z limitem na domenę
-            results = []
-            for domain, urls in domains.items():
-                tasks = [check_single_link(session, url) for url in urls]
-                domain_results = await asyncio.gather(*tasks, return_exceptions=True)
-                results.extend(domain_results)
-                
-            return "Links checked"
+        resolver = RedirectResolver()
+        # Strumieniowe czytanie stron (yield_per) jest synchroniczne - przez run_sync
+        occurrences = await db.run_sync(_collect_audit_links, audit, check_external, resolver)
+        total = len(occurrences)
+        # Wyniki poprzedniego sprawdzania
+        await delete_sections_async(db, audit_id, ['linkChecker', 'redirectChains', 'linkCheckerSummary'])
+
+        # Wyniki zapisywane porcjami co LINK_CHECK_FLUSH_EVERY linków - przerwane
+        # zadanie zostawia to, co zdążyło sprawdzić; w pamięci jest tylko bieżąca porcja
+        batch: List[Dict[str, Any]] = []
+        chunks = checked = 0
+        priorities: Counter = Counter()
+        # Linki zewnętrzne najpierw ze współdzielonego cache statusów
+        cache = LinkStatusCache() if settings.LINK_STATUS_CACHE_ENABLED else None
+        checker = LinkChecker(
+            cache=cache,
+            own_hosts={urlparse(audit.url).netloc},
+            resolver=resolver
+        )
+        try:
+            async for result in checker.check_all(occurrences):
+                entry = result._asdict()
+                if entry['chain'] is None:
+                    del entry['chain']
+                batch.append({**entry, 'occurrences': occurrences[result.href]})
+                priorities[entry['priority']] += 1
+                checked += 1
+                if len(batch) >= settings.LINK_CHECK_FLUSH_EVERY:
+                    await _save_link_batch(db, audit_id, chunks, batch, checked, total)
+                    chunks += 1
+                    batch = []
+        finally:
+            if cache is not None:
+                await cache.close()
+        if batch:
+            await _save_link_batch(db, audit_id, chunks, batch, checked, total)
+
+        broken = priorities['error']
+        await put_sections_async(db, audit_id, {
+            'linkCheckerProgress': {'checked': checked, 'total': total},
+            'linkCheckerSummary': {'checked': checked, 'broken': broken, 'priorities': dict(priorities)}
+        })
+        return f"Links checked: {checked} ({broken} broken)"
 
 @celery_app.task
 def generate_link_fixes(audit_id: int):
@@ -268,20 +350,14 @@ def generate_link_fixes(audit_id: int):
         if not audit:
             return f"Audit not found (id={audit_id})"
 
-        if not audit.audit_data:
-            return "No audit_data found."
-
-        data_dict = json.loads(audit.audit_data)
-        link_checker = data_dict.get("linkChecker", [])
+        link_checker = get_section(db, audit.id, "linkChecker", [])
         if not link_checker:
             return "No linkChecker – run check_links first."
 
         # Wyłapujemy linki z priority in ["warning","error"]
         problem_links = [lk for lk in link_checker if lk["priority"] in ("warning","error")]
         if not problem_links:
-            data_dict["linkFixSuggestions"] = "No problematic links."
-            audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-            db.commit()
+            put_section(db, audit.id, "linkFixSuggestions", "No problematic links.")
             return "No link problems."
 
         openai.api_key = settings.OPENAI_API_KEY
@@ -310,9 +386,7 @@ def generate_link_fixes(audit_id: int):
         except Exception as e:
             return f"OpenAI error: {str(e)}"
 
-        data_dict["linkFixSuggestions"] = ai_out
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        db.commit()
+        put_section(db, audit.id, "linkFixSuggestions", ai_out)
 
         return "link fixes generated."
     except Exception as e:
@@ -326,7 +400,7 @@ def generate_link_fixes(audit_id: int):
 @celery_app.task(soft_time_limit=settings.CELERY_TASK_TIMEOUT)
 def check_images(audit_id: int) -> str:
     """
-    Weryfikacja alt w pliku audit_data single-page.
+    Weryfikacja alt w sekcji images audytu single-page.
     (Dla multi-page musiałbyś to adaptować do AuditPage).
     """
     db: Session = SessionLocal()
@@ -335,11 +409,9 @@ def check_images(audit_id: int) -> str:
         if not audit:
             raise AuditNotFound()
 
-        if not audit.audit_data:
+        images = get_section(db, audit.id, "images")
+        if images is None:
             raise AuditDataNotFound()
-
-        data_dict = json.loads(audit.audit_data)
-        images = data_dict.get("images", [])
         results = []
         for img in images:
             if isinstance(img, dict):
@@ -352,14 +424,14 @@ def check_images(audit_id: int) -> str:
                 missing_alt = True
             results.append({"src": src, "missingAlt": missing_alt})
 
-        data_dict["imageAudit"] = results
         missing_count = sum(1 for i in results if i["missingAlt"])
-        data_dict["imageStats"] = {
-            "total": len(results),
-            "missingAlt": missing_count
-        }
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        db.commit()
+        put_sections(db, audit.id, {
+            "imageAudit": results,
+            "imageStats": {
+                "total": len(results),
+                "missingAlt": missing_count
+            }
+        })
 
         return f"{missing_count} out of {len(results)} images have no alt."
     except Exception as e:
@@ -380,18 +452,13 @@ def generate_alt_suggestions(audit_id: int):
         if not audit:
             return "Audit not found."
 
-        data_dict = {}
-        if audit.audit_data:
-            data_dict = json.loads(audit.audit_data)
-        image_audit = data_dict.get("imageAudit", [])
+        image_audit = get_section(db, audit.id, "imageAudit", [])
         if not image_audit:
             return "No imageAudit – run check_images first."
 
         missing = [img for img in image_audit if img["missingAlt"]]
         if not missing:
-            data_dict["imageAltSuggestions"] = "All images have alt."
-            audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-            db.commit()
+            put_section(db, audit.id, "imageAltSuggestions", "All images have alt.")
             return "No missing alt."
 
         openai.api_key = settings.OPENAI_API_KEY
@@ -419,9 +486,7 @@ def generate_alt_suggestions(audit_id: int):
         except Exception as e:
             return f"OpenAI error: {str(e)}"
 
-        data_dict["imageAltSuggestions"] = ai_out
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        db.commit()
+        put_section(db, audit.id, "imageAltSuggestions", ai_out)
 
         return "Alt suggestions generated."
     except Exception as e:
@@ -446,11 +511,9 @@ def check_headings(audit_id: int) -> str:
         if not audit:
             raise AuditNotFound()
 
-        if not audit.audit_data:
+        headings = get_section(db, audit.id, "headings")
+        if headings is None:
             raise AuditDataNotFound()
-
-        data_dict = json.loads(audit.audit_data)
-        headings = data_dict.get("headings", {})
         h1 = headings.get("h1", [])
         h2 = headings.get("h2", [])
         h3 = headings.get("h3", [])
@@ -465,9 +528,7 @@ def check_headings(audit_id: int) -> str:
             "noH1": no_h1,
             "multipleH1": multiple_h1
         }
-        data_dict["headingsAnalysis"] = analysis
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        db.commit()
+        put_section(db, audit.id, "headingsAnalysis", analysis)
 
         return f"Headings check done. H1={len(h1)}"
     except Exception as e:
@@ -500,13 +561,7 @@ def check_meta(audit_id: int) -> str:
             "descTooLong": (len(meta_desc)>160)
         }
 
-        data_dict = {}
-        if audit.audit_data:
-            data_dict = json.loads(audit.audit_data)
-        data_dict["metaAnalysis"] = analysis
-
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        db.commit()
+        put_section(db, audit.id, "metaAnalysis", analysis)
         return "check_meta done."
     except Exception as e:
         if isinstance(e, AuditException):
@@ -521,22 +576,24 @@ def check_meta(audit_id: int) -> str:
 @celery_app.task
 async def calculate_seo_score(audit_id: int) -> str:
     try:
-        with get_db() as db:
-            audit = db.query(Audit).filter(Audit.id == audit_id).first()
+        async with db_session() as db:
+            audit = await db.get(Audit, audit_id)
             if not audit:
                 raise AuditNotFound()
 
-            data_dict = json.loads(audit.audit_data)
-            analyzer = SEODataAnalyzer(data_dict)
-            
-            # Dodajemy szczegółowe statystyki
-            data_dict['detailed_stats'] = {
-                'links': analyzer.generate_link_stats(),
-                'images': analyzer.generate_image_stats()
-            }
+            analyzer = SEODataAnalyzer.for_audit(
+                audit.id, await get_sections_async(db, audit.id, ['links', 'images', 'headings'])
+            )
             
-            # Dodajemy wizualizacje
-            data_dict['visualizations'] = analyzer.generate_visualizations()
+            # Dodajemy szczegółowe statystyki i wizualizacje
+            await put_sections_async(db, audit.id, {
+                'detailed_stats': {
+                    'links': analyzer.generate_link_stats(),
+                    'images': analyzer.generate_image_stats(),
+                    'site': analyzer.generate_site_stats()
+                },
+                'visualizations': analyzer.generate_visualizations()
+            })
             
             # Standardowe obliczanie score
             score = 100
@@ -545,9 +602,6 @@ async def calculate_seo_score(audit_id: int) -> str:
             # Reszta logiki obliczania score pozostaje bez zmian
             # Odniesienie do oryginalnego kodu: linie 504-518
             
-            audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-            db.commit()
-            
             # Dodajemy indeksowanie
             await index_audit_data.delay(audit_id)
             
@@ -571,9 +625,9 @@ def generate_report(audit_id: int) -> str:
         if not audit:
             return "Audit not found"
 
-        data_dict = {}
-        if audit.audit_data:
-            data_dict = json.loads(audit.audit_data)
+        data_dict = get_sections(db, audit.id, [
+            "seoScore", "linkStats", "imageStats", "headingsAnalysis", "metaAnalysis"
+        ])
 
         score_obj = data_dict.get("seoScore", {})
         link_stats = data_dict.get("linkStats", {})
@@ -617,9 +671,7 @@ def generate_report(audit_id: int) -> str:
         pdf_path = f"{reports_dir}/audit_{audit_id}_report.pdf"
         HTML(string=html_content).write_pdf(pdf_path)
 
-        data_dict["reportPath"] = pdf_path
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        db.commit()
+        put_section(db, audit.id, "reportPath", pdf_path)
 
         return f"PDF report generated at {pdf_path}"
     except Exception as e:
@@ -638,10 +690,10 @@ def generate_seo_suggestions(audit_id: int) -> str:
         if not audit:
             raise AuditNotFound()
 
-        if not audit.audit_data:
+        data_dict = get_sections(db, audit.id, ["metaAnalysis", "headingsAnalysis", "linkStats", "imageStats"])
+        if not data_dict:
             raise AuditDataNotFound()
 
-        data_dict = json.loads(audit.audit_data)
         suggestions = []
 
         # Analiza meta tagów
@@ -716,14 +768,11 @@ def generate_seo_suggestions(audit_id: int) -> str:
             })
 
         # Zapisujemy sugestie
-        data_dict["seoSuggestions"] = {
+        put_section(db, audit.id, "seoSuggestions", {
             "suggestions": suggestions,
             "generatedAt": str(datetime.datetime.now()),
             "totalSuggestions": len(suggestions)
-        }
-        
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        db.commit()
+        })
 
         return f"Generated {len(suggestions)} SEO suggestions"
     except Exception as e:
@@ -735,7 +784,7 @@ def generate_seo_suggestions(audit_id: int) -> str:
 
 @celery_app.task
 def analyze_serp(audit_id: int, keywords: List[str]) -> str:
-    with get_db() as db:
+    with SessionLocal() as db:
         audit = db.query(Audit).filter(Audit.id == audit_id).first()
         if not audit:
             raise AuditNotFound()
@@ -752,10 +801,7 @@ def analyze_serp(audit_id: int, keywords: List[str]) -> str:
                 "analyzed_at": str(datetime.datetime.now())
             }
             
-            data_dict = json.loads(audit.audit_data) if audit.audit_data else {}
-            data_dict["serp_analysis"] = serp_data
-            audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-            db.commit()
+            put_section(db, audit.id, "serp_analysis", serp_data)
             
             return f"Analyzed {len(keywords)} keywords"
             
@@ -765,8 +811,8 @@ def analyze_serp(audit_id: int, keywords: List[str]) -> str:
 @celery_app.task
 async def index_audit_data(audit_id: int) -> str:
     """Indeksuje dane audytu w ElasticSearch"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
         
@@ -777,7 +823,7 @@ async def index_audit_data(audit_id: int) -> str:
 @unified_task_handler()
 async def analyze_content(self, audit_id: int, options: Dict = None) -> str:
     """Unified content analysis task"""
-    async with get_db() as db:
+    async with db_session() as db:
         audit_service = AuditService(db)
         audit = await audit_service.get_audit(audit_id)
         
@@ -798,13 +844,12 @@ async def analyze_content(self, audit_id: int, options: Dict = None) -> str:
 @celery_app.task
 async def analyze_market_position(audit_id: int, keywords: List[str]) -> str:
     """Kompleksowa analiza pozycji w SERP i konkurencji"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
 
         serp_service = SerpAnalysisService()
-        data_dict = json.loads(audit.audit_data or '{}')
         
         # Analiza dla każdego słowa kluczowego
         market_analysis = {
@@ -824,9 +869,7 @@ async def analyze_market_position(audit_id: int, keywords: List[str]) -> str:
             market_analysis['keywords_analysis'].append(analysis)
         
         # Aktualizacja danych audytu
-        data_dict['market_position_analysis'] = market_analysis
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        await db.commit()
+        await put_section_async(db, audit.id, 'market_position_analysis', market_analysis)
         
         # Indeksowanie w ElasticSearch
         await index_audit_data.delay(audit_id)
@@ -836,16 +879,15 @@ async def analyze_market_position(audit_id: int, keywords: List[str]) -> str:
 @celery_app.task
 async def analyze_content_quality(audit_id: int, main_keyword: str) -> str:
     """Kompleksowa analiza jakości treści"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
 
         content_service = ContentAnalysisService()
-        data_dict = json.loads(audit.audit_data or '{}')
         
         # Pobierz treść ze strony
-        text_content = data_dict.get('text_content', '')
+        text_content = await get_section_async(db, audit.id, 'text_content', '')
         if not text_content:
             raise ContentNotFoundError("Nie znaleziono treści do analizy")
 
@@ -856,9 +898,7 @@ async def analyze_content_quality(audit_id: int, main_keyword: str) -> str:
         )
         
         # Aktualizuj dane audytu
-        data_dict['content_quality_analysis'] = analysis_results
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        await db.commit()
+        await put_section_async(db, audit.id, 'content_quality_analysis', analysis_results)
         
         # Indeksuj w ElasticSearch
         await index_audit_data.delay(audit_id)
@@ -868,21 +908,18 @@ async def analyze_content_quality(audit_id: int, main_keyword: str) -> str:
 @celery_app.task
 async def analyze_performance(audit_id: int) -> str:
     """Analiza wydajności strony"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
 
         perf_service = PerformanceAnalysisService()
-        data_dict = json.loads(audit.audit_data or '{}')
         
         # Analiza wydajności
         performance_data = await perf_service.analyze_performance(audit.url)
         
         # Aktualizacja danych audytu
-        data_dict['performance_analysis'] = performance_data
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        await db.commit()
+        await put_section_async(db, audit.id, 'performance_analysis', performance_data)
         
         # Indeksowanie w ElasticSearch
         await index_audit_data.delay(audit_id)
@@ -896,48 +933,37 @@ async def analyze_performance(audit_id: int) -> str:
 )
 async def monitor_performance(self, audit_id: int) -> str:
     """Monitorowanie wydajności strony"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
 
         monitoring_service = PerformanceMonitoringService()
-        data_dict = json.loads(audit.audit_data or '{}')
         
         # Zbierz metryki
         monitoring_data = await monitoring_service.monitor_metrics(audit.url)
         
-        # Aktualizuj dane audytu
-        if 'performance_monitoring' not in data_dict:
-            data_dict['performance_monitoring'] = []
-        
-        data_dict['performance_monitoring'].append({
+        # Pomiar dopisywany jako osobna porcja - równoległe przebiegi nie gubią wpisów
+        await append_section_async(db, audit.id, 'performance_monitoring', [{
             'timestamp': datetime.now().isoformat(),
             **monitoring_data
-        })
+        }])
         
         # Zachowaj tylko ostatnie 7 dni monitoringu
-        week_ago = datetime.now() - datetime.timedelta(days=7)
-        data_dict['performance_monitoring'] = [
-            entry for entry in data_dict['performance_monitoring']
-            if datetime.fromisoformat(entry['timestamp']) > week_ago
-        ]
-        
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        await db.commit()
+        await prune_section_async(db, audit.id, 'performance_monitoring', datetime.utcnow() - timedelta(days=7))
         
         return "Performance monitoring updated"
 
 @celery_app.task
 async def analyze_with_ai(audit_id: int) -> str:
     """Kompleksowa analiza z wykorzystaniem AI"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
 
         ai_service = AIAnalysisService()
-        data_dict = json.loads(audit.audit_data or '{}')
+        data_dict = await get_sections_async(db, audit.id, ['text_content', 'meta_tags', 'competitor_content'])
         
         # Analiza treści
         content_analysis = await ai_service.analyze_content_structure(
@@ -958,15 +984,12 @@ async def analyze_with_ai(audit_id: int) -> str:
             )
         
         # Aktualizacja danych audytu
-        data_dict['ai_analysis'] = {
+        await put_section_async(db, audit.id, 'ai_analysis', {
             'content_structure': content_analysis,
             'meta_improvements': meta_improvements,
             'competition_analysis': competition_analysis,
             'analyzed_at': datetime.now().isoformat()
-        }
-        
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        await db.commit()
+        })
         
         return "AI analysis completed"
 
@@ -979,13 +1002,13 @@ async def analyze_with_ai(audit_id: int) -> str:
 )
 async def analyze_technical_seo(self, audit_id: int) -> str:
     """Kompleksowa analiza technicznego SEO z wykorzystaniem AI"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
 
         tech_seo_service = AITechnicalSEOService()
-        data_dict = json.loads(audit.audit_data or '{}')
+        data_dict = await get_sections_async(db, audit.id, ['performance_analysis', 'html_content', 'text_content', 'page_type'])
         
         # Pobierz dane wydajnościowe
         performance_data = data_dict.get('performance_analysis', {})
@@ -1008,28 +1031,26 @@ async def analyze_technical_seo(self, audit_id: int) -> str:
         )
         
         # Aktualizacja danych audytu
-        data_dict['technical_seo_analysis'] = {
+        await put_section_async(db, audit.id, 'technical_seo_analysis', {
             'technical_issues': technical_analysis,
             'schema_suggestions': schema_suggestions,
             'core_web_vitals_analysis': cwv_analysis,
             'analyzed_at': datetime.now().isoformat()
-        }
-        
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        await db.commit()
+        })
         
         return "Technical SEO analysis completed"
 
 @celery_app.task
 async def optimize_seo_strategy(audit_id: int) -> str:
     """Kompleksowa optymalizacja strategii SEO z wykorzystaniem AI"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
 
         seo_service = AISEOOptimizationService()
-        data_dict = json.loads(audit.audit_data or '{}')
+        # Plan treści korzysta z wielu sekcji naraz
+        data_dict = await load_audit_data_async(db, audit)
         
         # Analiza luk w treści
         content_gaps = await seo_service.analyze_content_gaps(
@@ -1046,28 +1067,25 @@ async def optimize_seo_strategy(audit_id: int) -> str:
         )
         
         # Aktualizacja danych audytu
-        data_dict['seo_optimization'] = {
+        await put_section_async(db, audit.id, 'seo_optimization', {
             'content_gaps': content_gaps,
             'content_plan': content_plan,
             'internal_linking': internal_linking,
             'generated_at': datetime.now().isoformat()
-        }
-        
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        await db.commit()
+        })
         
         return "SEO optimization strategy generated"
 
 @celery_app.task
 async def generate_master_seo_plan(audit_id: int) -> str:
     """Generuje kompleksowy plan SEO"""
-    async with get_db() as db:
-        audit = await db.query(Audit).filter(Audit.id == audit_id).first()
+    async with db_session() as db:
+        audit = await db.get(Audit, audit_id)
         if not audit:
             raise AuditNotFound()
 
         master_service = AISEOMasterService()
-        data_dict = json.loads(audit.audit_data or '{}')
+        data_dict = await load_audit_data_async(db, audit)
         
         # Generuj główną analizę
         master_analysis = await master_service.generate_master_analysis(data_dict)
@@ -1076,14 +1094,11 @@ async def generate_master_seo_plan(audit_id: int) -> str:
         competitive_plan = await master_service.generate_competitive_advantage_plan(data_dict)
         
         # Aktualizuj dane audytu
-        data_dict['master_seo_plan'] = {
+        await put_section_async(db, audit.id, 'master_seo_plan', {
             'master_analysis': master_analysis,
             'competitive_plan': competitive_plan,
             'generated_at': datetime.now().isoformat()
-        }
-        
-        audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-        await db.commit()
+        })
         
         return "Master SEO plan generated"
 
@@ -1109,24 +1124,13 @@ async def safe_task_wrapper(self, task_func, *args, **kwargs):
 @unified_task_handler()
 async def analyze_page_elements(self, audit_id: int, elements: List[str] = None) -> str:
     """Unified task for analyzing page elements (links, images, headings, meta)"""
-    async with get_db() as db:
+    async with db_session() as db:
         audit_service = AuditService(db)
         audit = await audit_service.get_audit(audit_id)
         
         elements = elements or ['links', 'images', 'headings', 'meta']
-        analysis_results = {}
-        
-        if 'links' in elements:
-            analysis_results['links'] = await LinkAnalysisService.analyze(audit.url)
-            
-        if 'images' in elements:
-            analysis_results['images'] = await ImageAnalysisService.analyze(audit.url)
-            
-        if 'headings' in elements:
-            analysis_results['headings'] = await HeadingAnalysisService.analyze(audit.url)
-            
-        if 'meta' in elements:
-            analysis_results['meta'] = await MetaAnalysisService.analyze(audit.url)
+        # Jedno pobranie i jedno parsowanie strony dla wszystkich elementów
+        analysis_results = await analyze_elements(audit.url, elements)
         
         await audit_service.update_analysis_results(audit_id, analysis_results)
         return f"Analyzed elements: {', '.join(elements)}"
@@ -1135,7 +1139,7 @@ async def analyze_page_elements(self, audit_id: int, elements: List[str] = None)
 @unified_task_handler()
 async def generate_ai_suggestions(self, audit_id: int, elements: List[str] = None) -> str:
     """Unified task for generating AI suggestions"""
-    async with get_db() as db:
+    async with db_session() as db:
         audit_service = AuditService(db)
         audit = await audit_service.get_audit(audit_id)
         
@@ -1158,7 +1162,7 @@ async def generate_ai_suggestions(self, audit_id: int, elements: List[str] = Non
 @unified_task_handler()
 async def analyze_audit_elements(self, audit_id: int, user_id: int, elements: List[str] = None) -> str:
     """Unified task with authorization"""
-    async with get_db() as db:
+    async with db_session() as db:
         audit_service = AuditService(db)
         audit = await audit_service.get_audit(audit_id)
         if audit.owner_id != user_id:
@@ -1170,7 +1174,6 @@ async def analyze_audit_elements(self, audit_id: int, user_id: int, elements: Li
             raise HTTPException(status_code=403, detail="Not authorized")
         
         elements = elements or ['links', 'images', 'headings', 'meta']
-        analysis_results = {}
         
         # Logowanie rozpoczęcia analizy
         await activity_monitor.log_activity(
@@ -1180,27 +1183,14 @@ async def analyze_audit_elements(self, audit_id: int, user_id: int, elements: Li
         )
         
         try:
-            if 'links' in elements:
-                analysis_results['links'] = await LinkAnalysisService.analyze(audit.url)
-                
-            if 'images' in elements:
-                analysis_results['images'] = await ImageAnalysisService.analyze(audit.url)
-                
-            if 'headings' in elements:
-                analysis_results['headings'] = await HeadingAnalysisService.analyze(audit.url)
-                
-            if 'meta' in elements:
-                analysis_results['meta'] = await MetaAnalysisService.analyze(audit.url)
+            analysis_results = await analyze_elements(audit.url, elements)
             
             # Aktualizacja danych audytu
-            data_dict = json.loads(audit.audit_data or '{}')
-            data_dict['elements_analysis'] = {
-                **data_dict.get('elements_analysis', {}),
+            await put_section_async(db, audit.id, 'elements_analysis', {
+                **(await get_section_async(db, audit.id, 'elements_analysis', {})),
                 **analysis_results,
                 'analyzed_at': datetime.utcnow().isoformat()
-            }
-            audit.audit_data = json.dumps(data_dict, ensure_ascii=False)
-            await db.commit()
+            })
             
             # Logowanie sukcesu
             await activity_monitor.log_activity(
@@ -1232,7 +1222,7 @@ def your_task():
 @celery_app.task(name="unified_analysis_task")
 async def unified_analysis_task(audit_id: int, analysis_type: str) -> dict:
     """Unified task for different types of analysis"""
-    async with get_db() as db:
+    async with db_session() as db:
         audit_service = AuditService(db)
         audit = await audit_service.get_audit(audit_id)
         
@@ -1259,7 +1249,7 @@ async def unified_analysis_task(audit_id: int, analysis_type: str) -> dict:
 @celery_app.task(name="generate_ai_suggestions")
 async def generate_ai_suggestions(audit_id: int, elements: Optional[List[str]] = None) -> dict:
     """Generate AI-powered suggestions for audit elements"""
-    async with get_db() as db:
+    async with db_session() as db:
         audit_service = AuditService(db)
         audit = await audit_service.get_audit(audit_id)
         
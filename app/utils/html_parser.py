@@ -1,65 +1,206 @@
-from bs4 import BeautifulSoup
-from typing import Dict, List, Optional
-import re
+from bs4 import BeautifulSoup, NavigableString, Tag
+from bs4.element import PreformattedString
+from typing import Any, Callable, Collection, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml jest zależnością Scrapy
+    etree = None
+
+# Zdarzenia przejścia po dokumencie: ('start', tag, atrybuty), ('text', tekst, None), ('end', tag, None)
+Event = Tuple[str, Any, Optional[Dict[str, str]]]
+
+HEADING_TAGS = ('h1', 'h2', 'h3', 'h4', 'h5', 'h6')
+SKIPPED_TEXT_TAGS = ('script', 'style')
+
+def _lxml_events(html: str) -> Iterator[Event]:
+    """Zdarzenia z parsera libxml2 (C) - szybka ścieżka dla dużych stron"""
+    if not html.strip():
+        return
+    root = etree.fromstring(html.encode('utf-8', 'replace'), etree.HTMLParser(encoding='utf-8'))
+    if root is None:
+        return
+
+    def walk(element) -> Iterator[Event]:
+        yield 'start', element.tag, dict(element.attrib)
+        if element.text:
+            yield 'text', element.text, None
+        # Iteracja po elemencie zwraca też komentarze i instrukcje
+        # przetwarzania - ich treść pomijamy, ale tekst za nimi należy do rodzica
+        for child in element:
+            if isinstance(child.tag, str):
+                yield from walk(child)
+            if child.tail:
+                yield 'text', child.tail, None
+        yield 'end', element.tag, None
+
+    yield from walk(root)
+
+def _soup_events(html: str) -> Iterator[Event]:
+    """Zdarzenia z BeautifulSoup z parserem html.parser (czysty Python)"""
+    def walk(node: Tag) -> Iterator[Event]:
+        for child in node.children:
+            if isinstance(child, Tag):
+                yield 'start', child.name, {
+                    key: ' '.join(value) if isinstance(value, list) else value
+                    for key, value in child.attrs.items()
+                }
+                yield from walk(child)
+                yield 'end', child.name, None
+            elif isinstance(child, NavigableString) and not isinstance(child, PreformattedString):
+                yield 'text', str(child), None
+
+    yield from walk(BeautifulSoup(html, 'html.parser'))
+
+BACKENDS: Dict[str, Callable[[str], Iterator[Event]]] = {'html.parser': _soup_events}
+if etree is not None:
+    BACKENDS['lxml'] = _lxml_events
+
+DEFAULT_BACKEND = 'lxml' if 'lxml' in BACKENDS else 'html.parser'
+
+def iter_events(html: str, backend: Optional[str] = None) -> Iterator[Event]:
+    """Zdarzenia przejścia po dokumencie z wybranego (domyślnie najszybszego) parsera"""
+    return BACKENDS[backend or DEFAULT_BACKEND](html or '')
+
+class Element(NamedTuple):
+    """Element z atrybutami i tekstem (połączone węzły tekstowe, jak `Tag.text`)"""
+    name: str
+    attrs: Dict[str, str]
+    text: str
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.attrs.get(key, default)
+
+def iter_elements(html: str, tags: Collection[str], backend: Optional[str] = None) -> Iterator[Element]:
+    """Elementy o nazwach z `tags` w jednym przejściu; każdy oddawany po swoim zamknięciu"""
+    # Otwarte elementy: (nazwa, atrybuty, fragmenty tekstu)
+    open_elements: List[Tuple[str, Dict[str, str], List[str]]] = []
+    for action, value, attrs in iter_events(html, backend):
+        if action == 'text':
+            for _, _, parts in open_elements:
+                parts.append(value)
+        elif action == 'start':
+            if value in tags:
+                open_elements.append((value, attrs, []))
+        elif value in tags:
+            for i in range(len(open_elements) - 1, -1, -1):
+                name, element_attrs, parts = open_elements[i]
+                if name == value:
+                    del open_elements[i]
+                    yield Element(name, element_attrs, ''.join(parts))
+                    break
+
+def _clean_text(text: str) -> str:
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split('  '))
+    return ' '.join(chunk for chunk in chunks if chunk)
+
+class _PageVisitor:
+    """Zbiera meta tagi, nagłówki, obrazy, linki i tekst w jednym przejściu"""
+
+    def __init__(self):
+        self.meta_tags: Dict[str, str] = {}
+        self.headings: Dict[str, List[str]] = {tag: [] for tag in HEADING_TAGS}
+        self.images: List[Dict[str, str]] = []
+        self.links: List[Dict[str, str]] = []
+        self.text: List[str] = []
+        self._skip_depth = 0
+        # Otwarte nagłówki/linki zbierające swój tekst: (tag, fragmenty, wynik)
+        self._open: List[Tuple[str, List[str], Any]] = []
+
+    def start(self, tag: str, attrs: Dict[str, str]) -> None:
+        if tag == 'meta':
+            name = attrs.get('name', attrs.get('property', ''))
+            content = attrs.get('content', '')
+            if name and content:
+                self.meta_tags[name] = content
+        elif tag in HEADING_TAGS:
+            self._open.append((tag, [], None))
+        elif tag == 'img':
+            self.images.append({
+                'src': attrs.get('src', ''),
+                'alt': attrs.get('alt', ''),
+                'title': attrs.get('title', '')
+            })
+        elif tag == 'a':
+            link = {'href': attrs.get('href', ''), 'text': '', 'title': attrs.get('title', '')}
+            self.links.append(link)
+            self._open.append((tag, [], link))
+        elif tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth += 1
+
+    def text_node(self, text: str) -> None:
+        for _, parts, _ in self._open:
+            parts.append(text)
+        if not self._skip_depth:
+            self.text.append(text)
+
+    def end(self, tag: str) -> None:
+        if tag in SKIPPED_TEXT_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in HEADING_TAGS or tag == 'a':
+            # Zamykamy ostatni otwarty element o tej nazwie (jak get_text(strip=True))
+            for i in range(len(self._open) - 1, -1, -1):
+                name, parts, link = self._open[i]
+                if name == tag:
+                    del self._open[i]
+                    text = ''.join(part.strip() for part in parts)
+                    if link is not None:
+                        link['text'] = text
+                    else:
+                        self.headings[tag].append(text)
+                    break
+
+    def result(self) -> Dict[str, Any]:
+        return {
+            'meta_tags': self.meta_tags,
+            'headings': self.headings,
+            'images': self.images,
+            'links': self.links,
+            'text': _clean_text(''.join(self.text))
+        }
+
+def extract_page(html: str, backend: Optional[str] = None) -> Dict[str, Any]:
+    """Jednoprzebiegowa ekstrakcja meta tagów, nagłówków, obrazów, linków i tekstu"""
+    visitor = _PageVisitor()
+    for action, value, attrs in iter_events(html, backend):
+        if action == 'text':
+            visitor.text_node(value)
+        elif action == 'start':
+            visitor.start(value, attrs)
+        else:
+            visitor.end(value)
+    return visitor.result()
 
 class HTMLParser:
-    def __init__(self, html: str):
-        self.soup = BeautifulSoup(html, 'html.parser')
-        
+    def __init__(self, html: str, backend: Optional[str] = None):
+        self.html = html
+        self.backend = backend or DEFAULT_BACKEND
+        self._data: Optional[Dict[str, Any]] = None
+
+    @property
+    def data(self) -> Dict[str, Any]:
+        """Wyniki jednego przejścia po dokumencie (liczone przy pierwszym użyciu)"""
+        if self._data is None:
+            self._data = extract_page(self.html, self.backend)
+        return self._data
+
     def get_meta_tags(self) -> Dict[str, str]:
         """Pobiera wszystkie meta tagi ze strony."""
-        meta_tags = {}
-        for tag in self.soup.find_all('meta'):
-            name = tag.get('name', tag.get('property', ''))
-            content = tag.get('content', '')
-            if name and content:
-                meta_tags[name] = content
-        return meta_tags
-        
+        return dict(self.data['meta_tags'])
+
     def get_headings(self) -> Dict[str, List[str]]:
         """Pobiera wszystkie nagłówki ze strony."""
-        headings = {}
-        for i in range(1, 7):
-            tag = f'h{i}'
-            headings[tag] = [h.get_text(strip=True) for h in self.soup.find_all(tag)]
-        return headings
-        
+        return {tag: list(texts) for tag, texts in self.data['headings'].items()}
+
     def get_images(self) -> List[Dict[str, str]]:
         """Pobiera wszystkie obrazy ze strony."""
-        images = []
-        for img in self.soup.find_all('img'):
-            image_data = {
-                'src': img.get('src', ''),
-                'alt': img.get('alt', ''),
-                'title': img.get('title', '')
-            }
-            images.append(image_data)
-        return images
-        
+        return [dict(image) for image in self.data['images']]
+
     def get_links(self) -> List[Dict[str, str]]:
         """Pobiera wszystkie linki ze strony."""
-        links = []
-        for link in self.soup.find_all('a'):
-            link_data = {
-                'href': link.get('href', ''),
-                'text': link.get_text(strip=True),
-                'title': link.get('title', '')
-            }
-            links.append(link_data)
-        return links
-        
+        return [dict(link) for link in self.data['links']]
+
     def get_text_content(self) -> str:
-        """Pobiera cały tekst ze strony."""
-        # Usuń skrypty i style
-        for script in self.soup(['script', 'style']):
-            script.decompose()
-        
-        # Pobierz tekst
-        text = self.soup.get_text()
-        
-        # Wyczyść tekst
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split('  '))
-        text = ' '.join(chunk for chunk in chunks if chunk)
-        
-        return text 
\ No newline at end of file
+        """Pobiera cały tekst ze strony (bez skryptów i stylów)."""
+        return self.data['text']
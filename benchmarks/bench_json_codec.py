@@ -0,0 +1,86 @@
+"""Porównanie app.core.json_codec z dotychczasowym json.dumps/json.loads.
+
+Uruchomienie: python -m benchmarks.bench_json_codec [--pages 2000] [--repeat 5]
+
+Dane testowe mają kształt prawdziwego audytu: sekcje linkChecker,
+images, headings, analysis_data stron z tekstem po polsku, wpisy
+aktywności i sesje z Redis.
+"""
+import argparse
+import datetime
+import json
+import random
+import time
+
+from app.core import json_codec
+
+WORDS = "analiza treści nagłówek obrazek łącze przekierowanie wydajność źródło żądanie strona".split()
+
+def _text(rng: random.Random, words: int) -> str:
+    return ' '.join(rng.choice(WORDS) for _ in range(words))
+
+def audit_payload(pages: int, seed: int = 0) -> dict:
+    rng = random.Random(seed)
+    links = [f"https://example.com/kategoria/{n}/produkt-{rng.randint(1, 10**6)}" for n in range(pages * 5)]
+    return {
+        'links': links,
+        'images': [{'src': f"https://cdn.example.com/img/{n}.jpg", 'alt': _text(rng, 4) if n % 3 else ''}
+                   for n in range(pages)],
+        'headings': {'h1': [_text(rng, 6)], 'h2': [_text(rng, 5) for _ in range(12)], 'h3': [_text(rng, 4) for _ in range(30)]},
+        'linkChecker': [
+            {'href': url, 'status_code': rng.choice([200, 200, 200, 301, 404]), 'final_url': url,
+             'redirects': rng.randint(0, 2), 'error': None, 'priority': 'ok',
+             'checked_at': datetime.datetime(2026, 10, 18).isoformat(), 'cached': False, 'occurrences': rng.randint(1, 40)}
+            for url in links
+        ],
+        'pages_data': [
+            {'url': f"https://example.com/strona/{n}", 'status_code': 200, 'title': _text(rng, 8),
+             'meta_description': _text(rng, 25), 'text_content': _text(rng, 400),
+             'word_count': 400, 'load_time': rng.random() * 3}
+            for n in range(pages)
+        ],
+    }
+
+def activity_payload(n: int) -> list:
+    return [{'timestamp': datetime.datetime(2026, 10, 18, 12, 0, i % 60).isoformat(), 'action': 'analysis_started',
+             'details': {'audit_id': i, 'elements': ['links', 'images', 'headings', 'meta'], 'ip': '10.0.0.1'},
+             'ip': '10.0.0.1', 'user_agent': 'Mozilla/5.0'} for i in range(n)]
+
+def _best(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def run(pages: int, repeat: int) -> None:
+    audit = audit_payload(pages)
+    activities = activity_payload(1000)
+    # Jeden blob, osobne sekcje (jak w audit_sections) i pojedyncze wpisy (jak w Redis)
+    cases = {
+        'audit blob': [audit],
+        'audit sections': list(audit.values()),
+        'activity log (1000 entries)': activities,
+    }
+    print(f"backend: {json_codec.BACKEND}, audit size: {len(json.dumps(audit, ensure_ascii=False).encode()) / 2**20:.1f} MB")
+    print(f"{'payload':32} {'op':7} {'stdlib ms':>10} {'codec ms':>10} {'speedup':>8}")
+    for name, items in cases.items():
+        old_text = [json.dumps(item, ensure_ascii=False) for item in items]
+        new_text = [json_codec.dumps(item) for item in items]
+        assert [json.loads(t) for t in old_text] == [json_codec.loads(t) for t in new_text]
+        timings = {
+            'encode': (_best(lambda: [json.dumps(item, ensure_ascii=False) for item in items], repeat),
+                       _best(lambda: [json_codec.dumps(item) for item in items], repeat)),
+            'decode': (_best(lambda: [json.loads(t) for t in old_text], repeat),
+                       _best(lambda: [json_codec.loads(t) for t in new_text], repeat)),
+        }
+        for op, (old, new) in timings.items():
+            print(f"{name:32} {op:7} {old * 1000:10.1f} {new * 1000:10.1f} {old / new:7.1f}x")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--pages', type=int, default=2000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.pages, args.repeat)
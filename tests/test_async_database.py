@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.core import database
+from app.core.database import Base, async_database_url
+from app.core import json_codec
+from app.models import Audit, AuditPage
+from app.services.audit_service import AuditService
+from app.services.audit_sections import get_section_async, load_audit_data_async, put_section_async
+
+def test_async_database_url_picks_async_driver():
+    assert async_database_url("sqlite:///./sql_app.db") == "sqlite+aiosqlite:///./sql_app.db"
+    assert async_database_url("postgresql://u:p@db:5432/seo") == "postgresql+asyncpg://u:p@db:5432/seo"
+
+@pytest.fixture
+def database_url(monkeypatch):
+    def use(url):
+        monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", url)
+        database.get_async_engine.cache_clear()
+    yield use
+    database.get_async_engine.cache_clear()
+
+def test_unsupported_backend_fails_only_when_async_engine_is_used(database_url):
+    database_url("mysql://u:p@db/seo")
+    with pytest.raises(ValueError):
+        database.get_async_engine()
+
+def test_task_sessions_work_across_event_loops(tmp_path, database_url):
+    database_url(f"sqlite:///{tmp_path}/test.db")
+
+    async def query():
+        async with database.db_session() as db:
+            return await db.scalar(text("SELECT 1"))
+
+    # Każde zadanie Celery ma własną pętlę - połączenia nie mogą przechodzić między nimi
+    assert [asyncio.run(query()) for _ in range(3)] == [1, 1, 1]
+    assert isinstance(database.get_async_engine(pooled=False).pool, NullPool)
+
+def test_audit_service_and_sections_on_async_session(tmp_path):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+
+        async with Session() as db:
+            previous = Audit(url="https://example.com", status="done",
+                             audit_data=json_codec.dumps({"links": ["https://example.com/a"]}))
+            db.add(previous)
+            await db.commit()
+            db.add(AuditPage(audit_id=previous.id, url="https://example.com/a", etag='"v1"',
+                             analysis_data=json_codec.dumps({"url": "https://example.com/a", "title": "A"})))
+            current = Audit(url="https://example.com")
+            db.add(current)
+            await db.commit()
+
+            service = AuditService(db)
+            index = await service.build_revalidation_index(current)
+            await service.update_audit_status(current.id, "done")
+            await put_section_async(db, current.id, "metaAnalysis", {"titleMissing": True})
+
+        async with Session() as db:
+            audit = await db.get(Audit, current.id)
+            result = (
+                audit.status,
+                await get_section_async(db, current.id, "metaAnalysis"),
+                await load_audit_data_async(db, await db.get(Audit, previous.id)),
+                len(index), index.request_headers("https://example.com/a")
+            )
+        # Dane poprzedniego audytu są już w indeksie - bez bazy
+        await engine.dispose()
+        previous_page = index.previous_page("https://example.com/a")
+        return result + (previous_page,)
+
+    status, meta, legacy, pages, headers, previous_page = asyncio.run(run())
+    assert status == "done"
+    assert meta == {"titleMissing": True}
+    assert legacy == {"links": ["https://example.com/a"]}
+    assert pages == 1 and headers == {'If-None-Match': '"v1"'}
+    assert previous_page == {"url": "https://example.com/a", "title": "A", "unchanged": True}
@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.core import http_client
+from app.scrapy_crawler import async_engine
+from app.scrapy_crawler.async_engine import AsyncCrawlEngine
+from app.services.robots_service import RobotsService
+
+def html(*links):
+    body = ''.join(f'<a href="{link}">{link}</a>' for link in links)
+    return web.Response(text=f'<html><head><title>T</title></head><body><h1>H</h1>{body}</body></html>',
+                        content_type='text/html')
+
+def crawl(routes, robots='', max_pages=30, depth_limit=2, **engine_options):
+    """Crawl serwera testowego; zwraca (strony, ścieżki zapytań do serwera)"""
+    requested = []
+
+    @web.middleware
+    async def record(request, handler):
+        requested.append(request.path)
+        return await handler(request)
+
+    async def run():
+        app = web.Application(middlewares=[record])
+        app.router.add_get('/robots.txt', lambda request: web.Response(text=robots))
+        for path, handler in routes.items():
+            app.router.add_get(path, handler)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        engine = AsyncCrawlEngine(
+            concurrency=4, download_delay=0, robots=RobotsService(fakeredis.FakeRedis(), async_redis=fakeredis.FakeAsyncRedis()), **engine_options
+        )
+        try:
+            pages = [page async for page in engine.crawl(f"{base}/", max_pages=max_pages, depth_limit=depth_limit)]
+            return [page['url'][len(base):] for page in pages]
+        finally:
+            await http_client.close_http_session()
+            await runner.cleanup()
+
+    pages = asyncio.run(asyncio.wait_for(run(), 10))
+    return pages, [path for path in requested if path != '/robots.txt']
+
+def test_crawl_stops_at_max_pages():
+    routes = {'/': lambda request: html(*(f'/p{n}' for n in range(10)))}
+    routes.update({f'/p{n}': (lambda request: html('/')) for n in range(10)})
+    pages, requested = crawl(routes, max_pages=3)
+    assert len(pages) == 3 and pages[0] == '/'
+    # Strony w trakcie pobierania liczą się do limitu - nic ponad max_pages
+    assert len(requested) == 3
+
+def test_crawl_respects_depth_limit():
+    routes = {
+        '/': lambda request: html('/d1'),
+        '/d1': lambda request: html('/d2'),
+        '/d2': lambda request: html('/d3'),
+        '/d3': lambda request: html('/'),
+    }
+    pages, requested = crawl(routes, depth_limit=2)
+    assert sorted(pages) == ['/', '/d1', '/d2']
+    assert '/d3' not in requested
+
+def test_retryable_status_is_retried_after_a_delay(monkeypatch):
+    delays = []
+    monkeypatch.setattr(async_engine, 'retry_delay', lambda attempt: delays.append(attempt) or 0)
+    hits = []
+
+    async def flaky(request):
+        hits.append(request.path)
+        if len(hits) < 3:
+            return web.Response(status=503)
+        return html()
+
+    pages, requested = crawl({'/': lambda request: html('/flaky'), '/flaky': flaky}, retry_times=3)
+    assert sorted(pages) == ['/', '/flaky']
+    assert len(hits) == 3
+    assert delays == [0, 1]
+
+def test_robots_disallowed_pages_are_not_fetched():
+    routes = {
+        '/': lambda request: html('/public', '/private/x'),
+        '/public': lambda request: html(),
+        '/private/x': lambda request: html(),
+    }
+    pages, requested = crawl(routes, robots="User-agent: *\nDisallow: /private\n")
+    assert sorted(pages) == ['/', '/public']
+    assert '/private/x' not in requested
@@ -0,0 +1,120 @@
+import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Audit, AuditSection
+from app.services.audit_sections import (
+    append_section, chunk_name, delete_sections, get_section, get_sections, load_audit_data,
+    prune_section, put_section, put_sections
+)
+
+def make_session(dialect=None):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    if dialect:
+        # Dialekt bez obsługi ON CONFLICT w audit_sections
+        engine.dialect.name = dialect
+    return sessionmaker(bind=engine)
+
+def test_sections_are_written_independently():
+    Session = make_session()
+    db = Session()
+    audit = Audit(url="https://example.com")
+    db.add(audit)
+    db.commit()
+
+    # Dwa zadania z osobnymi sesjami - żadne nie nadpisuje sekcji drugiego
+    first, second = Session(), Session()
+    put_section(first, audit.id, "imageAudit", [{"src": "a.png", "missingAlt": True}])
+    put_sections(second, audit.id, {"headingsAnalysis": {"countH1": 1}, "metaAnalysis": {"titleMissing": False}})
+    put_section(first, audit.id, "headingsAnalysis", {"countH1": 2})
+
+    assert get_section(db, audit.id, "headingsAnalysis") == {"countH1": 2}
+    assert get_section(db, audit.id, "missing", []) == []
+    assert set(get_sections(db, audit.id)) == {"imageAudit", "headingsAnalysis", "metaAnalysis"}
+    assert db.query(AuditSection).count() == 3
+
+def test_legacy_blob_is_split_into_sections_once():
+    Session = make_session()
+    db = Session()
+    audit = Audit(url="https://example.com", audit_data=json.dumps({"links": ["https://a.test"], "metaAnalysis": {"old": True}}))
+    db.add(audit)
+    db.commit()
+
+    # Sekcja zapisana po starym formacie wygrywa z blobem
+    put_section(db, audit.id, "metaAnalysis", {"old": False})
+    assert get_section(db, audit.id, "links") == ["https://a.test"]
+    assert db.query(Audit.audit_data).filter(Audit.id == audit.id).scalar() is None
+    assert load_audit_data(db, audit) == {"links": ["https://a.test"], "metaAnalysis": {"old": False}}
+
+def test_chunked_sections_are_merged_on_read():
+    Session = make_session()
+    db = Session()
+    audit = Audit(url="https://example.com")
+    db.add(audit)
+    db.commit()
+
+    for index in range(12):
+        put_sections(db, audit.id, {
+            chunk_name("linkChecker", index): [{"href": f"https://a.test/{index}"}],
+            chunk_name("redirectChains", index): {f"https://a.test/{index}": []} if index % 2 else {},
+        })
+    put_section(db, audit.id, "linkChecker_", ["other"])
+
+    links = get_section(db, audit.id, "linkChecker")
+    assert [link["href"] for link in links] == [f"https://a.test/{n}" for n in range(12)]
+    assert len(get_section(db, audit.id, "redirectChains")) == 6
+    assert load_audit_data(db, audit)["linkChecker"] == links
+
+    delete_sections(db, audit.id, ["linkChecker", "redirectChains"])
+    assert get_sections(db, audit.id) == {"linkChecker_": ["other"]}
+
+def test_other_dialects_fall_back_to_select_then_write():
+    Session = make_session(dialect="mssql")
+    db = Session()
+    audit = Audit(url="https://example.com", audit_data=json.dumps({"links": ["https://a.test"], "metaAnalysis": {"old": True}}))
+    db.add(audit)
+    db.commit()
+
+    put_sections(db, audit.id, {"metaAnalysis": {"old": False}, "imageAudit": []})
+    put_section(db, audit.id, "imageAudit", [{"src": "a.png"}])
+    assert get_sections(db, audit.id) == {
+        "links": ["https://a.test"], "metaAnalysis": {"old": False}, "imageAudit": [{"src": "a.png"}]
+    }
+    assert db.query(AuditSection).count() == 3
+
+def test_appended_entries_are_not_lost_and_old_ones_are_pruned():
+    Session = make_session()
+    db = Session()
+    audit = Audit(url="https://example.com")
+    db.add(audit)
+    db.commit()
+    put_section(db, audit.id, "performance_monitoring", [{"run": "old"}])
+    db.query(AuditSection).update({AuditSection.updated_at: datetime.utcnow() - timedelta(days=8)})
+    db.commit()
+
+    # Dwa równoległe przebiegi - każdy dopisuje swój wpis bez czytania sekcji
+    first, second = Session(), Session()
+    append_section(first, audit.id, "performance_monitoring", [{"run": 1}])
+    append_section(second, audit.id, "performance_monitoring", [{"run": 2}])
+    assert get_section(db, audit.id, "performance_monitoring") == [{"run": "old"}, {"run": 1}, {"run": 2}]
+
+    prune_section(db, audit.id, "performance_monitoring", datetime.utcnow() - timedelta(days=7))
+    assert get_section(db, audit.id, "performance_monitoring") == [{"run": 1}, {"run": 2}]
+
+def test_delete_without_commit_leaves_the_transaction_to_the_caller():
+    Session = make_session()
+    db = Session()
+    audit = Audit(url="https://example.com", audit_data=json.dumps({"links": ["https://a.test"], "metaAnalysis": {}}))
+    db.add(audit)
+    db.commit()
+
+    # Migracja bloba i usunięcie należą do jednej transakcji wywołującego
+    delete_sections(db, audit.id, ["links"], commit=False)
+    assert get_sections(db, audit.id, ["links", "metaAnalysis"]) == {"metaAnalysis": {}}
+    db.rollback()
+    assert db.query(Audit.audit_data).filter(Audit.id == audit.id).scalar() is not None
+    assert db.query(AuditSection).count() == 0
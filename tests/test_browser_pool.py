@@ -0,0 +1,71 @@
+import pytest
+
+from app.selenium_crawler import browser as browser_module
+from app.selenium_crawler.browser import BrowserPool
+
+class FakeBrowser:
+    created = 0
+
+    def __init__(self, headless: bool = True):
+        FakeBrowser.created += 1
+        self.pages_served = 0
+        self.healthy = True
+        self.memory = 100.0
+        self.closed = False
+
+    def is_healthy(self) -> bool:
+        return self.healthy
+
+    def memory_mb(self) -> float:
+        return self.memory
+
+    def reset(self) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+@pytest.fixture(autouse=True)
+def fake_browser(monkeypatch):
+    FakeBrowser.created = 0
+    monkeypatch.setattr(browser_module, 'SeleniumBrowser', FakeBrowser)
+
+def test_browser_is_reused():
+    pool = BrowserPool(size=1)
+    with pool.lease() as first:
+        pass
+    with pool.lease() as second:
+        pass
+    assert first is second
+    assert FakeBrowser.created == 1
+
+def test_recycle_after_max_pages():
+    pool = BrowserPool(size=1, max_pages=2)
+    for _ in range(2):
+        with pool.lease() as browser:
+            pass
+    assert browser.closed
+    with pool.lease() as fresh:
+        assert fresh is not browser
+
+def test_recycle_on_memory_and_health():
+    pool = BrowserPool(size=1, max_memory_mb=500)
+    with pool.lease() as browser:
+        browser.memory = 800
+    assert browser.closed
+
+    with pool.lease() as browser:
+        pass
+    browser.healthy = False
+    with pool.lease() as replacement:
+        assert replacement is not browser
+    assert browser.closed
+
+def test_concurrency_cap():
+    pool = BrowserPool(size=1, lease_timeout=0.05)
+    with pool.lease():
+        with pytest.raises(TimeoutError):
+            with pool.lease():
+                pass
+    pool.warm()
+    assert FakeBrowser.created == 1
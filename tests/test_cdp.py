@@ -0,0 +1,47 @@
+import asyncio
+
+from app.selenium_crawler.cdp import ResourceBlocking, _PageState
+
+class FakeConnection:
+    def __init__(self):
+        self.sent = []
+
+    async def send(self, method, params=None, session_id=None):
+        self.sent.append((method, params))
+        return {}
+
+def test_blocking_by_type_and_domain():
+    blocking = ResourceBlocking(['Image', 'font'], ['google-analytics.com'])
+    assert blocking.blocks('https://example.com/a.png', 'Image')
+    assert blocking.blocks('https://example.com/a.woff2', 'Font')
+    assert blocking.blocks('https://www.google-analytics.com/g/collect', 'XHR')
+    assert not blocking.blocks('https://example.com/app.js', 'Script')
+    assert not blocking.blocks('https://notgoogle-analytics.com/x.js', 'Script')
+
+def test_blocking_from_audit_config():
+    blocking = ResourceBlocking.from_config({'block_resource_types': [], 'block_domains': []})
+    assert not blocking.enabled
+    assert ResourceBlocking.from_config().enabled
+
+def test_page_state_blocks_requests_and_waits_for_idle():
+    async def run():
+        conn = FakeConnection()
+        page = _PageState(conn, 'session', ResourceBlocking(['Image'], []))
+        page.on_event('Fetch.requestPaused', {'requestId': '1', 'resourceType': 'Image',
+                                              'request': {'url': 'https://example.com/a.png'}})
+        page.on_event('Fetch.requestPaused', {'requestId': '2', 'resourceType': 'Document',
+                                              'request': {'url': 'https://example.com/'}})
+        page.on_event('Network.requestWillBeSent', {'requestId': '2'})
+        page.on_event('Page.loadEventFired', {})
+        busy = await page.wait_for_network_idle(0.05, 0, timeout=0.2)
+
+        page.on_event('Network.loadingFinished', {'requestId': '2'})
+        idle = await page.wait_for_network_idle(0.05, 0, timeout=1)
+        return conn.sent, page.blocked, busy, idle
+
+    sent, blocked, busy, idle = asyncio.run(run())
+    assert ('Fetch.failRequest', {'requestId': '1', 'errorReason': 'BlockedByClient'}) in sent
+    assert ('Fetch.continueRequest', {'requestId': '2'}) in sent
+    assert blocked == 1
+    assert not busy
+    assert idle
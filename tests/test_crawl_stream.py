@@ -0,0 +1,87 @@
+import asyncio
+import queue
+import threading
+
+from app.scrapy_crawler.runner import _CrawlStream
+
+class FakeEngine:
+    def __init__(self):
+        self.paused = False
+        self.pauses = 0
+        self.slot = None
+
+    def pause(self):
+        self.paused = True
+        self.pauses += 1
+
+    def unpause(self):
+        self.paused = False
+
+class FakeCrawler:
+    def __init__(self, engine):
+        self.engine = engine
+        self.crawling = True
+
+def test_consumer_catching_up_before_pause_still_resumes():
+    calls = []
+    stream = _CrawlStream(asyncio.new_event_loop(), max_buffered=4, call_in_reactor=calls.append)
+    engine = FakeEngine()
+    stream.crawler = FakeCrawler(engine)
+    stream.loop.call_soon_threadsafe = lambda *args: None
+
+    for n in range(3):
+        stream.on_item_scraped({'n': n}, None, None)
+    # Konsument pobrał już trzy strony, zanim reaktor przetworzył czwartą
+    for _ in range(3):
+        stream.mark_consumed()
+    stream.on_item_scraped({'n': 3}, None, None)
+    assert engine.paused
+
+    for call in calls:
+        call()
+    assert not engine.paused
+    assert stream.pending == 1
+    stream.loop.close()
+
+def test_stream_backpressure_delivers_every_page():
+    total, max_buffered = 60, 4
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        calls: queue.Queue = queue.Queue()
+        stream = _CrawlStream(loop, max_buffered=max_buffered, call_in_reactor=calls.put)
+        engine = FakeEngine()
+        stream.crawler = FakeCrawler(engine)
+        peak = []
+
+        def reactor_thread():
+            produced = 0
+            while produced < total:
+                while not calls.empty():
+                    calls.get_nowait()()
+                if engine.paused:
+                    # Wstrzymany silnik czeka na sygnał od konsumenta
+                    calls.get(timeout=5)()
+                    continue
+                stream.on_item_scraped({'n': produced}, None, None)
+                peak.append(stream.pending)
+                produced += 1
+            stream.on_finished(None)
+
+        thread = threading.Thread(target=reactor_thread, daemon=True)
+        thread.start()
+        pages = []
+        while True:
+            item = await asyncio.wait_for(stream.queue.get(), timeout=5)
+            if item is stream._DONE:
+                break
+            pages.append(item['n'])
+            stream.mark_consumed()
+            await asyncio.sleep(0.001)
+        thread.join(timeout=5)
+        return pages, max(peak), engine.pauses
+
+    pages, peak, pauses = asyncio.run(run())
+    assert pages == list(range(total))
+    assert peak <= max_buffered
+    assert pauses > 0
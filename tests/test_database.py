@@ -1,26 +1,38 @@
 import pytest
 import pytest_asyncio
-from typing import Dict, Any, List, Generator
+from typing import AsyncIterator, List
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import inspect
-from app.core.database import get_db, Base, engine
+from sqlalchemy import func, inspect, select
+from app.core import database
+from app.core.database import get_db, Base, db_session
 from app.models.user import User
-from unittest.mock import patch, MagicMock
-from sqlalchemy.orm import Session
+from unittest.mock import patch
+from sqlalchemy.ext.asyncio import AsyncSession
+
+@pytest_asyncio.fixture
+async def test_db(tmp_path, monkeypatch) -> AsyncIterator[AsyncSession]:
+    """Sesja zadaniowa (`db_session`) na osobnej bazie SQLite z utworzonym schematem"""
+    monkeypatch.setattr(database, "SQLALCHEMY_DATABASE_URL", f"sqlite:///{tmp_path}/test.db")
+    database.get_async_engine.cache_clear()
+    async with database.get_async_engine(pooled=False).begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with db_session() as db:
+        yield db
+    database.get_async_engine.cache_clear()
 
 @pytest.mark.asyncio
 async def test_database_connection_error() -> None:
     """Test obsługi błędu połączenia z bazą danych"""
-    with patch('app.core.database.engine') as mock_engine:
-        mock_engine.connect.side_effect = SQLAlchemyError("Connection error")
-        
+    with patch('app.core.database.AsyncSessionLocal') as mock_sessionmaker:
+        mock_sessionmaker.side_effect = SQLAlchemyError("Connection error")
+
         with pytest.raises(SQLAlchemyError) as exc_info:
-            db = next(get_db())
-        
+            db = await get_db().__anext__()
+
         assert "Connection error" in str(exc_info.value)
 
 @pytest.mark.asyncio
-async def test_database_session_cleanup(test_db: Session) -> None:
+async def test_database_session_cleanup(test_db: AsyncSession) -> None:
     """Test czyszczenia sesji bazy danych"""
     user = User(
         email="test@example.com",
@@ -28,20 +40,19 @@ async def test_database_session_cleanup(test_db: Session) -> None:
         hashed_password="hashed_password"
     )
     test_db.add(user)
-    test_db.commit()
+    await test_db.commit()
 
-    added_user = test_db.query(User).filter_by(email="test@example.com").first()
+    added_user = await test_db.scalar(select(User).filter_by(email="test@example.com"))
     assert added_user is not None
 
-    test_db.close()
+    await test_db.close()
 
-    with pytest.raises(Exception) as exc_info:
-        test_db.query(User).all()
-    
-    assert "closed" in str(exc_info.value).lower()
+    # Po zamknięciu sesja nie trzyma obiektów ani otwartej transakcji
+    assert added_user not in test_db
+    assert not test_db.in_transaction()
 
 @pytest.mark.asyncio
-async def test_database_transaction_rollback(test_db: Session) -> None:
+async def test_database_transaction_rollback(test_db: AsyncSession) -> None:
     """Test wycofywania transakcji"""
     try:
         user1 = User(
@@ -50,7 +61,7 @@ async def test_database_transaction_rollback(test_db: Session) -> None:
             hashed_password="hashed_password"
         )
         test_db.add(user1)
-        test_db.flush()
+        await test_db.flush()
 
         user2 = User(
             email="user1@example.com",
@@ -58,40 +69,35 @@ async def test_database_transaction_rollback(test_db: Session) -> None:
             hashed_password="hashed_password"
         )
         test_db.add(user2)
-        test_db.commit()
+        await test_db.commit()
     except SQLAlchemyError:
-        test_db.rollback()
+        await test_db.rollback()
 
-    users = test_db.query(User).filter_by(email="user1@example.com").all()
-    assert len(users) == 0
+    users = await test_db.scalar(select(func.count()).select_from(User).filter_by(email="user1@example.com"))
+    assert users == 0
 
 @pytest.mark.asyncio
 async def test_database_connection_pool() -> None:
     """Test puli połączeń do bazy danych"""
-    connections: List[Session] = []
-    for _ in range(5):
-        db = next(get_db())
-        connections.append(db)
+    providers = [get_db() for _ in range(5)]
+    connections: List[AsyncSession] = [await provider.__anext__() for provider in providers]
 
-    for db in connections:
-        assert not db.closed
+    assert all(isinstance(db, AsyncSession) for db in connections)
+    assert len({id(db) for db in connections}) == 5
 
-    for db in connections:
-        db.close()
-
-    for db in connections:
-        assert db.closed
+    for provider in providers:
+        await provider.aclose()
 
 @pytest.mark.asyncio
-async def test_database_migration(test_db: Session) -> None:
+async def test_database_migration(test_db: AsyncSession) -> None:
     """Test migracji schematu bazy danych"""
-    inspector = inspect(engine)
-    tables = inspector.get_table_names()
-    
+    conn = await test_db.connection()
+    tables = await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+
     required_tables = ["users", "audits", "audit_pages"]
     for table in required_tables:
         assert table in tables
 
-    columns = {col['name'] for col in inspector.get_columns("users")}
+    columns = await conn.run_sync(lambda sync_conn: {col['name'] for col in inspect(sync_conn).get_columns("users")})
     required_columns = {"id", "email", "full_name", "hashed_password", "is_active"}
-    assert required_columns.issubset(columns) 
\ No newline at end of file
+    assert required_columns.issubset(columns)
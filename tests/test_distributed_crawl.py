@@ -0,0 +1,177 @@
+import asyncio
+
+import aiohttp
+import pytest
+from aiohttp import web
+
+from app.scrapy_crawler.distributed import DistributedCrawlWorker, RedisFrontier, SharedThrottleEngine, _SharedHostSlot
+from app.scrapy_crawler.throttle import AIMDThrottle
+
+fakeredis = pytest.importorskip('fakeredis')
+
+def test_push_many_dedupes_and_spreads_urls_over_partitions():
+    async def run():
+        frontier = RedisFrontier(fakeredis.FakeAsyncRedis(), audit_id=1, partitions=4)
+        await frontier.setup('https://example.com/', max_pages=100, depth_limit=2)
+        urls = [f'https://example.com/p/{n}' for n in range(40)]
+        added = await frontier.push_many(urls + ['https://example.com/p/1?utm_source=x'], depth=1)
+        again = await frontier.push_many(urls, depth=1)
+        too_deep = await frontier.push_many(['https://example.com/deep'], depth=3)
+        sizes = [await frontier.redis.llen(frontier._queue_key(p)) for p in range(4)]
+        return added, again, too_deep, sizes, await frontier.pending()
+
+    added, again, too_deep, sizes, pending = asyncio.run(run())
+    assert (added, again, too_deep) == (40, 0, 0)
+    # Jeden host - mimo to praca trafia do wszystkich partycji
+    assert sum(sizes) == 41 and all(sizes)
+    assert pending == 41
+
+def test_reserve_steals_work_and_stops_at_max_pages():
+    async def run():
+        frontier = RedisFrontier(fakeredis.FakeAsyncRedis(), audit_id=1, partitions=2)
+        await frontier.setup('https://example.com/', max_pages=2, depth_limit=0)
+        first = await frontier.reserve(1)
+        await frontier.push('https://example.com/a', 1)
+        second = await frontier.reserve(0)
+        await frontier.push('https://example.com/b', 1)
+        third = await frontier.reserve(0)
+        # Strony nie pobrano - miejsce w limicie wraca do puli
+        await frontier.done(second[1], fetched=False)
+        fourth = await frontier.reserve(1)
+        return first, second, third, fourth
+
+    first, second, third, fourth = asyncio.run(run())
+    assert first == ('ok', ('https://example.com/', 0))
+    assert second == ('ok', ('https://example.com/a', 1))
+    assert third == ('exhausted', None)
+    assert fourth == ('ok', ('https://example.com/b', 1))
+
+def test_host_limits_are_shared_between_workers():
+    async def run():
+        redis = fakeredis.FakeAsyncRedis()
+        one, two = RedisFrontier(redis, audit_id=1), RedisFrontier(redis, audit_id=1)
+        a = await one.acquire_host('example.com', concurrency=1, delay=0.5)
+        blocked = await two.acquire_host('example.com', concurrency=4, delay=0.0)
+        # Worker po odpowiedzi 503 z Retry-After zwalnia host dla wszystkich
+        await one.release_host('example.com', concurrency=2, delay=1.0, blocked_for=30)
+        b = await two.acquire_host('example.com', concurrency=4, delay=0.0)
+        await one.cleanup()
+        return a, blocked, b, await redis.keys('*')
+
+    a, blocked, b, keys = asyncio.run(run())
+    assert a[:3] == (True, 1.0, 0.5) and a[3] < 0.1
+    assert blocked[:3] == (False, 1.0, 0.5)
+    assert b[:3] == (True, 2.0, 1.0) and 29 < b[3] <= 30
+    assert keys == []
+
+def test_host_slot_wait_is_bounded():
+    async def run():
+        redis = fakeredis.FakeAsyncRedis()
+        holder, waiter = RedisFrontier(redis, audit_id=1), RedisFrontier(redis, audit_id=1)
+        await holder.acquire_host('example.com', concurrency=1, delay=0.0)
+        slot = _SharedHostSlot(AIMDThrottle(start_concurrency=1, max_concurrency=1), 'example.com', waiter, max_wait=0.2)
+        with pytest.raises(asyncio.TimeoutError):
+            await slot.__aenter__()
+
+    asyncio.run(run())
+
+def test_workers_share_frontier_budget_and_host_concurrency():
+    pages, max_pages = 40, 25
+    in_flight = {'now': 0, 'peak': 0}
+    hits = []
+
+    async def page(request):
+        n = int(request.match_info['n'])
+        hits.append(n)
+        in_flight['now'] += 1
+        in_flight['peak'] = max(in_flight['peak'], in_flight['now'])
+        await asyncio.sleep(0.02)
+        in_flight['now'] -= 1
+        links = ''.join(f'<a href="/page/{c}">{c}</a>' for c in (2 * n + 1, 2 * n + 2) if c < pages)
+        return web.Response(text=f'<html><head><title>{n}</title></head><body>{links}</body></html>',
+                            content_type='text/html')
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/page/{n}', page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        redis = fakeredis.FakeAsyncRedis()
+        try:
+            await RedisFrontier(redis, 7, partitions=2).setup(f'http://127.0.0.1:{port}/page/0', max_pages, 0)
+
+            async def crawl(partition):
+                # Osobna pula połączeń - jak w osobnym procesie workera
+                async with aiohttp.ClientSession() as session:
+                    frontier = RedisFrontier(redis, 7, partitions=2)
+                    engine = SharedThrottleEngine(
+                        frontier, concurrency=4, per_host_concurrency=4, download_delay=0, obey_robots=False,
+                        session=session, throttle=AIMDThrottle(start_concurrency=2, max_concurrency=2, start_delay=0)
+                    )
+                    worker = DistributedCrawlWorker(frontier, partition, engine=engine, concurrency=4, poll_interval=0.01)
+                    return [data['url'] async for data in worker.crawl()]
+
+            return await asyncio.wait_for(asyncio.gather(crawl(0), crawl(1)), timeout=20)
+        finally:
+            await runner.cleanup()
+
+    first, second = asyncio.run(run())
+    urls = first + second
+    assert len(urls) == max_pages and len(set(urls)) == max_pages
+    assert sorted(hits) == sorted(set(hits))
+    # Dwa workery po 4 zadania, ale wspólny limit hosta to 2 requesty naraz
+    assert in_flight['peak'] <= 2
+
+def test_work_of_a_killed_worker_is_taken_over():
+    pages = 6
+    hits = []
+
+    async def page(request):
+        n = int(request.match_info['n'])
+        hits.append(n)
+        # Dłużej niż dzierżawa - żywy worker musi ją przedłużać
+        await asyncio.sleep(0.3 if n == 1 else 0)
+        links = ''.join(f'<a href="/page/{c}">{c}</a>' for c in (n + 1,) if c < pages)
+        return web.Response(text=f'<html><head><title>{n}</title></head><body>{links}</body></html>',
+                            content_type='text/html')
+
+    async def collect(worker):
+        return [data['url'] async for data in worker.crawl()]
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/page/{n}', page)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        host = f'127.0.0.1:{site._server.sockets[0].getsockname()[1]}'
+        redis = fakeredis.FakeAsyncRedis()
+        options = {'lease_timeout': 0.2, 'slot_timeout': 0.2}
+        try:
+            await RedisFrontier(redis, 7, **options).setup(f'http://{host}/page/0', pages, 0)
+            # Worker zabity między reserve a done: URL i miejsce hosta zostają zajęte
+            dead = RedisFrontier(redis, 7, **options)
+            assert (await dead.reserve(0))[0] == 'ok'
+            assert (await dead.acquire_host('127.0.0.1', concurrency=1, delay=0.0))[0]
+
+            async with aiohttp.ClientSession() as session:
+                frontier = RedisFrontier(redis, 7, **options)
+                engine = SharedThrottleEngine(
+                    frontier, concurrency=2, per_host_concurrency=1, download_delay=0, obey_robots=False,
+                    session=session, throttle=AIMDThrottle(start_concurrency=1, max_concurrency=1, start_delay=0)
+                )
+                worker = DistributedCrawlWorker(frontier, 1, engine=engine, concurrency=2, poll_interval=0.01)
+                urls = await asyncio.wait_for(collect(worker), timeout=10)
+            return urls, await frontier.pending()
+        finally:
+            await runner.cleanup()
+
+    urls, pending = asyncio.run(run())
+    assert sorted(int(url.rsplit('/', 1)[1]) for url in urls) == list(range(pages))
+    # Przedłużana dzierżawa wolnej strony nie wygasła - każda pobrana raz
+    assert sorted(hits) == list(range(pages))
+    assert pending == 0
@@ -0,0 +1,98 @@
+import pytest
+from app.scrapy_crawler.frontier import (
+    canonicalize_url, BloomFilter, VisitedSet, URLFrontier, PriorityFrontier, url_priority
+)
+
+@pytest.mark.parametrize("url,expected", [
+    ("HTTP://Example.COM/", "http://example.com/"),
+    ("https://example.com:443/a/", "https://example.com/a"),
+    ("http://example.com:8080/a", "http://example.com:8080/a"),
+    ("https://example.com/a#section", "https://example.com/a"),
+    ("https://example.com/a?utm_source=x&b=2&a=1", "https://example.com/a?a=1&b=2"),
+    ("https://example.com/a?gclid=123", "https://example.com/a"),
+    ("https://example.com/a;jsessionid=ABC?x=1", "https://example.com/a?x=1"),
+    ("https://example.com", "https://example.com/"),
+    ("https://example.com/Produkt/Buty", "https://example.com/Produkt/Buty"),
+])
+def test_canonicalize_url(url: str, expected: str) -> None:
+    assert canonicalize_url(url) == expected
+
+def test_canonicalize_url_lowercases_path_on_request() -> None:
+    assert canonicalize_url("https://Example.com/Buty", lowercase_path=True) == "https://example.com/buty"
+
+def test_frontier_keeps_case_sensitive_paths_apart() -> None:
+    frontier = URLFrontier()
+    assert frontier.add("https://example.com/Product/A")
+    assert frontier.add("https://example.com/product/a")
+    # Opcja audytu dla serwisów ignorujących wielkość liter
+    folded = PriorityFrontier(lowercase_path=True)
+    assert folded.push("https://example.com/Product/A", 0)
+    assert not folded.push("https://example.com/product/a", 0)
+
+def test_frontier_filters_variants() -> None:
+    frontier = URLFrontier()
+    assert frontier.add("https://example.com/page")
+    assert not frontier.add("https://EXAMPLE.com/page/")
+    assert not frontier.add("https://example.com/page?utm_campaign=abc")
+    assert not frontier.add("https://example.com/page#top")
+    assert frontier.add("https://example.com/page?id=2")
+    assert len(frontier) == 2
+    assert frontier.duplicates == 3
+
+def test_bloom_filter_no_false_negatives() -> None:
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    keys = [f"https://example.com/{i}".encode() for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+
+def test_bloom_filter_error_rate() -> None:
+    bloom = BloomFilter(capacity=5000, error_rate=0.01)
+    for i in range(5000):
+        bloom.add(f"https://example.com/{i}".encode())
+    false_positives = sum(f"https://other.com/{i}".encode() in bloom for i in range(5000))
+    assert false_positives < 5000 * 0.03
+
+def test_visited_set_switches_to_bloom() -> None:
+    visited = VisitedSet(exact_limit=100)
+    for i in range(100):
+        assert visited.add(f"url-{i}")
+    assert visited.is_exact
+
+    for i in range(100, 1000):
+        assert visited.add(f"url-{i}")
+    assert not visited.is_exact
+    assert len(visited) == 1000
+    assert not visited.add("url-5")
+    assert "url-999" in visited
+
+def test_url_priority_prefers_key_pages():
+    landing = url_priority('https://example.com/oferta', 1)
+    assert landing > url_priority('https://example.com/oferta?sort=price&color=red', 1)
+    assert landing > url_priority('https://example.com/blog/page/7', 1)
+    assert landing > url_priority('https://example.com/cart', 1)
+    assert landing > url_priority('https://example.com/login.php', 1)
+    assert landing > url_priority('https://example.com/oferta', 2)
+    assert url_priority('https://example.com/a/b/c/d', 1, inlinks=20) > url_priority('https://example.com/a/b/c/d', 1)
+    assert url_priority('https://example.com/x', 0, sitemap_priority=1.0) > url_priority('https://example.com/x', 0, sitemap_priority=0.1)
+
+def test_priority_frontier_order():
+    frontier = PriorityFrontier()
+    assert frontier.push('https://example.com/list?page=2', 1)
+    assert frontier.push('https://example.com/deep/a/b/c', 1)
+    assert frontier.push('https://example.com/about', 1)
+    assert not frontier.push('https://example.com/about/', 1)
+    assert frontier.pop() == ('https://example.com/about', 1)
+    # Adres już pobrany nie wraca do kolejki
+    assert not frontier.push('https://example.com/about', 1)
+    assert len(frontier) == 2
+
+def test_priority_frontier_inlinks_raise_priority():
+    frontier = PriorityFrontier()
+    frontier.push('https://example.com/a/b/one', 1)
+    frontier.push('https://example.com/a/b/two', 1)
+    for _ in range(5):
+        frontier.push('https://example.com/a/b/two', 2)
+    assert frontier.pop() == ('https://example.com/a/b/two', 1)
+    assert frontier.pop() == ('https://example.com/a/b/one', 1)
+    assert frontier.pop() is None
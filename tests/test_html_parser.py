@@ -1,6 +1,6 @@
 import pytest
 from typing import Dict, List
-from app.utils.html_parser import HTMLParser
+from app.utils.html_parser import BACKENDS, HTMLParser, extract_page, iter_elements
 
 @pytest.fixture
 def sample_html() -> str:
@@ -75,4 +75,29 @@ def test_malformed_html() -> None:
     parser = HTMLParser(malformed_html)
     assert parser.get_images() == [{'src': '', 'alt': '', 'title': ''}]
     assert parser.get_links() == [{'href': '', 'text': 'Link', 'title': ''}]
-    assert 'Test' in parser.get_text_content() 
\ No newline at end of file
+    assert 'Test' in parser.get_text_content() 
+
+def test_backends_give_same_results(sample_html: str) -> None:
+    html = sample_html.replace(
+        '</body>', '<h3>Nested <b>bold</b> header<!-- note --></h3><a href="/x"><span>Inner</span> text</a></body>'
+    )
+    results = [extract_page(html, backend) for backend in BACKENDS]
+    assert all(result == results[0] for result in results)
+    assert results[0]['headings']['h3'] == ['Nestedboldheader']
+
+def test_backends_keep_text_after_comments() -> None:
+    html = '<p>Hello <!-- x --> world</p><a href="/go">Go<!--c--> here</a><?pi x?><p>tail</p>'
+    results = [extract_page(html, backend) for backend in BACKENDS]
+    assert all(result == results[0] for result in results)
+    assert results[0]['links'][0]['text'] == 'Gohere'
+    assert 'Hello world' in results[0]['text']
+
+def test_iter_elements_collects_text_on_both_backends() -> None:
+    html = '<title>Tytuł strony</title><h1>A <!-- x --><a href="/k">Kon<b>takt</b></a></h1><img src="/a.png">'
+    for backend in BACKENDS:
+        elements = list(iter_elements(html, {'title', 'h1', 'a', 'img'}, backend))
+        assert [(e.name, e.text) for e in elements] == [
+            ('title', 'Tytuł strony'), ('a', 'Kontakt'), ('h1', 'A Kontakt'), ('img', '')
+        ], backend
+        assert elements[1].get('href') == '/k'
+        assert elements[3].get('alt', '') == ''
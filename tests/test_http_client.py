@@ -0,0 +1,107 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from app.core import http_client
+
+def test_fetch_retries_and_reuses_session(monkeypatch):
+    monkeypatch.setattr(http_client, 'retry_delay', lambda attempt: 0)
+    calls = []
+
+    async def flaky(request):
+        calls.append(request.headers.get('Accept-Encoding'))
+        if len(calls) < 2:
+            return web.Response(status=503)
+        return web.Response(text='<p>zażółć</p>', content_type='text/html', charset='utf-8')
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/', flaky)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            response = await http_client.fetch(f'http://127.0.0.1:{port}/')
+            same = http_client.get_http_session() is http_client.get_http_session()
+            await http_client.close_http_session()
+            return response, same
+        finally:
+            await runner.cleanup()
+
+    response, same = asyncio.run(run())
+    assert response.status == 200
+    assert response.text == '<p>zażółć</p>'
+    assert len(calls) == 2
+    assert 'gzip' in calls[0]
+    assert same
+
+def test_sync_session_is_per_thread():
+    session = http_client.get_sync_session()
+    assert session is http_client.get_sync_session()
+    assert session.get_adapter('https://example.com').max_retries.total == 2
+
+def test_check_html_headers():
+    http_client.check_html_headers(200, {'Content-Type': 'text/html; charset=utf-8', 'Content-Length': '100'}, 1000)
+    for status, headers in [
+        (404, {'Content-Type': 'text/html'}),
+        (200, {'Content-Type': 'application/pdf'}),
+        (200, {'Content-Type': 'text/html', 'Content-Length': '5000'}),
+    ]:
+        with pytest.raises(http_client.ResponseRejected):
+            http_client.check_html_headers(status, headers, 1000)
+
+def test_decode_html_uses_meta_charset():
+    body = '<meta charset="iso-8859-2"><p>zażółć</p>'.encode('iso-8859-2')
+    assert http_client.decode_html(body) == ('<meta charset="iso-8859-2"><p>zażółć</p>', 'iso-8859-2')
+    assert http_client.decode_html(b'<p>x</p>', 'bogus')[1] == 'utf-8'
+
+def test_fetch_html_stops_on_oversized_body():
+    async def big(request):
+        response = web.StreamResponse(headers={'Content-Type': 'text/html'})
+        await response.prepare(request)
+        for _ in range(100):
+            await response.write(b'x' * 1024)
+        return response
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/', big)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        try:
+            with pytest.raises(http_client.ResponseRejected):
+                await http_client.fetch_html(f'http://127.0.0.1:{port}/', max_bytes=10_000)
+            await http_client.close_http_session()
+        finally:
+            await runner.cleanup()
+
+    asyncio.run(run())
+
+async def _open_session():
+    return http_client.get_http_session()
+
+def test_task_loop_closes_its_http_session():
+    sessions = [http_client.run_task_loop(_open_session()) for _ in range(3)]
+    assert all(session.closed for session in sessions)
+    assert http_client._sessions == {}
+
+def test_sessions_of_closed_loops_are_forgotten():
+    # Pętla zamknięta bez close_http_session - jej sesji nie da się już zamknąć
+    loop = asyncio.new_event_loop()
+    leaked = loop.run_until_complete(_open_session())
+    loop.close()
+    assert loop in http_client._sessions
+
+    async def fresh():
+        session = http_client.get_http_session()
+        await http_client.close_http_session()
+        return session
+
+    assert asyncio.run(fresh()) is not leaked
+    assert http_client._sessions == {}
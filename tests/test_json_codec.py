@@ -0,0 +1,41 @@
+import datetime
+import importlib
+import json
+import sys
+
+import pytest
+
+from app.core import json_codec
+
+PAYLOAD = {
+    'title': 'Żółta łódź',
+    'links': [{'href': 'https://example.com/ą', 'status_code': 200, 'error': None}],
+    1: 'klucz liczbowy',
+    'checked_at': datetime.datetime(2026, 10, 18, 12, 30),
+}
+
+@pytest.fixture(params=['orjson', 'json'])
+def codec(request, monkeypatch):
+    if request.param == 'json':
+        monkeypatch.setitem(sys.modules, 'orjson', None)
+    elif importlib.util.find_spec('orjson') is None:
+        pytest.skip('orjson not installed')
+    module = importlib.reload(json_codec)
+    yield module
+    monkeypatch.undo()
+    importlib.reload(json_codec)
+
+def test_backends_produce_the_same_json(codec):
+    expected = {
+        'title': 'Żółta łódź',
+        'links': [{'href': 'https://example.com/ą', 'status_code': 200, 'error': None}],
+        '1': 'klucz liczbowy',
+        'checked_at': '2026-10-18T12:30:00',
+    }
+    text = codec.dumps(PAYLOAD)
+    assert 'Żółta' in text
+    assert json.loads(text) == expected
+    assert codec.loads(codec.dumpb(PAYLOAD)) == expected
+    assert codec.loads(memoryview(codec.dumpb(PAYLOAD))) == expected
+    with pytest.raises(codec.JSONDecodeError):
+        codec.loads('{"broken"')
@@ -0,0 +1,149 @@
+import asyncio
+import json
+
+from aiohttp import web
+
+from app.core import http_client
+from app.services.link_checker import LinkCheckResult, LinkChecker, link_priority, normalize_link
+from app.services.link_status_cache import LinkStatusCache
+from app.services.redirect_resolver import RedirectResolver
+
+def test_link_priority_and_normalization():
+    assert link_priority(200, 0, None) == 'ok'
+    assert link_priority(200, 2, None) == 'warning'
+    assert link_priority(404, 0, None) == 'error'
+    assert link_priority(None, 0, 'timeout') == 'error'
+    assert normalize_link(' https://example.com/a#top ') == 'https://example.com/a'
+    assert normalize_link('mailto:a@example.com') is None
+
+def test_check_all_limits_hosts_and_falls_back_to_get():
+    state = {'active': 0, 'peak': 0, 'methods': []}
+
+    async def page(request):
+        state['methods'].append(request.method)
+        state['active'] += 1
+        state['peak'] = max(state['peak'], state['active'])
+        await asyncio.sleep(0.02)
+        state['active'] -= 1
+        return web.Response(text='ok')
+
+    async def no_head(request):
+        if request.method == 'HEAD':
+            return web.Response(status=405)
+        return web.Response(text='ok')
+
+    async def loop(request):
+        raise web.HTTPFound('/loop')
+
+    async def run():
+        app = web.Application()
+        app.router.add_route('*', '/page/{n}', page)
+        app.router.add_route('*', '/no-head', no_head)
+        app.router.add_route('*', '/loop', loop)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        urls = [f'{base}/page/{n % 20}' for n in range(60)] + [f'{base}/no-head', f'{base}/loop']
+        try:
+            results = [r async for r in LinkChecker(concurrency=10, per_host=3, max_redirects=3).check_all(urls)]
+            await http_client.close_http_session()
+        finally:
+            await runner.cleanup()
+        return {r.href.replace(base, ''): r for r in results}
+
+    results = asyncio.run(run())
+    assert len(results) == 22
+    assert state['peak'] <= 3
+    assert state['methods'].count('HEAD') == 20
+    assert results['/no-head'].status_code == 200
+    assert results['/loop'].error == 'Redirect loop'
+    assert results['/loop'].chain['loop']
+
+class FakeRedis:
+    def __init__(self):
+        self.data = {}
+        self.ttl = {}
+
+    async def mget(self, keys):
+        return [self.data.get(key) for key in keys]
+
+    def pipeline(self, transaction=True):
+        return self
+
+    def setex(self, key, ttl, value):
+        self.data[key] = value
+        self.ttl[key] = ttl
+
+    async def execute(self):
+        pass
+
+def test_cache_serves_external_links_and_skips_own_host():
+    redis = FakeRedis()
+    cache = LinkStatusCache(redis, ok_ttl=100, broken_ttl=10)
+    chain = {'chain': [['http://example.com/a', 301], ['https://example.com/a', 200]],
+             'final_url': 'https://example.com/a', 'final_status': 200, 'loop': False, 'error': None}
+    asyncio.run(cache.set_many([
+        {'href': 'https://Example.com:443/a#x', 'status_code': 200, 'final_url': 'https://example.com/a',
+         'redirects': 1, 'error': None, 'priority': 'ok', 'chain': chain},
+        {'href': 'https://own.test/', 'status_code': 404, 'final_url': None,
+         'redirects': 0, 'error': None, 'priority': 'error'},
+    ]))
+    assert redis.ttl == {'linkstatus:https://example.com/a': 100, 'linkstatus:https://own.test/': 10}
+
+    checked = []
+
+    class Checker(LinkChecker):
+        async def check(self, url):
+            checked.append(url)
+            return LinkCheckResult(url, 500, url, 0, None, 'error')
+
+    async def run():
+        checker = Checker(cache=cache, own_hosts={'own.test'})
+        return [r async for r in checker.check_all(['https://example.com/a', 'https://own.test/', 'https://new.test/'])]
+
+    results = {r.href: r for r in asyncio.run(run())}
+    assert results['https://example.com/a'].cached
+    # Trafienie z cache zachowuje łańcuch przekierowań dla redirectChains
+    assert results['https://example.com/a'].chain == chain
+    assert sorted(checked) == ['https://new.test/', 'https://own.test/']
+    # Wynik dla własnej domeny nie nadpisuje cache
+    assert 'linkstatus:https://new.test/' in redis.data
+    assert json.loads(redis.data['linkstatus:https://own.test/'])['status_code'] == 404
+
+def test_redirect_resolver_memoizes_shared_hops():
+    hits = []
+
+    async def hop(request):
+        hits.append(request.path)
+        targets = {'/a': '/b', '/b': '/final'}
+        if request.path.startswith('/start'):
+            raise web.HTTPMovedPermanently('/a')
+        if request.path in targets:
+            raise web.HTTPFound(targets[request.path])
+        return web.Response(text='ok')
+
+    async def run():
+        app = web.Application()
+        app.router.add_route('*', '/{path}', hop)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        resolver = RedirectResolver(max_redirects=5)
+        # Krok /seen -> /a znany z crawla
+        resolver.seed([[f'{base}/seen', 301]], f'{base}/a')
+        try:
+            chains = await asyncio.gather(*[resolver.resolve(f'{base}/start{n}') for n in range(10)],
+                                          resolver.resolve(f'{base}/seen'))
+            await http_client.close_http_session()
+        finally:
+            await runner.cleanup()
+        return base, chains
+
+    base, chains = asyncio.run(run())
+    assert chains[0].chain == [(f'{base}/start0', 301), (f'{base}/a', 302), (f'{base}/b', 302), (f'{base}/final', 200)]
+    assert chains[-1].final_url == f'{base}/final' and chains[-1].redirects == 3
+    assert sorted(hits) == sorted([f'/start{n}' for n in range(10)] + ['/a', '/b', '/final'])
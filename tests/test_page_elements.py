@@ -0,0 +1,60 @@
+import asyncio
+
+import pytest
+
+from app.core.http_client import HTMLPage
+from app.services import page_elements_service
+from app.services.page_elements_service import ElementExtractor, analyze_elements, extract_elements
+
+HTML = """
+<html><head>
+  <title>Strona główna</title>
+  <meta name="description" content="Opis strony">
+</head><body>
+  <h1>Nagłówek</h1><h2>Sekcja A</h2><h2>Sekcja B</h2>
+  <img src="/a.png" alt="A"><img src="/b.png">
+  <a href="/kontakt">Kontakt</a>
+  <a href="https://other.com/">Zewnętrzny</a>
+  <a href="#top">Do góry</a>
+</body></html>
+"""
+
+def test_extract_all_elements_in_one_pass():
+    result = extract_elements(HTML, 'https://example.com/', ['links', 'images', 'headings', 'meta'])
+    assert result['links']['internal_links'] == ['https://example.com/kontakt']
+    assert result['links']['external_links'] == ['https://other.com/']
+    assert result['images']['total_images'] == 2
+    assert result['images']['missing_alt'] == 1
+    assert result['headings']['headings'] == {'h1': ['Nagłówek'], 'h2': ['Sekcja A', 'Sekcja B'], 'h3': []}
+    assert not result['headings']['multiple_h1']
+    assert result['meta'] == {
+        'title': 'Strona główna',
+        'description': 'Opis strony',
+        'has_title': True,
+        'has_description': True
+    }
+
+def test_extract_only_requested_elements():
+    result = extract_elements(HTML, 'https://example.com/', ['images', 'unknown'])
+    assert list(result) == ['images']
+    assert extract_elements(HTML, 'https://example.com/', []) == {}
+
+def test_extractor_must_implement_visit_and_result():
+    class Incomplete(ElementExtractor):
+        def visit(self, tag) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        Incomplete('https://example.com/')
+
+def test_analyze_elements_fetches_capped_html(monkeypatch):
+    fetched = []
+
+    async def fake_fetch_html(url, *args, **kwargs):
+        fetched.append(url)
+        return HTMLPage(url, 200, {'Content-Type': 'text/html'}, HTML, 'utf-8')
+
+    monkeypatch.setattr(page_elements_service, 'fetch_html', fake_fetch_html)
+    result = asyncio.run(analyze_elements('https://example.com/', ['headings']))
+    assert fetched == ['https://example.com/']
+    assert result['headings']['has_h1']
@@ -0,0 +1,78 @@
+import os
+
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+pq = pytest.importorskip("pyarrow.parquet")
+
+from app.data_analysis.page_store import PageStoreWriter, clear_pages, export_pages, open_pages
+
+def page(n, title=None, **extra):
+    return {
+        'url': f'https://example.com/p{n}',
+        'status_code': 200 if n % 5 else 404,
+        'title': title if title is not None else f'Strona {n}',
+        'meta_description': 'Opis' if n % 2 else None,
+        'h1_tags': ['Nagłówek'] * (n % 3),
+        'images': [{'src': 'a.png', 'alt': ''}, {'src': 'b.png', 'alt': 'B'}],
+        'links': [{'url': 'https://example.com/x', 'text': 'x'}, {'url': 'https://other.test/', 'text': None}],
+        **extra
+    }
+
+def test_partitions_are_read_back_as_one_table(tmp_path):
+    with PageStoreWriter(1, part=0, batch_size=2, root=str(tmp_path)) as writer:
+        writer.write_many(page(n) for n in range(5))
+    with PageStoreWriter(1, part=1, root=str(tmp_path)) as writer:
+        writer.write(page(5, title='Strona 1', redirect_chain=[['http://example.com/p5', 301]]))
+
+    table = open_pages(1, root=str(tmp_path))
+    assert table.num_rows == 6
+    assert table['images_missing_alt'].to_pylist() == [1] * 6
+    assert table['internal_links'].to_pylist() == [1] * 6
+    assert table['redirect_count'].to_pylist()[-1] == 1
+    assert open_pages(2, root=str(tmp_path)) is None
+
+    path = export_pages(1, 'parquet', root=str(tmp_path))
+    assert pq.read_table(path).num_rows == 6
+    assert open_pages(1, root=str(tmp_path)).num_rows == 6
+    # Każdy eksport ma własny plik poza katalogiem audytu
+    other = export_pages(1, 'parquet', root=str(tmp_path))
+    assert other != path and not other.startswith(str(tmp_path))
+    os.remove(path)
+    os.remove(other)
+
+def test_new_crawl_does_not_merge_stale_partitions(tmp_path):
+    for part in range(3):
+        with PageStoreWriter(1, part=part, root=str(tmp_path)) as writer:
+            writer.write(page(part))
+    clear_pages(1, root=str(tmp_path))
+    assert open_pages(1, root=str(tmp_path)) is None
+
+    with PageStoreWriter(1, part=0, root=str(tmp_path)) as writer:
+        writer.write(page(7))
+    assert open_pages(1, root=str(tmp_path))['url'].to_pylist() == ['https://example.com/p7']
+    clear_pages(2, root=str(tmp_path))
+
+def test_failed_crawl_keeps_previous_file(tmp_path):
+    with PageStoreWriter(1, root=str(tmp_path)) as writer:
+        writer.write(page(1))
+    with pytest.raises(RuntimeError):
+        with PageStoreWriter(1, batch_size=1, root=str(tmp_path)) as writer:
+            writer.write(page(2))
+            raise RuntimeError('crawl failed')
+    assert open_pages(1, root=str(tmp_path))['url'].to_pylist() == ['https://example.com/p1']
+
+def test_site_stats_from_page_store(tmp_path):
+    pytest.importorskip("pandas")
+    from app.data_analysis.seo_analyzer import SEODataAnalyzer
+
+    with PageStoreWriter(1, root=str(tmp_path)) as writer:
+        writer.write_many([page(1), page(2, title='Strona 1'), page(3, title=''), page(5)])
+    stats = SEODataAnalyzer({}, open_pages(1, root=str(tmp_path))).generate_site_stats()
+    assert stats['total_pages'] == 4
+    assert stats['status_distribution'] == {'200': 3, '404': 1}
+    assert stats['missing_title'] == 1
+    assert stats['duplicate_titles'] == 1
+    assert stats['missing_description'] == 1
+    assert stats['no_h1'] == 1 and stats['multiple_h1'] == 2
+    assert stats['avg_external_links'] == 1.0
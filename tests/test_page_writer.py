@@ -0,0 +1,89 @@
+import asyncio
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.database import Base
+from app.core import json_codec
+from app.models import Audit, AuditPage
+from app.services.audit_service import AuditService
+from app.services.page_writer import AuditPageWriter
+
+def _page(n, title="Strona"):
+    return {"url": f"https://example.com/{n}", "title": f"{title} {n}", "status_code": 200, "etag": f'"{n}"'}
+
+def _run(tmp_path, scenario, dialect=None):
+    async def run():
+        engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path}/test.db")
+        if dialect:
+            # Dialekt bez obsługi ON CONFLICT w AuditPageWriter
+            engine.dialect.name = dialect
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        Session = async_sessionmaker(engine, expire_on_commit=False)
+        async with Session() as db:
+            audit = Audit(url="https://example.com")
+            db.add(audit)
+            await db.commit()
+            result = await scenario(db, audit.id)
+        await engine.dispose()
+        return result
+    return asyncio.run(run())
+
+async def _pages(db, audit_id):
+    rows = await db.execute(
+        select(AuditPage.url, AuditPage.title, AuditPage.analysis_data)
+        .where(AuditPage.audit_id == audit_id).order_by(AuditPage.url)
+    )
+    return [(row.url, row.title, json_codec.loads(row.analysis_data)["status_code"]) for row in rows]
+
+def test_writer_flushes_in_batches_and_on_close(tmp_path):
+    async def scenario(db, audit_id):
+        commits = []
+        commit = db.commit
+        async def counting_commit():
+            commits.append(1)
+            await commit()
+        db.commit = counting_commit
+
+        async with AuditPageWriter(db, audit_id, batch_size=2, flush_interval=3600) as writer:
+            await writer.add_many([_page(1), _page(2), _page(3)])
+            flushed = len(commits)
+            # Ta sama strona drugi raz w tym crawlu (np. po przekierowaniu)
+            await writer.add(_page(1, title="Nowa"))
+        return flushed, len(commits), writer.rows, await _pages(db, audit_id)
+
+    flushed, total, rows, pages = _run(tmp_path, scenario)
+    assert flushed == 1 and total == 2
+    assert rows == 4
+    assert pages == [
+        ("https://example.com/1", "Nowa 1", 200),
+        ("https://example.com/2", "Strona 2", 200),
+        ("https://example.com/3", "Strona 3", 200),
+    ]
+
+def test_recrawl_upserts_instead_of_duplicating(tmp_path):
+    async def scenario(db, audit_id):
+        service = AuditService(db)
+        await service.process_page_data(audit_id, [_page(1), _page(2)])
+        writer = await service.page_writer(audit_id)
+        async with writer:
+            await writer.add_many([_page(2, title="Retry"), _page(3, title="Retry")])
+        count = await db.scalar(select(func.count()).select_from(AuditPage).where(AuditPage.audit_id == audit_id))
+        return writer.upsert, count, await _pages(db, audit_id)
+
+    upsert, count, pages = _run(tmp_path, scenario)
+    assert upsert is True
+    assert count == 3
+    assert [title for _, title, _ in pages] == ["Strona 1", "Retry 2", "Retry 3"]
+
+def test_upsert_falls_back_on_other_dialects(tmp_path):
+    async def scenario(db, audit_id):
+        async with AuditPageWriter(db, audit_id, upsert=True) as writer:
+            await writer.add_many([_page(1), _page(2)])
+        async with AuditPageWriter(db, audit_id, upsert=True) as writer:
+            await writer.add_many([_page(2, title="Retry"), _page(3, title="Retry")])
+        return await _pages(db, audit_id)
+
+    pages = _run(tmp_path, scenario, dialect="mssql")
+    assert [title for _, title, _ in pages] == ["Strona 1", "Retry 2", "Retry 3"]
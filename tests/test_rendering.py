@@ -0,0 +1,41 @@
+import asyncio
+
+from parsel import Selector
+
+from app.scrapy_crawler.rendering import HybridRenderer, RenderedPage, needs_rendering
+
+ARTICLE = '<html><body><h1>Artykuł</h1><p>' + 'Treść artykułu. ' * 60 + '</p><script src="/app.js"></script></body></html>'
+
+def test_server_rendered_page_is_not_rendered():
+    assert not needs_rendering(Selector(text=ARTICLE))
+    assert not needs_rendering(Selector(text='<html><body><p>Krótka strona bez skryptów</p></body></html>'))
+
+def test_pages_needing_javascript():
+    assert needs_rendering(Selector(text='<html><body><script>render()</script></body></html>'))
+    assert needs_rendering(Selector(text='<html><body><nav>Menu</nav><div id="__next"></div></body></html>'))
+    heavy = '<html><body><p>Ładowanie...</p><script>' + 'var a = 1;' * 2000 + '</script></body></html>'
+    assert needs_rendering(Selector(text=heavy))
+
+def test_hybrid_renderer_merges_results():
+    def render(url):
+        if url.endswith('broken'):
+            raise RuntimeError('chrome crashed')
+        return {'url': url, 'title': 'Rendered', 'h1_tags': ['JS']}
+
+    async def run():
+        output = asyncio.Queue()
+        renderer = HybridRenderer(output, concurrency=1, max_pending=1, render=render)
+        await renderer.submit({'url': 'https://example.com/spa', 'status_code': 200, 'title': None})
+        await renderer.submit({'url': 'https://example.com/broken', 'status_code': 200, 'title': None})
+        await renderer.finish('done')
+        return [output.get_nowait() for _ in range(output.qsize())]
+
+    spa, broken, done = asyncio.run(run())
+    assert isinstance(spa, RenderedPage)
+    assert spa.data == {
+        'url': 'https://example.com/spa', 'status_code': 200, 'title': 'Rendered',
+        'h1_tags': ['JS'], 'needs_rendering': True, 'rendered': True
+    }
+    assert broken.data['title'] is None
+    assert broken.data['render_error'] == 'chrome crashed'
+    assert done == 'done'
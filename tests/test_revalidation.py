@@ -0,0 +1,34 @@
+from app.scrapy_crawler.revalidation import RevalidationIndex, content_hash
+
+BODY = b"<html><title>Test</title></html>"
+
+def make_index() -> RevalidationIndex:
+    previous = {"https://example.com/a": {"url": "https://example.com/a", "title": "Test"}}
+    validators = {
+        "https://example.com/a": ('"abc"', "Mon, 01 Jan 2024 00:00:00 GMT", content_hash(BODY)),
+        "https://example.com/b": (None, None, content_hash(b"other")),
+    }
+    return RevalidationIndex(validators, previous.get)
+
+def test_request_headers() -> None:
+    index = make_index()
+    assert index.request_headers("https://example.com/a#top") == {
+        "If-None-Match": '"abc"',
+        "If-Modified-Since": "Mon, 01 Jan 2024 00:00:00 GMT",
+    }
+    assert index.request_headers("https://example.com/b") == {}
+    assert index.request_headers("https://example.com/new") == {}
+
+def test_is_unchanged() -> None:
+    index = make_index()
+    assert index.is_unchanged("https://example.com/a", 304)
+    assert index.is_unchanged("https://example.com/a", 200, BODY)
+    assert not index.is_unchanged("https://example.com/a", 200, b"changed")
+    assert not index.is_unchanged("https://example.com/new", 304)
+
+def test_previous_page_is_marked_unchanged() -> None:
+    index = make_index()
+    page = index.previous_page("https://EXAMPLE.com/a/")
+    assert page == {"url": "https://example.com/a", "title": "Test", "unchanged": True}
+    assert index.previous_page("https://example.com/b") is None
+    assert index.unchanged == 1
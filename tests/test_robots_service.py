@@ -0,0 +1,68 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+fakeredis = pytest.importorskip("fakeredis")
+
+from app.config.settings import settings
+from app.core import http_client
+from app.services.robots_service import RobotsService
+
+ROBOTS = "User-agent: *\nDisallow: /private\nCrawl-delay: 2\nSitemap: https://example.com/sitemap.xml\n"
+
+class SyncRedisForbidden:
+    """Klient synchroniczny, którego ścieżki async nie mogą używać (blokowałby pętlę)"""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"sync Redis used on the event loop: {name}")
+
+def test_robots_fetched_once_and_shared_through_redis():
+    fetches = []
+
+    async def robots(request):
+        fetches.append(request.path)
+        return web.Response(text=ROBOTS)
+
+    async def run():
+        app = web.Application()
+        app.router.add_get('/robots.txt', robots)
+        runner = web.AppRunner(app)
+        await runner.setup()
+        site = web.TCPSite(runner, '127.0.0.1', 0)
+        await site.start()
+        base = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}"
+        server = fakeredis.FakeServer()
+        service = RobotsService(SyncRedisForbidden(), ttl=3600, error_ttl=60,
+                                async_redis=fakeredis.FakeAsyncRedis(server=server))
+        try:
+            allowed = await asyncio.gather(*[service.can_fetch(f'{base}/page/{n}') for n in range(5)])
+            blocked = await service.can_fetch(f'{base}/private/x')
+            rules = await service.get(base)
+            await http_client.close_http_session()
+        finally:
+            await runner.cleanup()
+        # Inny proces (np. middleware Scrapy): te same reguły z Redis, bez pobierania
+        redis = fakeredis.FakeRedis(server=server)
+        other = RobotsService(redis).load_cached(base)
+        return allowed, blocked, rules, other, [redis.ttl(key) for key in redis.keys()]
+
+    allowed, blocked, rules, other, ttls = asyncio.run(run())
+    assert all(allowed) and not blocked
+    assert fetches == ['/robots.txt']
+    assert rules.crawl_delay() == 2
+    assert rules.sitemaps == ['https://example.com/sitemap.xml']
+    assert not other.can_fetch('http://127.0.0.1/private/y')
+    assert len(ttls) == 1 and 3590 < ttls[0] <= 3600
+
+def test_errors_allow_everything_with_short_ttl():
+    redis = fakeredis.FakeRedis()
+    service = RobotsService(redis, ttl=3600, error_ttl=60)
+    assert service.store('https://down.test', 503, ROBOTS).can_fetch('https://down.test/private')
+    assert service.store('https://gone.test', 404, '').can_fetch('https://gone.test/private')
+    assert 50 < redis.ttl('robots:https://down.test') <= 60
+    assert 3590 < redis.ttl('robots:https://gone.test') <= 3600
+
+def test_sync_client_for_scrapy_has_short_timeouts():
+    kwargs = RobotsService(ttl=3600).redis.connection_pool.connection_kwargs
+    assert kwargs['socket_timeout'] == kwargs['socket_connect_timeout'] == settings.ROBOTS_REDIS_TIMEOUT
@@ -0,0 +1,126 @@
+import json
+import shutil
+import subprocess
+from urllib.parse import urljoin
+
+import pytest
+from selenium.webdriver.common.by import By
+
+from app.selenium_crawler.browser import SeleniumBrowser
+
+# Skrypt uruchamiany w node na atrapie DOM - w środowisku testów nie ma Chrome
+NODE = shutil.which('node')
+pytestmark = pytest.mark.skipif(NODE is None, reason="node is required to run the extraction script")
+
+BASE = 'https://example.com/dir/page'
+TITLE = 'Strona'
+# (tag, atrybuty, innerText, svg)
+ELEMENTS = [
+    ('meta', {'name': 'description', 'content': 'Opis strony'}, '', False),
+    ('h1', {}, '  Nagłówek  ', False),
+    ('h1', {}, '   ', False),
+    ('h1', {}, '', False),
+    ('a', {'href': '../kontakt'}, '\n Kontakt \n', False),
+    ('a', {'href': 'https://other.test/x?q=1#top'}, 'Zewnętrzny', False),
+    ('a', {}, 'Bez href', False),
+    ('a', {'href': ''}, 'Pusty href', False),
+    ('a', {'href': '/ikona'}, '', True),
+    ('img', {'src': 'a.png', 'alt': 'A'}, '', False),
+    ('img', {'src': '/b.png'}, '', False),
+    ('img', {'alt': 'bez src'}, '', False),
+]
+
+# Atrapa DOM z właściwościami jak w przeglądarce: href/src rozwiązane do
+# pełnego URL-a (pusty napis bez atrybutu), href <a> w SVG jako SVGAnimatedString
+FAKE_DOM = """
+const spec = JSON.parse(process.argv[1]);
+const elements = spec.elements.map(function ([tag, attrs, innerText, svg]) {
+    const resolve = function (name) {
+        return attrs[name] === undefined ? '' : new URL(attrs[name], spec.base).href;
+    };
+    const el = {tagName: tag, innerText: innerText, getAttribute: function (name) {
+        return attrs[name] === undefined ? null : attrs[name];
+    }};
+    if (tag === 'a') el.href = svg ? {baseVal: attrs.href || ''} : resolve('href');
+    if (tag === 'img') el.src = resolve('src');
+    return el;
+});
+const document = {
+    title: spec.title,
+    querySelectorAll: function (selector) {
+        if (selector === 'meta[name="description"]') {
+            return elements.filter(function (el) { return el.tagName === 'meta' && el.getAttribute('name') === 'description'; });
+        }
+        return elements.filter(function (el) { return el.tagName === selector; });
+    }
+};
+document.querySelector = function (selector) { return document.querySelectorAll(selector)[0] || null; };
+process.stdout.write((function () { %s })());
+"""
+
+class FakeWebElement:
+    """Element z semantyką Selenium: get_attribute('href'/'src') daje pełny URL, .text jest przycięty"""
+
+    def __init__(self, tag, attrs, inner_text, svg):
+        self.attrs = attrs
+        self.text = inner_text.strip()
+        self.svg = svg
+
+    def get_attribute(self, name):
+        value = self.attrs.get(name)
+        if name in ('href', 'src') and value is not None and not self.svg:
+            return urljoin(BASE, value)
+        return value
+
+class FakeDriver:
+    title = TITLE
+
+    def get(self, url):
+        pass
+
+    def find_element(self, by, value):
+        return object()
+
+    def find_elements(self, by, value):
+        if by == By.CSS_SELECTOR:
+            return [FakeWebElement(*e) for e in ELEMENTS if e[0] == 'meta' and e[1].get('name') == 'description']
+        return [FakeWebElement(*e) for e in ELEMENTS if e[0] == value]
+
+    def execute_script(self, script):
+        spec = json.dumps({'base': BASE, 'title': TITLE, 'elements': ELEMENTS})
+        return subprocess.run(
+            [NODE, '-e', FAKE_DOM % script, spec], capture_output=True, text=True, check=True, timeout=30
+        ).stdout
+
+def per_element_page_data(driver, url):
+    """Dawna ekstrakcja - osobne wywołanie WebDriver dla każdego elementu"""
+    meta = driver.find_elements(By.CSS_SELECTOR, 'meta[name="description"]')
+    return {
+        'url': url,
+        'title': driver.title,
+        'meta_description': meta[0].get_attribute('content') if meta else None,
+        'h1_tags': [el.text for el in driver.find_elements(By.TAG_NAME, 'h1') if el.text.strip()],
+        'links': [{'url': link.get_attribute('href'), 'text': link.text}
+                  for link in driver.find_elements(By.TAG_NAME, 'a') if link.get_attribute('href')],
+        'images': [{'src': img.get_attribute('src'), 'alt': img.get_attribute('alt')}
+                   for img in driver.find_elements(By.TAG_NAME, 'img') if img.get_attribute('src')],
+    }
+
+def test_script_matches_per_element_extraction():
+    browser = SeleniumBrowser.__new__(SeleniumBrowser)
+    browser.driver = FakeDriver()
+
+    data = browser.get_page_data(BASE)
+    assert data == per_element_page_data(browser.driver, BASE)
+    assert data['h1_tags'] == ['Nagłówek']
+    assert data['links'] == [
+        {'url': 'https://example.com/kontakt', 'text': 'Kontakt'},
+        {'url': 'https://other.test/x?q=1#top', 'text': 'Zewnętrzny'},
+        # Pusty href wskazuje na bieżącą stronę - tak samo w get_attribute()
+        {'url': BASE, 'text': 'Pusty href'},
+        {'url': '/ikona', 'text': ''},
+    ]
+    assert data['images'] == [
+        {'src': 'https://example.com/dir/a.png', 'alt': 'A'},
+        {'src': 'https://example.com/b.png', 'alt': None},
+    ]
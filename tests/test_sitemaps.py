@@ -0,0 +1,54 @@
+import gzip
+
+from app.scrapy_crawler.sitemaps import SitemapParser, iter_chunks, parse_sitemap, robots_sitemaps
+
+URLSET = (
+    '<?xml version="1.0" encoding="UTF-8"?>'
+    '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+    + ''.join(
+        f'<url><loc>https://example.com/page/{i}</loc><lastmod>2024-01-01</lastmod></url>'
+        for i in range(1000)
+    )
+    + '</urlset>'
+).encode()
+
+INDEX = b'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+  <sitemap><loc>https://example.com/sitemap-1.xml.gz</loc><lastmod>2024-02-01</lastmod></sitemap>
+  <sitemap><loc>https://example.com/sitemap-2.xml</loc></sitemap>
+</sitemapindex>'''
+
+def test_robots_sitemaps():
+    robots = "User-agent: *\nDisallow: /admin\nSitemap: https://example.com/sitemap.xml\nsitemap:https://example.com/news.xml\n"
+    assert robots_sitemaps(robots) == ['https://example.com/sitemap.xml', 'https://example.com/news.xml']
+
+def test_parse_urlset_in_small_chunks():
+    entries = list(parse_sitemap(iter_chunks(URLSET, 100)))
+    assert len(entries) == 1000
+    assert entries[0] == ('https://example.com/page/0', '2024-01-01', 'url', None)
+
+def test_parse_gzipped_sitemap():
+    entries = list(parse_sitemap(iter_chunks(gzip.compress(URLSET), 512)))
+    assert len(entries) == 1000
+    assert entries[-1].loc == 'https://example.com/page/999'
+
+def test_parse_sitemap_index():
+    entries = list(parse_sitemap([INDEX]))
+    assert [e.kind for e in entries] == ['sitemap', 'sitemap']
+    assert entries[0].lastmod == '2024-02-01'
+    assert entries[1].lastmod is None
+
+def test_parser_frees_processed_entries():
+    parser = SitemapParser()
+    for chunk in iter_chunks(URLSET, 1000):
+        parser.feed(chunk)
+    assert len(parser._root) <= 1
+
+def test_size_limit_truncates():
+    parser = SitemapParser(max_bytes=5000)
+    entries = []
+    for chunk in iter_chunks(gzip.compress(URLSET), 256):
+        entries.extend(parser.feed(chunk))
+    entries.extend(parser.close())
+    assert parser.truncated
+    assert 0 < len(entries) < 1000
@@ -0,0 +1,67 @@
+from app.scrapy_crawler.throttle import AIMDThrottle, parse_retry_after
+
+def test_parse_retry_after():
+    assert parse_retry_after(b'120') == 120.0
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:10 GMT', now=1445412480.0) == 10.0
+    assert parse_retry_after('soon') is None
+    assert parse_retry_after(None) is None
+
+def test_additive_increase_on_fast_responses():
+    throttle = AIMDThrottle(start_concurrency=2, max_concurrency=8)
+    for i in range(100):
+        throttle.on_response('example.com', 0.1, 200, now=float(i))
+    state = throttle.host('example.com')
+    assert state.limit == 8
+    assert state.delay == 0.0
+
+def test_multiplicative_decrease_on_overload():
+    throttle = AIMDThrottle(start_concurrency=8, max_concurrency=8, cooldown=1.0)
+    state = throttle.on_response('example.com', 0.1, 503, now=10.0)
+    assert state.limit == 4
+    assert state.delay == 1.0
+    # Kolejne błędy z tego samego okna nie zmniejszają limitu ponownie
+    throttle.on_error('example.com', now=10.5)
+    assert state.limit == 4
+    throttle.on_error('example.com', now=11.5)
+    assert state.limit == 2
+
+def test_latency_spike_backs_off():
+    throttle = AIMDThrottle(start_concurrency=4, target_latency=1.0)
+    for i in range(5):
+        throttle.on_response('example.com', 0.2, 200, now=float(i))
+    limit = throttle.host('example.com').limit
+    throttle.on_response('example.com', 5.0, 200, now=10.0)
+    assert throttle.host('example.com').limit < limit
+
+def test_retry_after_blocks_host():
+    throttle = AIMDThrottle()
+    throttle.on_response('example.com', 0.1, 429, retry_after=30, now=100.0)
+    assert throttle.wait_time('example.com', now=110.0) == 20.0
+    assert throttle.wait_time('other.com', now=110.0) == 0.0
+
+def test_delay_recovers_quickly_after_transient_errors():
+    throttle = AIMDThrottle(start_delay=0.5, max_delay=60.0, cooldown=1.0)
+    for i in range(8):
+        throttle.on_response('example.com', 0.1, 503, now=float(i * 2))
+    state = throttle.host('example.com')
+    assert state.delay == 60.0
+    for i in range(15):
+        throttle.on_response('example.com', 0.1, 200, now=100.0 + i)
+    assert state.delay < 0.5
+    assert state.limit >= 2
+
+def test_recovery_keeps_crawl_delay_floor():
+    throttle = AIMDThrottle(start_delay=0.5)
+    throttle.set_crawl_delay('example.com', 3)
+    throttle.on_response('example.com', 0.1, 503, now=0.0)
+    for i in range(20):
+        throttle.on_response('example.com', 0.1, 200, now=10.0 + i)
+    state = throttle.host('example.com')
+    assert state.delay == 3.0
+    assert state.limit == 1
+
+def test_steady_latency_below_target_does_not_throttle():
+    throttle = AIMDThrottle(start_concurrency=2, max_concurrency=8, target_latency=2.0)
+    for i in range(50):
+        throttle.on_response('example.com', 1.0 + (i % 3) * 0.1, 200, now=float(i))
+    assert throttle.host('example.com').limit == 8